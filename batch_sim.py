@@ -0,0 +1,265 @@
+"""Vectorised batch throw simulator (requires NumPy).
+
+Scores many throws at once with the same per-frame rules as
+simulation.Simulation. A throw is described by its release angle and its
+board phase: the number of frames the level ran after reset_game() before
+the dart was thrown. All darts are integrated together, one frame per loop
+iteration, using the same floating point operations in the same order as the
+interactive loop, so the results match it exactly.
+
+Level timers are not modelled: running out of time never changes the
+outcome of a dart that is already in flight.
+"""
+import math
+import weakref
+from collections import namedtuple
+
+import numpy as np
+
+import simulation
+from simulation import WIDTH, HEIGHT, dart_x, dart_y, dart_speed
+
+# Outcome codes
+UNRESOLVED = 0
+HIT = 1
+MISS = 2
+OFFSCREEN = 3
+OBSTACLE = 4
+
+OUTCOME_CODES = {"hit": HIT, "miss": MISS, "offscreen": OFFSCREEN, "obstacle": OBSTACLE}
+
+# Per-throw results, one array entry per input throw. hit_y is NaN unless the
+# dart crossed the board plane; frames counts the frames the dart was in flight.
+BatchResult = namedtuple("BatchResult", "hit_y points obstacle_hit outcome frames")
+
+# An ObstacleGrid copied into arrays: cells[column - first_column, row - first_row]
+# holds the indices of the rects in that cell, padded with -1, and rects is an
+# (N, 4) array of their (x, y, width, height)
+GridTable = namedtuple("GridTable", "first_column first_row cells rects")
+
+_grid_tables = weakref.WeakKeyDictionary()  # ObstacleGrid -> its GridTable
+
+
+def center_track(spec, frames):
+    """Return the board's center_y after 0, 1, ... `frames` updates, read off a levels.Level's track"""
+    if spec.track is None:
+        return np.full(frames + 1, float(spec.center_y))
+    positions = np.array([center_y for center_y, direction in spec.track.positions])
+    steps = np.arange(frames + 1)
+    # Past the last position the board repeats from the track's loop phase
+    loop = spec.track.loop
+    steps = np.where(steps < len(positions), steps, loop + (steps - loop) % (len(positions) - loop))
+    return positions[steps]
+
+
+def dart_velocity(angles):
+    """Return per-frame (vx, vy) arrays for the given release angles.
+
+    math.cos/math.sin are used instead of their NumPy counterparts, which are
+    not guaranteed to round identically; each distinct angle is computed once.
+    """
+    unique, inverse = np.unique(angles, return_inverse=True)
+    vx = np.array([dart_speed * math.cos(math.radians(a)) for a in unique.tolist()])
+    vy = np.array([dart_speed * math.sin(math.radians(a)) for a in unique.tolist()])
+    return vx[inverse], vy[inverse]
+
+
+def _slab(start, delta, low, high, t_enter, t_exit):
+    """Narrow [t_enter, t_exit] to where start + t * delta lies within [low, high]"""
+    moving = delta != 0
+    inside = (start >= low) & (start <= high)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t0 = (low - start) / delta
+        t1 = (high - start) / delta
+    # A segment that does not move along this axis is either always or never within the slab
+    near = np.where(moving, np.minimum(t0, t1), np.where(inside, -np.inf, np.inf))
+    far = np.where(moving, np.maximum(t0, t1), np.where(inside, np.inf, -np.inf))
+    return np.maximum(t_enter, near), np.minimum(t_exit, far)
+
+
+def segments_vs_rect(x1, y1, x2, y2, rect):
+    """Vectorised collision.segment_vs_rect: time of impact per segment, inf for none"""
+    left, top, width, height = rect
+    t_enter = np.zeros(x1.shape)
+    t_exit = np.ones(x1.shape)
+    t_enter, t_exit = _slab(x1, x2 - x1, left, left + width, t_enter, t_exit)
+    t_enter, t_exit = _slab(y1, y2 - y1, top, top + height, t_enter, t_exit)
+    return np.where(t_enter <= t_exit, t_enter, np.inf)
+
+
+def grid_table(grid):
+    """Return the GridTable of a non-empty collision.ObstacleGrid, built on first use.
+
+    The grid must not change afterwards; the levels' shared grids never do.
+    """
+    table = _grid_tables.get(grid)
+    if table is None:
+        columns = [column for column, row in grid.cells]
+        rows = [row for column, row in grid.cells]
+        depth = max(len(cell) for cell in grid.cells.values())
+        cells = np.full((max(columns) - min(columns) + 1, max(rows) - min(rows) + 1, depth), -1, dtype=np.int64)
+        for (column, row), cell in grid.cells.items():
+            cells[column - min(columns), row - min(rows), :len(cell)] = cell
+        table = _grid_tables[grid] = GridTable(min(columns), min(rows), cells, np.array(grid.rects, dtype=float))
+    return table
+
+
+def segments_vs_grid(x1, y1, x2, y2, grid):
+    """Vectorised collision.segment_vs_grid: time of impact per segment, inf for none.
+
+    Each segment is tested only against the rects in the grid cells its
+    bounding box overlaps, so the cost follows how crowded the cells along
+    the darts are rather than how many rects the grid holds.
+    """
+    table = grid_table(grid)
+    size = grid.cell_size
+    columns, rows, depth = table.cells.shape
+
+    # The cells each bounding box spans, widened by a hair as in ObstacleGrid.query()
+    first_column = ((np.minimum(x1, x2) - 1e-6) // size).astype(np.int64) - table.first_column
+    last_column = ((np.maximum(x1, x2) + 1e-6) // size).astype(np.int64) - table.first_column
+    first_row = ((np.minimum(y1, y2) - 1e-6) // size).astype(np.int64) - table.first_row
+    last_row = ((np.maximum(y1, y2) + 1e-6) // size).astype(np.int64) - table.first_row
+
+    first = np.full(x1.shape, np.inf)
+    if x1.size == 0:
+        return first
+    for column_offset in range(int((last_column - first_column).max()) + 1):
+        column = first_column + column_offset
+        for row_offset in range(int((last_row - first_row).max()) + 1):
+            row = first_row + row_offset
+            inside = ((column <= last_column) & (row <= last_row)
+                      & (column >= 0) & (column < columns) & (row >= 0) & (row < rows))
+            segments = np.flatnonzero(inside)
+            if segments.size == 0:
+                continue
+            in_cell = table.cells[column[segments], row[segments]]
+            # A rect listed in several cells may be tested twice; the earliest impact is the same
+            for slot in range(depth):
+                listed = in_cell[:, slot] >= 0
+                if not listed.any():
+                    break
+                tested = segments[listed]
+                left, top, width, height = table.rects[in_cell[listed, slot]].T
+                t = segments_vs_rect(x1[tested], y1[tested], x2[tested], y2[tested], (left, top, width, height))
+                first[tested] = np.minimum(first[tested], t)
+    return first
+
+
+def segments_leave_screen(x1, y1, x2, y2):
+    """Vectorised collision.segment_leaves_screen: exit time per segment, inf for none"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        first = np.where(x2 > WIDTH, (WIDTH - x1) / (x2 - x1), np.inf)
+        first = np.minimum(first, np.where(y2 < 0, -y1 / (y2 - y1), np.inf))
+        first = np.minimum(first, np.where(y2 > HEIGHT, (HEIGHT - y1) / (y2 - y1), np.inf))
+    return np.maximum(first, 0.0)
+
+
+def sweep_segments(prev_x, prev_y, new_x, new_y, board_start, board_end, level):
+    """Vectorised Simulation.sweep_dart over arrays of dart steps.
+
+    The board's center moves from board_start to board_end during each step.
+    Returns (outcome code, hit_y, points) arrays, with UNRESOLVED where the
+    dart flies on and hit_y NaN unless it crossed the board's plane.
+    """
+    center_x = level.center_x
+
+    # Earliest impact wins; on a tie obstacles beat the screen edge, which beats the board
+    if level.obstacles:
+        first = segments_vs_grid(prev_x, prev_y, new_x, new_y, level.grid)
+    else:
+        first = np.full(prev_x.shape, np.inf)
+    kind = np.full(prev_x.shape, UNRESOLVED, dtype=np.int8)
+    kind[first < np.inf] = OBSTACLE
+
+    exit_t = segments_leave_screen(prev_x, prev_y, new_x, new_y)
+    leaves = exit_t < first
+    first = np.where(leaves, exit_t, first)
+    kind[leaves] = OFFSCREEN
+
+    hit_y = np.full(prev_x.shape, np.nan)
+    points = np.zeros(prev_x.shape, dtype=np.int64)
+    crossing = ((prev_x < center_x) & (new_x >= center_x)) | ((prev_x > center_x) & (new_x <= center_x))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (center_x - prev_x) / (new_x - prev_x)
+    crossing &= t < first
+    if crossing.any():
+        t = t[crossing]
+        intersect_y = prev_y[crossing] + (new_y[crossing] - prev_y[crossing]) * t
+
+        # The board moves during the step; score against where it is at the impact
+        board_y = board_start[crossing] + (board_end[crossing] - board_start[crossing]) * t
+        earned = level.scoring.points_array(np.abs(intersect_y - board_y),
+                                            np.where(intersect_y > board_y, 90.0, 270.0))
+        hit_y[crossing] = intersect_y
+        points[crossing] = earned
+        kind[crossing] = np.where(earned > 0, HIT, MISS)
+
+    return kind, hit_y, points
+
+
+def simulate_throws(angles, phases, level=1, max_frames=1000):
+    """Score every (angle, phase) throw and return a BatchResult of arrays"""
+    angles, phases = np.broadcast_arrays(np.asarray(angles, dtype=float), np.asarray(phases, dtype=np.int64))
+    angles = angles.ravel()
+    phases = phases.ravel()
+    count = angles.size
+
+    spec = simulation.Simulation(level).state.level
+
+    # Board center before and after each of the darts' flight frames
+    track = center_track(spec, int(phases.max(initial=0)) + max_frames)
+
+    vx, vy = dart_velocity(angles)
+    x = np.full(count, float(dart_x))
+    y = np.full(count, float(dart_y))
+
+    hit_y = np.full(count, np.nan)
+    points = np.zeros(count, dtype=np.int64)
+    outcome = np.zeros(count, dtype=np.int8)
+    frames = np.zeros(count, dtype=np.int64)
+    active = np.arange(count)
+
+    for frame in range(1, max_frames + 1):
+        if active.size == 0:
+            break
+
+        prev_x, prev_y = x[active], y[active]
+        new_x = prev_x + vx[active]
+        new_y = prev_y + vy[active]
+        x[active] = new_x
+        y[active] = new_y
+        frames[active] = frame
+
+        kind, intersect_y, earned = sweep_segments(prev_x, prev_y, new_x, new_y, track[phases[active] + frame - 1],
+                                                   track[phases[active] + frame], spec)
+        crossed = ~np.isnan(intersect_y)
+        hit_y[active[crossed]] = intersect_y[crossed]
+        points[active] = earned
+
+        outcome[active] = kind
+        active = active[kind == UNRESOLVED]
+
+    return BatchResult(hit_y, points, outcome == OBSTACLE, outcome, frames)
+
+
+def simulate_throw_scalar(angle, phase, level=1, max_frames=1000):
+    """Score one throw by stepping a Simulation frame by frame (the reference)"""
+    sim = simulation.Simulation(level)
+    sim.state.dart_angle = angle
+
+    # dt=0 keeps a level timer out of the way for late phases
+    for _ in range(phase):
+        sim.step(simulation.Inputs(), 0)
+
+    events = sim.step(simulation.Inputs(throw=True), 0)
+    frames = 1
+    while not events and frames < max_frames:
+        events = sim.step(simulation.Inputs(), 0)
+        frames += 1
+
+    if not events:
+        return math.nan, 0, UNRESOLVED, frames
+    event = events[0]
+    hit_y = event.y if event.kind in ("hit", "miss") else math.nan
+    return hit_y, event.points, OUTCOME_CODES[event.kind], frames
@@ -0,0 +1,50 @@
+"""Benchmark: vectorised batch throw simulator vs the per-frame Simulation loop
+
+Exits 1 if a batch result differs from the frame loop's.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+import batch_sim
+
+
+def main():
+    rng = np.random.default_rng(0)
+    batch_size = 200000
+    scalar_size = 2000
+    all_match = True
+
+    for level in (1, 2, 3):
+        angles = rng.uniform(-40, 40, batch_size)
+        phases = rng.integers(0, 200, batch_size)
+
+        start = time.perf_counter()
+        result = batch_sim.simulate_throws(angles, phases, level)
+        batch_rate = batch_size / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        scalar = [batch_sim.simulate_throw_scalar(float(a), int(p), level)
+                  for a, p in zip(angles[:scalar_size], phases[:scalar_size])]
+        scalar_rate = scalar_size / (time.perf_counter() - start)
+
+        # The batch results must agree with the frame loop throw for throw
+        hit_y, points, outcomes, frames = (np.array(column) for column in zip(*scalar))
+        matches = (np.array_equal(hit_y, result.hit_y[:scalar_size], equal_nan=True)
+                   and np.array_equal(points, result.points[:scalar_size])
+                   and np.array_equal(outcomes, result.outcome[:scalar_size])
+                   and np.array_equal(frames, result.frames[:scalar_size]))
+        all_match = all_match and matches
+
+        print(f"level {level}: batch {batch_rate:12,.0f} throws/s   scalar {scalar_rate:9,.0f} throws/s   "
+              f"speedup {batch_rate / scalar_rate:6.1f}x   match {matches}")
+    if not all_match:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Micro-benchmark: the old per-step collision checks vs the swept tests in collision.py
+
+Times one dart step against the Level 3 obstacles with the old
+Cohen-Sutherland code (which rebuilt a compute_code closure per obstacle per
+call) and with collision.segment_vs_rects / Simulation.sweep_dart, then
+throws perfectly aimed darts at increasing dart_speed to show that the old
+endpoint-first checks let a fast dart tunnel past the board.
+
+Exits 1 if the old and swept tests disagree on which steps hit an obstacle.
+"""
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import collision
+import simulation
+
+
+def legacy_obstacle_collision(obstacles, x1, y1, x2, y2):
+    """The Cohen-Sutherland obstacle check the simulation used to run, kept for comparison"""
+    for obstacle_x, obstacle_y, obstacle_w, obstacle_h in obstacles:
+        left = obstacle_x
+        right = obstacle_x + obstacle_w
+        top = obstacle_y
+        bottom = obstacle_y + obstacle_h
+
+        INSIDE, LEFT, RIGHT, BOTTOM, TOP = 0, 1, 2, 4, 8
+
+        def compute_code(x, y):
+            code = INSIDE
+            if x < left:
+                code |= LEFT
+            elif x > right:
+                code |= RIGHT
+            if y < top:
+                code |= TOP
+            elif y > bottom:
+                code |= BOTTOM
+            return code
+
+        code1 = compute_code(x1, y1)
+        code2 = compute_code(x2, y2)
+        while True:
+            if code1 == 0 and code2 == 0:
+                return True
+            if (code1 & code2) != 0:
+                break
+            code_out = code1 if code1 != 0 else code2
+            if code_out & TOP:
+                x = x1 + (x2 - x1) * (top - y1) / (y2 - y1)
+                y = top
+            elif code_out & BOTTOM:
+                x = x1 + (x2 - x1) * (bottom - y1) / (y2 - y1)
+                y = bottom
+            elif code_out & RIGHT:
+                y = y1 + (y2 - y1) * (right - x1) / (x2 - x1)
+                x = right
+            elif code_out & LEFT:
+                y = y1 + (y2 - y1) * (left - x1) / (x2 - x1)
+                x = left
+            if code_out == code1:
+                x1, y1 = x, y
+                code1 = compute_code(x1, y1)
+            else:
+                x2, y2 = x, y
+                code2 = compute_code(x2, y2)
+    return False
+
+
+def legacy_outcome(state, x1, y1, x2, y2):
+    """The old order of checks for one step: the endpoint off screen first, then the board plane"""
+    if x2 > simulation.WIDTH or y2 < 0 or y2 > simulation.HEIGHT:
+        return "offscreen"
+    if (x1 < state.center_x and x2 >= state.center_x) or (x1 > state.center_x and x2 <= state.center_x):
+        return "hit"
+    return None
+
+
+def steps(count, speed):
+    """Return random dart steps of the given length starting around the Level 3 playfield"""
+    rng = random.Random(1)
+    result = []
+    for _ in range(count):
+        x = rng.uniform(0, simulation.WIDTH)
+        y = rng.uniform(0, simulation.HEIGHT)
+        angle = math.radians(rng.uniform(-80, 80))
+        result.append((x, y, x + speed * math.cos(angle), y + speed * math.sin(angle)))
+    return result
+
+
+def bench_obstacles():
+    sim = simulation.Simulation(3)
+    state = sim.state
+    obstacles = state.obstacles
+    segments = steps(2000, simulation.dart_speed)
+
+    def legacy():
+        for x1, y1, x2, y2 in segments:
+            legacy_obstacle_collision(obstacles, x1, y1, x2, y2)
+
+    def swept():
+        for x1, y1, x2, y2 in segments:
+            collision.segment_vs_rects(x1, y1, x2, y2, obstacles)
+
+    def full_sweep():
+        center = state.center_y
+        for x1, y1, x2, y2 in segments:
+            sim.sweep_dart(x1, y1, x2, y2, center, center)
+
+    # Both tests must agree on which steps hit an obstacle
+    agree = all(legacy_obstacle_collision(obstacles, *s) == (collision.segment_vs_rects(*s, obstacles) is not None)
+                for s in segments)
+
+    print("%d Level 3 obstacles, %d steps, results agree: %s" % (len(obstacles), len(segments), agree))
+    for label, function in (("Cohen-Sutherland", legacy), ("segment_vs_rects", swept), ("sweep_dart (all tests)", full_sweep)):
+        best = min(timeit.repeat(function, number=5, repeat=5)) / 5
+        print("  %-24s %7.2f us/step" % (label, best / len(segments) * 1e6))
+    return agree
+
+
+def bench_tunnelling():
+    print("Perfectly aimed Level 1 throws:")
+    for speed in (10, 100, 400, 800, 1600):
+        sim = simulation.Simulation(1)
+        state = sim.state
+        angle = math.radians(state.perfect_angle)
+        x1, y1 = float(simulation.dart_x), float(simulation.dart_y)
+
+        old = new = None
+        while old is None:
+            x2, y2 = x1 + speed * math.cos(angle), y1 + speed * math.sin(angle)
+            old = legacy_outcome(state, x1, y1, x2, y2)
+            if new is None:
+                event, _ = sim.sweep_dart(x1, y1, x2, y2, state.center_y, state.center_y)
+                new = event and event.kind
+            x1, y1 = x2, y2
+        print("  dart_speed %5d: old checks %-10s swept %s" % (speed, old, new))
+
+
+if __name__ == "__main__":
+    agree = bench_obstacles()
+    bench_tunnelling()
+    if not agree:
+        sys.exit(1)
@@ -0,0 +1,64 @@
+"""Micro-benchmark: drawing the dart as polygons vs blitting cached pre-rotated sprites"""
+import math
+import os
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+import render_cache
+import simulation
+
+COLORS = ((240, 240, 240), (0, 0, 0), (255, 107, 107))  # game_Q.DART_COLORS
+
+
+def flight_path():
+    """Return (x, y, angle) for every frame of a Level 2 throw plus the idle dart"""
+    sim = simulation.Simulation(2)
+    state = sim.state
+    sim.step(simulation.Inputs(aim_perfect=True), 0)
+    sim.step(simulation.Inputs(aim_perfect=True, throw=True), 0)
+    path = []
+    while state.dart_in_motion:
+        path.append((state.dart_pos_x, state.dart_pos_y, state.dart_angle))
+        path.append((simulation.dart_x, simulation.dart_y, state.dart_angle))
+        sim.step(simulation.Inputs(), 0)
+    return path
+
+
+def draw_polygons(screen, path):
+    """Draw every dart of the path the old way"""
+    for x, y, angle in path:
+        render_cache.draw_dart_shape(screen, x, y, angle, COLORS)
+
+
+def draw_sprites(screen, path):
+    """Draw every dart of the path from the sprite cache, as game_Q.draw_dart does"""
+    for x, y, angle in path:
+        base_x, base_y = math.floor(x), math.floor(y)
+        sprite, (origin_x, origin_y) = render_cache.get_dart_sprite(angle, x - base_x, y - base_y, COLORS)
+        screen.blit(sprite, (base_x - origin_x, base_y - origin_y))
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((800, 600))
+    path = flight_path()
+
+    cold = timeit.timeit(lambda: draw_sprites(screen, path), number=1) / len(path)
+    polygons = min(timeit.repeat(lambda: draw_polygons(screen, path), number=20, repeat=3)) / (20 * len(path))
+    sprites = min(timeit.repeat(lambda: draw_sprites(screen, path), number=20, repeat=3)) / (20 * len(path))
+
+    print(f"{len(path)} darts per pass, {len(render_cache._dart_sprites)} sprites cached")
+    print(f"polygons:      {polygons * 1e6:7.2f} us/dart")
+    print(f"sprites cold:  {cold * 1e6:7.2f} us/dart")
+    print(f"sprites warm:  {sprites * 1e6:7.2f} us/dart")
+    print(f"speedup:       {polygons / sprites:7.1f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Micro-benchmark: drawing dartboards circle by circle vs blitting cached board sprites
+
+Draws many boards per frame at fractional heights, the way an interpolated
+moving board lands on screen, with a few different geometries.
+"""
+import os
+import random
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+import game_Q
+import render_cache
+
+BOARD_COUNTS = (1, 10, 100)
+GEOMETRIES = ((100, 55, 20), (60, 30, 10), (40, 25, 8))
+
+
+def draw_circles(surface, x, y, radii):
+    """The old draw_dartboard(): six circles and three labels per board"""
+    outer, middle, bullseye = radii
+    for radius, color in zip(radii, game_Q.BOARD_PALETTE[:3]):
+        pygame.draw.circle(surface, color, (x, y), radius)
+        pygame.draw.circle(surface, game_Q.BLACK, (x, y), radius, 2)
+    for text, offset, color in (("10", (middle + outer) // 2, game_Q.BLACK),
+                                ("30", (bullseye + middle) // 2, game_Q.BLACK), ("50", 0, game_Q.WHITE)):
+        label = render_cache.render_text(text, 24, color)
+        surface.blit(label, label.get_rect(center=(x - offset, y)))
+
+
+def main():
+    screen = game_Q.init_display()
+    rng = random.Random(1)
+
+    print("%8s %18s %18s %8s" % ("boards", "circles ms/frame", "sprites ms/frame", "speedup"))
+    for count in BOARD_COUNTS:
+        boards = [(rng.uniform(100, 700), rng.uniform(100, 500), rng.choice(GEOMETRIES)) for _ in range(count)]
+        circles = min(timeit.repeat(lambda: [draw_circles(screen, *board) for board in boards], number=20, repeat=3))
+        sprites = min(timeit.repeat(lambda: [game_Q.draw_board(screen, *board) for board in boards], number=20, repeat=3))
+        print("%8d %18.3f %18.3f %7.1fx" % (count, circles / 20 * 1e3, sprites / 20 * 1e3, circles / sprites))
+    print(f"{len(render_cache._board_sprites)} board sprites cached")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
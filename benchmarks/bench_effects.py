@@ -0,0 +1,119 @@
+"""Micro-benchmark: full-screen hit-effect surfaces vs the pooled particle engine
+
+Each frame spawns a batch of ring bursts that live 15 frames, so a second
+of play keeps around 15x the batch on screen at once. The old way builds a
+full-screen SRCALPHA surface per burst, blits each over the whole screen
+and allocates a new flash surface every frame; the pool blits cached
+sprites and reuses one flash surface. Surface allocations are counted
+during the timed frames.
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+import effects
+import render_cache
+
+WIDTH, HEIGHT = 800, 600
+FRAMES = 60
+LIFE = 15
+BATCHES = (1, 10, 40)  # Bursts spawned per frame
+BURSTS = {
+    50: ((255, 255, 200, 220), 50, 8),
+    30: ((100, 255, 255, 200), 40, 6),
+    10: ((255, 180, 100, 180), 30, 5),
+    0: ((255, 80, 80, 180), 25, 4),
+}
+
+
+class CountingSurface(pygame.Surface):
+    """pygame.Surface that counts how many are created"""
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        CountingSurface.created += 1
+        super().__init__(*args, **kwargs)
+
+
+def legacy_hit_effect(hit_x, hit_y, points):
+    """The old draw_hit_effect(): rings drawn on a full-screen surface"""
+    effect_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    color, max_radius, rings = BURSTS[points]
+    for i in range(rings):
+        r = max_radius * (1 - i/rings)
+        ring_width = max(2, int(r/5))
+        alpha = int(200 * (1 - i/rings))
+        pygame.draw.circle(effect_surface, (color[0], color[1], color[2], alpha),
+                           (int(hit_x), int(hit_y)), int(r), ring_width)
+    pygame.draw.circle(effect_surface, (255, 255, 255, 200), (int(hit_x), int(hit_y)), max_radius // 4)
+    return effect_surface
+
+
+def run_legacy(screen, spawns):
+    """Play the frames with one full-screen surface per live effect"""
+    live = []
+    for batch in spawns:
+        for x, y, points in batch:
+            live.append([legacy_hit_effect(x, y, points), LIFE])
+        for effect in live:
+            screen.blit(effect[0], (0, 0))
+            effect[1] -= 1
+        flash_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        flash_surface.fill((255, 255, 255, 26))
+        screen.blit(flash_surface, (0, 0))
+        live = [effect for effect in live if effect[1] > 0]
+
+
+def run_pooled(screen, spawns, pool, styles):
+    """Play the frames through the effect pool"""
+    for batch in spawns:
+        for x, y, points in batch:
+            pool.spawn(x, y, styles[points], LIFE)
+        pool.update()
+        pool.draw(screen)
+        pool.covered()
+        screen.blit(render_cache.get_flash_surface((WIDTH, HEIGHT), 26), (0, 0))
+
+
+def timed(run):
+    """Return (ms per frame, Surfaces created) for one run"""
+    pygame.Surface = CountingSurface
+    CountingSurface.created = 0
+    try:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+    finally:
+        pygame.Surface = CountingSurface.__bases__[0]
+    return elapsed / FRAMES * 1000, CountingSurface.created
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    rng = random.Random(1)
+    pool = effects.EffectPool(capacity=max(BATCHES) * LIFE)
+    styles = {points: pool.add_style(*render_cache.get_burst_sprite(*burst)) for points, burst in BURSTS.items()}
+    render_cache.get_flash_surface((WIDTH, HEIGHT), 26)
+
+    print("%8s %10s %16s %16s %14s %14s" % ("per frame", "on screen", "legacy ms/frame", "pooled ms/frame",
+                                            "legacy allocs", "pooled allocs"))
+    for batch in BATCHES:
+        spawns = [[(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT), rng.choice(list(BURSTS)))
+                   for _ in range(batch)] for _ in range(FRAMES)]
+        legacy_ms, legacy_allocs = timed(lambda: run_legacy(screen, spawns))
+        pool.clear()
+        pooled_ms, pooled_allocs = timed(lambda: run_pooled(screen, spawns, pool, styles))
+        print("%8d %10d %16.2f %16.2f %14d %14d" % (batch, batch * LIFE, legacy_ms, pooled_ms,
+                                                      legacy_allocs, pooled_allocs))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark: environment steps per second, one game vs vectorised vs worker processes
+
+Every game aims at random offsets and throws now and then, so darts are in
+flight, landing and games are ending and resetting throughout. First checks
+that VectorDartEnv plays step for step like as many DartEnvs, and exits 1
+if it does not.
+
+usage: python benchmarks/bench_env.py [LEVEL] [WORKERS]
+"""
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+import env
+
+VECTOR_SIZES = (256, 4096, 32768)
+THROW_CHANCE = 0.02  # Per game per step
+CHECK_GAMES = 16
+CHECK_STEPS = 2000
+
+
+def vector_matches_single(level, rng):
+    """Step a VectorDartEnv and as many DartEnvs with the same actions; return whether they agree"""
+    games = env.VectorDartEnv(CHECK_GAMES, level)
+    singles = [env.DartEnv(level) for _ in range(CHECK_GAMES)]
+    observations, _ = games.reset()
+    expected = [single.reset()[0] for single in singles]
+    for _ in range(CHECK_STEPS):
+        if not np.array_equal(observations, expected):
+            return False
+        offsets = rng.uniform(-30, 30, CHECK_GAMES)
+        throws = rng.random(CHECK_GAMES) < THROW_CHANCE * 5
+        observations, rewards, terminated, truncated, _ = games.step(offsets, throws)
+        expected = []
+        for i, single in enumerate(singles):
+            observation, reward, single_terminated, single_truncated, _ = single.step(offsets[i], throws[i])
+            if (reward, single_terminated, single_truncated) != (rewards[i], terminated[i], truncated[i]):
+                return False
+            expected.append(single.reset()[0] if single_terminated or single_truncated else observation)
+    return np.array_equal(observations, expected)
+
+
+def rate(games, num_envs, steps, rng):
+    """Return env steps per second over `steps` calls of games.step()"""
+    games.reset()
+    actions = [(rng.uniform(-30, 30, num_envs), rng.random(num_envs) < THROW_CHANCE) for _ in range(8)]
+    start = time.perf_counter()
+    for i in range(steps):
+        games.step(*actions[i % len(actions)])
+    return num_envs * steps / (time.perf_counter() - start)
+
+
+def main():
+    level = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else multiprocessing.cpu_count()
+    rng = np.random.default_rng(0)
+
+    matches = vector_matches_single(level, rng)
+    print(f"level {level}, VectorDartEnv matches DartEnv: {matches}")
+    if not matches:
+        sys.exit(1)
+
+    single = env.DartEnv(level)
+    single.reset()
+    offsets = rng.uniform(-30, 30, 20000)
+    throws = rng.random(20000) < THROW_CHANCE
+    start = time.perf_counter()
+    for offset, throw in zip(offsets, throws):
+        if any(single.step(offset, throw)[2:4]):
+            single.reset()
+    print(f"level {level}, DartEnv:                  {20000 / (time.perf_counter() - start):12,.0f} steps/s")
+
+    for num_envs in VECTOR_SIZES:
+        steps_per_s = rate(env.VectorDartEnv(num_envs, level), num_envs, max(20, 2000000 // num_envs // 10), rng)
+        print(f"level {level}, VectorDartEnv({num_envs:6d}):    {steps_per_s:12,.0f} steps/s")
+
+    num_envs = VECTOR_SIZES[-1] * workers
+    games = env.ProcessVectorEnv(num_envs, level, workers)
+    try:
+        steps_per_s = rate(games, num_envs, 100, rng)
+    finally:
+        games.close()
+    print(f"level {level}, ProcessVectorEnv({num_envs}, {workers} workers): {steps_per_s:12,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark: leaderboard writes and the game over screen's queries
+
+Compares what a level's end costs the frame: a queued record_score()
+against inserting and committing the row on the spot. Then times the
+in-memory top() against the top-N query it replaces and the history query,
+on a table of ROWS results, with and without the indexes.
+
+usage: python benchmarks/bench_leaderboard.py [ROWS]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import leaderboard
+import profiler
+
+PLAYERS = 500
+WRITES = 200
+
+
+def latencies(function, calls):
+    """Return the p50, p99 and worst time of `calls` calls of function(i), in microseconds"""
+    times = []
+    for i in range(calls):
+        start = time.perf_counter()
+        function(i)
+        times.append((time.perf_counter() - start) * 1e6)
+    return profiler.percentile(times, 50), profiler.percentile(times, 99), max(times)
+
+
+def populate(path, rows, rng):
+    """Fill a new database with `rows` random results"""
+    connection = leaderboard.connect(path)
+    with connection:
+        connection.executemany(
+            "INSERT INTO scores (session, player, level, score, throws, cleared, finished) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (("bench", "player%d" % rng.randrange(PLAYERS), rng.randint(1, 3), rng.randint(0, 150), 3,
+              rng.random() < 0.5, i) for i in range(rows)))
+    return connection
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "leaderboard.db")
+        populate(path, rows, rng).close()
+
+        # Writing at the end of a level
+        direct = leaderboard.connect(path)
+
+        def commit_now(i):
+            with direct:
+                direct.execute("INSERT INTO scores (session, player, level, score, throws, cleared, finished) "
+                               "VALUES ('bench', 'now', 1, ?, 3, 1, ?)", (i, time.time()))
+
+        scores = leaderboard.Leaderboard(path)
+        session = scores.start_session("bench", 0, 0)
+        print("%-34s %10s %10s %10s" % ("per call (us)", "p50", "p99", "worst"))
+        print("%-34s %10.1f %10.1f %10.1f" % ("insert and commit in the frame", *latencies(commit_now, WRITES)))
+        print("%-34s %10.1f %10.1f %10.1f" % ("record_score() (queued)", *latencies(
+            lambda i: scores.record_score(session, "queued", 1, i, 3, True), WRITES)))
+        scores.flush()
+
+        # Reading for the game over screen
+        print("%-34s %10.1f %10.1f %10.1f" % ("top(level, %d), in memory" % leaderboard.TOP_SCORES, *latencies(
+            lambda i: scores.top(i % 3 + 1), WRITES)))
+        for label in ("indexed", "without indexes"):
+            if label != "indexed":
+                scores._reader.execute("DROP INDEX scores_by_level")
+                scores._reader.execute("DROP INDEX scores_by_player")
+            print("%-34s %10.1f %10.1f %10.1f" % ("top-N query, %s" % label, *latencies(
+                lambda i: scores._read_top(i % 3 + 1), WRITES)))
+            print("%-34s %10.1f %10.1f %10.1f" % ("history(player), %s" % label, *latencies(
+                lambda i: scores.history("player%d" % (i % PLAYERS)), WRITES)))
+
+        direct.close()
+        scores.close()
+    print("%d rows; %d writes dropped" % (rows, scores.dropped))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Micro-benchmark: per-step obstacle collision cost as the obstacle count grows
+
+Compares testing every obstacle (collision.segment_vs_rects) with the
+ObstacleGrid broad phase (collision.segment_vs_grid) on random dart steps
+through a playfield scattered with obstacles. With the game's 35x160
+obstacles thousands of them pile up over every point of the 800x600
+playfield, so the grid's cost grows with how many actually overlap the
+step; small obstacles show the broad phase on its own.
+
+Exits 1 if the grid and the linear scan disagree on any step.
+"""
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import collision
+import levels
+import simulation
+
+COUNTS = (2, 10, 100, 1000, 5000)
+SIZES = (levels.get(3).obstacles[0][2:], (8, 8))  # Level 3's obstacles, then small debris
+STEPS = 2000
+
+
+def random_obstacles(count, size, rng):
+    """Scatter count obstacles of the given (width, height) over the playfield"""
+    width, height = size
+    return [(rng.randint(0, simulation.WIDTH), rng.randint(0, simulation.HEIGHT), width, height)
+            for _ in range(count)]
+
+
+def random_steps(rng):
+    """Return dart steps of dart_speed length across the playfield"""
+    result = []
+    for _ in range(STEPS):
+        x = rng.uniform(0, simulation.WIDTH)
+        y = rng.uniform(0, simulation.HEIGHT)
+        angle = math.radians(rng.uniform(-60, 60))
+        result.append((x, y, x + simulation.dart_speed * math.cos(angle), y + simulation.dart_speed * math.sin(angle)))
+    return result
+
+
+def main():
+    rng = random.Random(1)
+    segments = random_steps(rng)
+    all_agree = True
+    for size in SIZES:
+        print("%dx%d obstacles" % size)
+        all_agree &= bench_size(size, segments, rng)
+    if not all_agree:
+        sys.exit(1)
+
+
+def bench_size(size, segments, rng):
+    """Print per-step timings for each obstacle count at one obstacle size; return whether all agreed"""
+    all_agree = True
+    print("%6s %14s %14s %14s %8s" % ("count", "linear us/step", "grid us/step", "build ms", "agree"))
+    for count in COUNTS:
+        rects = random_obstacles(count, size, rng)
+        grid = collision.ObstacleGrid(rects)
+
+        def linear():
+            for x1, y1, x2, y2 in segments:
+                collision.segment_vs_rects(x1, y1, x2, y2, rects)
+
+        def indexed():
+            for x1, y1, x2, y2 in segments:
+                collision.segment_vs_grid(x1, y1, x2, y2, grid)
+
+        agree = all(collision.segment_vs_rects(*s, rects) == collision.segment_vs_grid(*s, grid) for s in segments)
+        all_agree &= agree
+        number = max(1, 200 // count)
+        linear_s = min(timeit.repeat(linear, number=number, repeat=3)) / number
+        grid_s = min(timeit.repeat(indexed, number=number, repeat=3)) / number
+        build_s = min(timeit.repeat(lambda: collision.ObstacleGrid(rects), number=1, repeat=3))
+        print("%6d %14.2f %14.2f %14.2f %8s" % (count, linear_s / STEPS * 1e6, grid_s / STEPS * 1e6, build_s * 1e3, agree))
+    return all_agree
+
+
+if __name__ == "__main__":
+    main()
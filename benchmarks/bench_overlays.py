@@ -0,0 +1,70 @@
+"""Micro-benchmark: game over screen drawn element by element vs pre-composed
+
+The old game over screen allocated a full-screen dimming surface and blitted
+its panels, texts and buttons every frame it was shown, and a click drew the
+whole screen again to find the buttons. game_Q now blits one cached layer
+per (level, outcome, score, hovered button) and hit-tests static layouts.
+"""
+import os
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+import game_Q
+import render_cache
+
+WIDTH, HEIGHT = game_Q.WIDTH, game_Q.HEIGHT
+FRAMES = 200
+
+
+def legacy_game_over(screen, score, mouse_pos):
+    """The old draw_game_over() for a cleared Level 1; returns its buttons"""
+    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 180))
+    screen.blit(overlay, (0, 0))
+    game_Q.draw_rounded_rect(screen, (40, 40, 60, 230), pygame.Rect(WIDTH//2 - 180, HEIGHT//2 - 150, 360, 300))
+    game_Q.draw_rounded_rect(screen, (80, 20, 20, 230), pygame.Rect(WIDTH//2 - 180, HEIGHT//2 - 150, 360, 60))
+    for text, size, color, center in (("LEVEL COMPLETE", 64, (255, 255, 255), (WIDTH//2, HEIGHT//2 - 110)),
+                                      (f"Final Score: {score}", 48, (255, 255, 255), (WIDTH//2, HEIGHT//2 - 40)),
+                                      ("You've unlocked Level 2!", 32, (150, 255, 150), (WIDTH//2, HEIGHT//2 + 10))):
+        surface = render_cache.render_text(text, size, color)
+        screen.blit(surface, surface.get_rect(center=center))
+    buttons = []
+    for action, button, color, hover_color, label, text_size in game_Q.CLEARED_BUTTONS:
+        game_Q.draw_rounded_rect(screen, hover_color if button.collidepoint(mouse_pos) else color, button)
+        text = render_cache.render_text(label.format(level=1, previous=0), text_size, (255, 255, 255))
+        screen.blit(text, text.get_rect(center=button.center))
+        buttons.append((action, button))
+    return buttons
+
+
+def main():
+    screen = game_Q.init_display()
+    game_Q.reset_game(1)
+    game_Q.state.score = 100
+    game_Q.state.game_over = True
+    mouse_pos = pygame.mouse.get_pos()
+
+    legacy = min(timeit.repeat(lambda: legacy_game_over(screen, 100, mouse_pos), number=FRAMES, repeat=3)) / FRAMES
+    start = timeit.default_timer()
+    game_Q.draw_game_over()
+    cold = timeit.default_timer() - start
+    cached = min(timeit.repeat(game_Q.draw_game_over, number=FRAMES, repeat=3)) / FRAMES
+
+    click = (WIDTH // 2, HEIGHT // 2 + 80)
+    legacy_click = min(timeit.repeat(lambda: [a for a, b in legacy_game_over(screen, 100, mouse_pos)
+                                              if b.collidepoint(click)], number=FRAMES, repeat=3)) / FRAMES
+    static_click = min(timeit.repeat(lambda: game_Q.button_at(click), number=FRAMES, repeat=3)) / FRAMES
+
+    print(f"draw per frame:  element by element {legacy * 1e3:7.3f} ms, pre-composed {cached * 1e3:7.3f} ms "
+          f"({legacy / cached:.1f}x), first composition {cold * 1e3:.1f} ms")
+    print(f"click hit-test:  by drawing {legacy_click * 1e6:9.1f} us, static layout {static_click * 1e6:7.2f} us")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
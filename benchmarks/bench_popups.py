@@ -0,0 +1,92 @@
+"""Micro-benchmark: score popups scaled every frame vs pre-baked animation frames
+
+Plays popups through their whole 60-tick life, several at once. The old
+way builds the outlined text per hit and smoothscales it on every frame of
+the grow-in and shrink-out; popups.ScorePopups blits the baked frame for
+each popup's phase.
+"""
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+import popups
+
+CONCURRENT = (1, 10, 50)  # Popups on screen at once
+POINTS = (10, 30, 50)
+
+
+def legacy_frames(screen, hits):
+    """Play popups the old way; return the number of frames drawn"""
+    live = []
+    for hit_x, hit_y, points in hits:
+        text, _ = popups.build_popup_surface(points)
+        live.append([text, text.get_rect(center=(hit_x, hit_y - 40))])
+    for phase in range(popups.POPUP_TICKS, 0, -1):
+        for text, rect in live:
+            display_rect = rect.copy()
+            display_rect.x += math.sin(phase * 0.2) * 3
+            scale = popups.popup_scale(phase)
+            if scale != 1.0:
+                w, h = text.get_width(), text.get_height()
+                scaled_text = pygame.transform.smoothscale(text, (int(w * scale), int(h * scale)))
+                display_rect.x += (w - scaled_text.get_width()) // 2
+                display_rect.y += (h - scaled_text.get_height()) // 2
+                screen.blit(scaled_text, display_rect)
+            else:
+                screen.blit(text, display_rect)
+    return popups.POPUP_TICKS
+
+
+def baked_frames(screen, hits):
+    """Play popups through ScorePopups; return the number of frames drawn"""
+    score_popups = popups.ScorePopups()
+    for hit_x, hit_y, points in hits:
+        score_popups.spawn(hit_x, hit_y, points)
+    frames = 0
+    while True:
+        score_popups.update()
+        if not score_popups.active:
+            return frames
+        for popup_blit in score_popups.blits():
+            screen.blit(*popup_blit)
+        frames += 1
+
+
+def per_frame_ms(run, screen, hits, repeat=5):
+    """Return the best ms per frame over a few runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = run(screen, hits)
+        elapsed = (time.perf_counter() - start) * 1000 / frames
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    rng = random.Random(1)
+
+    start = time.perf_counter()
+    popups.prebake(POINTS)
+    print(f"baking {len(POINTS)} point values: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print("%10s %16s %16s %8s" % ("popups", "scaled ms/frame", "baked ms/frame", "speedup"))
+    for count in CONCURRENT:
+        hits = [(rng.uniform(100, 700), rng.uniform(100, 500), rng.choice(POINTS)) for _ in range(count)]
+        legacy = per_frame_ms(legacy_frames, screen, hits)
+        baked = per_frame_ms(baked_frames, screen, hits)
+        print("%10d %16.3f %16.3f %7.1fx" % (count, legacy, baked, legacy / baked))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
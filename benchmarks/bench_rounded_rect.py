@@ -0,0 +1,50 @@
+"""Micro-benchmark: rebuilding rounded-rect panels every frame vs the panel cache"""
+import os
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+import render_cache
+
+# The panels drawn during one level 3 gameplay frame
+FRAME_PANELS = [
+    ((180, 120), (40, 45, 75, 200)),   # Score box
+    ((120, 50), (85, 239, 196)),       # THROW button
+    ((121, 35), (40, 45, 75, 200)),    # Timer
+    ((420, 100), (20, 20, 40, 180)),   # Helper panel
+]
+
+
+def frame_uncached(screen):
+    """Draw one frame's panels the old way, building each surface per call"""
+    for size, color in FRAME_PANELS:
+        screen.blit(render_cache.build_rounded_rect(size, color), (20, 20))
+
+
+def frame_cached(screen):
+    """Draw one frame's panels through the panel cache"""
+    for size, color in FRAME_PANELS:
+        screen.blit(render_cache.get_rounded_rect(size, color), (20, 20))
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((800, 600))
+    frames = 20
+
+    frame_cached(screen)  # Warm the cache outside the timed section
+    uncached = min(timeit.repeat(lambda: frame_uncached(screen), number=frames, repeat=3)) / frames
+    cached = min(timeit.repeat(lambda: frame_cached(screen), number=frames, repeat=3)) / frames
+
+    print(f"uncached: {uncached * 1e6:9.1f} us/frame")
+    print(f"cached:   {cached * 1e6:9.1f} us/frame")
+    print(f"speedup:  {uncached / cached:9.1f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Benchmark suite: frame time, Surface allocations and memory per game scene
+
+Each scene is a scripted session played through game_Q.main() under the SDL
+dummy video driver, uncapped (FPS = 0) and with fixed 60 FPS frame times,
+so every run draws the same frames. Startup assets are built before the
+first frame (LAZY_STARTUP = False; bench_startup.py times the lazy path),
+so their warm-up does not land in the first frames of a scene, and each run
+gets an empty leaderboard of its own. For the frames that show the scene it
+reports:
+
+  mean_ms, p99_ms     frame time, from one main loop iteration to the next
+  surfaces_per_frame  new Surfaces per frame: pygame.Surface() plus the
+                      pygame calls that return a new one (render, copy,
+                      convert, subsurface, transform.*, ...)
+  peak_mem_mib        peak resident memory of the process playing the scene
+
+With --full-redraw every frame is drawn and flipped in full instead of
+through the dirty-rect path, which measures the drawing of each scene
+rather than just what changes in it.
+
+Every scene runs in fresh processes: --repeat timed runs, whose medians
+are reported, and one more counting allocations, whose hooks would skew
+the times.
+
+usage: python benchmarks/bench_scenes.py [--output FILE] [--compare BASELINE] [--threshold PCT]
+                                         [--min-delta MS] [--repeat N] [--full-redraw] [SCENE ...]
+
+The results are written as JSON to --output. With --compare, any scene
+whose frame times, allocations or peak memory grew by more than the
+threshold over a saved baseline is listed and the exit status is 1. Frame
+times must also have grown by more than --min-delta ms, since most frames
+take well under a millisecond, where a few microseconds of jitter are
+already tens of percent. They must also be slower than the baseline's
+slowest timed run.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, ROOT)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import pygame
+
+import game_Q
+import profiler
+import replay
+import simulation
+
+SEED = 1
+FRAME_MS = 17  # About 60 FPS
+METRICS = ("mean_ms", "p99_ms", "surfaces_per_frame", "peak_mem_mib")
+TIME_METRICS = ("mean_ms", "p99_ms")
+DEFAULT_OUTPUT = "scene_bench.json"
+
+# Calls that return a new Surface, besides pygame.Surface() itself
+SURFACE_MODULES = (pygame.transform, pygame.image, pygame.surfarray)
+SURFACE_METHODS = ("copy", "convert", "convert_alpha", "subsurface", "premul_alpha")
+
+IDLE = simulation.Inputs()
+PERFECT_THROW = simulation.Inputs(throw=True, aim_perfect=True)
+
+
+def aiming(count):
+    """Frame inputs that sweep the aim up and down, half a second each way"""
+    return [simulation.Inputs(up=i // 30 % 2 == 0, down=i // 30 % 2 == 1) for i in range(count)]
+
+
+def throwing(throws, spacing):
+    """Frame inputs for `throws` perfect throws, `spacing` frames apart"""
+    return ([PERFECT_THROW] + [IDLE] * (spacing - 1)) * throws
+
+
+# Scene name -> (level, start the game?, frame inputs, whether a frame shows the scene)
+SCENES = {
+    "start_screen": (1, False, [IDLE] * 600, lambda: not game_Q.game_started),
+    "level1_aim": (1, True, aiming(600), lambda: game_Q.game_started),
+    "level2_moving": (2, True, aiming(600), lambda: game_Q.game_started),
+    "level3_obstacles_timer": (3, True, aiming(600), lambda: game_Q.game_started),
+    "hit_effects": (1, True, throwing(3, 120),
+                    lambda: (game_Q.score_popups.active or game_Q.hit_effects.max_phase() > 0)
+                    and not game_Q.state.game_over),
+    "game_over": (1, True, throwing(3, 120) + [IDLE] * 600,
+                  lambda: game_Q.state.game_over and not game_Q.celebration_active),
+    "celebration": (3, True, throwing(3, 120) + [IDLE] * 600, lambda: game_Q.celebration_active),
+}
+
+
+class SceneFrames:
+    """A scripted session's frames, fed to main() one at a time.
+
+    Each frame's time is taken when main() asks for the next one and is kept
+    if the scene's predicate holds once the frame is done; so are the
+    Surfaces allocated during it, when a counter is given.
+    """
+
+    def __init__(self, frames, shows_scene, counter=None):
+        self.frames = frames
+        self.shows_scene = shows_scene
+        self.counter = counter
+        self.frame_ms = []
+        self.surfaces = []
+
+    def __iter__(self):
+        previous = None
+        counted = 0
+        for frame in self.frames:
+            now = time.perf_counter()
+            if previous is not None and self.shows_scene():
+                self.frame_ms.append((now - previous) * 1000)
+                if self.counter is not None:
+                    self.surfaces.append(self.counter[0] - counted)
+            previous = now
+            counted = self.counter[0] if self.counter is not None else 0
+            yield frame
+
+
+def count_surfaces():
+    """Count every new Surface from now on; return the one-element counter"""
+    counter = [0]
+    surface_type = pygame.Surface
+
+    class CountedSurface(surface_type):
+        def __init__(self, *args, **kwargs):
+            counter[0] += 1
+            super().__init__(*args, **kwargs)
+
+    def on_call(frame, event, function):
+        if event == "c_call":
+            owner = getattr(function, "__self__", None)
+            if (owner in SURFACE_MODULES
+                    or isinstance(owner, surface_type) and function.__name__ in SURFACE_METHODS
+                    or isinstance(owner, pygame.font.Font) and function.__name__ == "render"):
+                counter[0] += 1
+
+    pygame.Surface = CountedSurface
+    sys.setprofile(on_call)
+    return counter
+
+
+def peak_memory_mib():
+    """Return the process's peak resident memory in MiB, or None where unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def play_scene(name, count, full_redraw):
+    """Play a scene in this process; return its measurements"""
+    level, start, inputs, shows_scene = SCENES[name]
+    actions = [(replay.RESET, level)] + ([(replay.START, 0)] if start else [])
+    frames = [replay.Frame(frame_inputs, FRAME_MS, start, tuple(actions) if i == 0 else ())
+              for i, frame_inputs in enumerate(inputs)]
+
+    scene = SceneFrames(frames, shows_scene, count_surfaces() if count else None)
+    game_Q.replay.load = lambda path: replay.Session(SEED, level, replay.level_config(), scene)
+    game_Q.FPS = 0
+    game_Q.LAZY_STARTUP = False
+    game_Q.DIRTY_RECT_RENDERING = not full_redraw
+    with tempfile.TemporaryDirectory() as directory:
+        game_Q.LEADERBOARD_PATH = os.path.join(directory, "leaderboard.db")
+        try:
+            game_Q.main(replay_path=name)
+        except SystemExit:
+            pass
+    sys.setprofile(None)
+
+    if not scene.frame_ms:
+        raise RuntimeError("scene %s never showed" % name)
+    if count:
+        return {"surfaces_per_frame": sum(scene.surfaces) / len(scene.surfaces)}
+    return {"frames": len(scene.frame_ms),
+            "mean_ms": sum(scene.frame_ms) / len(scene.frame_ms),
+            "p99_ms": profiler.percentile(scene.frame_ms, 99),
+            "peak_mem_mib": peak_memory_mib()}
+
+
+def run_child(name, count, full_redraw):
+    """Play a scene in a fresh process; return its measurements"""
+    command = [sys.executable, os.path.abspath(__file__), "--child", name]
+    command += (["--count"] if count else []) + (["--full-redraw"] if full_redraw else [])
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_scene(name, repeat, full_redraw):
+    """Measure a scene: the median of `repeat` timed runs, plus one counting run.
+
+    The frame times of every timed run are kept under "runs" too, to tell
+    a regression from run-to-run noise.
+    """
+    runs = [run_child(name, False, full_redraw) for _ in range(repeat)]
+    result = {"frames": runs[0]["frames"], "runs": {metric: [run[metric] for run in runs] for metric in TIME_METRICS}}
+    for metric in ("mean_ms", "p99_ms", "peak_mem_mib"):
+        values = [run[metric] for run in runs if run[metric] is not None]
+        result[metric] = statistics.median(values) if values else None
+    result.update(run_child(name, True, full_redraw))
+    return result
+
+
+def regressions(results, baseline, threshold, min_delta_ms):
+    """Return a line for every metric that grew more than threshold percent over the baseline.
+
+    A frame time must also have grown by more than min_delta_ms and beyond
+    the baseline's slowest run, so noise the baseline itself showed does
+    not count.
+    """
+    lines = []
+    for name, result in results.items():
+        base = baseline.get("scenes", {}).get(name)
+        if base is None:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if metric in TIME_METRICS and (new - old <= min_delta_ms
+                                           or new <= max(base.get("runs", {}).get(metric, [old]))):
+                continue
+            # From zero, any growth counts
+            if new > old * (1 + threshold / 100) if old else new > 0:
+                lines.append("%s %s: %.3f -> %.3f (%+.1f%%)" % (name, metric, old, new,
+                                                               (new / old - 1) * 100 if old else float("inf")))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-scene frame time, allocation and memory benchmark")
+    parser.add_argument("scenes", nargs="*", metavar="SCENE", help="scenes to run (default: all of %s)" %
+                        ", ".join(SCENES))
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file (default: %(default)s)")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail if a scene regressed against this results file")
+    parser.add_argument("--threshold", type=float, default=10, help="allowed growth in percent (default: %(default)s)")
+    parser.add_argument("--min-delta", type=float, default=0.1, metavar="MS",
+                        help="frame time growth always allowed, in ms (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per scene (default: %(default)s)")
+    parser.add_argument("--full-redraw", action="store_true", help="draw every frame in full, not just what changed")
+    parser.add_argument("--child", metavar="SCENE", help=argparse.SUPPRESS)
+    parser.add_argument("--count", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(play_scene(args.child, args.count, args.full_redraw)))
+        return
+
+    unknown = [name for name in args.scenes if name not in SCENES]
+    if unknown:
+        parser.error("unknown scene: %s" % ", ".join(unknown))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("full_redraw", False) != args.full_redraw:
+            parser.error("%s was run %s --full-redraw" % (args.compare, "without" if args.full_redraw else "with"))
+
+    results = {}
+    print("%-24s %7s %9s %9s %12s %10s" % ("scene", "frames", "mean ms", "p99 ms", "surfaces/fr", "peak MiB"))
+    for name in args.scenes or SCENES:
+        result = results[name] = run_scene(name, args.repeat, args.full_redraw)
+        print("%-24s %7d %9.3f %9.3f %12.2f %10s" % (name, result["frames"], result["mean_ms"], result["p99_ms"],
+                                                     result["surfaces_per_frame"],
+                                                     "-" if result["peak_mem_mib"] is None
+                                                     else "%.1f" % result["peak_mem_mib"]))
+
+    with open(args.output, "w") as f:
+        json.dump({"python": sys.version.split()[0], "pygame": pygame.version.ver,
+                   "frame_ms": FRAME_MS, "full_redraw": args.full_redraw, "scenes": results}, f, indent=2)
+    print("results written to %s" % args.output)
+
+    if baseline is not None:
+        lines = regressions(results, baseline, args.threshold, args.min_delta)
+        for line in lines:
+            print("REGRESSION", line)
+        if lines:
+            sys.exit(1)
+        print("no scene regressed more than %g%% against %s" % (args.threshold, args.compare))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Micro-benchmark: per-hit scoring cost as the number of rings grows
+
+Compares walking the rings one by one (the old if-chain, generalised) with
+scoring.ScoringTable lookups, for single hits and for arrays of hits.
+
+Exits 1 if the two ever score a hit differently.
+"""
+import os
+import random
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import scoring
+
+RING_COUNTS = (3, 20, 200)
+HITS = 10000
+
+
+def make_rings(count):
+    """Return count rings out to 100 px, innermost worth the most"""
+    return [(100 * (i + 1) / count, 10 * (count - i)) for i in range(count)]
+
+
+def chain_points(rings, distance):
+    """Score a hit the old way: compare against each ring's radius in turn"""
+    for radius, points in rings:
+        if distance <= radius:
+            return points
+    return 0
+
+
+def chain_points_array(rings, distances):
+    """Vectorised if-chain: one np.where per ring, outermost first"""
+    points = np.zeros(distances.shape, dtype=np.int64)
+    for radius, ring_points in reversed(rings):
+        points = np.where(distances <= radius, ring_points, points)
+    return points
+
+
+def main():
+    rng = random.Random(1)
+    distances = [rng.uniform(0, 120) for _ in range(HITS)]
+    distance_array = np.array(distances)
+
+    print("%6s %16s %16s %18s %18s %6s" % ("rings", "chain ns/hit", "table ns/hit",
+                                          "chain array ns", "table array ns", "agree"))
+    all_agree = True
+    for count in RING_COUNTS:
+        rings = make_rings(count)
+        table = scoring.ScoringTable(rings)
+        agree = ([chain_points(rings, d) for d in distances] == [table.points(d) for d in distances]
+                 and (chain_points_array(rings, distance_array) == table.points_array(distance_array)).all())
+        all_agree &= agree
+
+        chain_s = min(timeit.repeat(lambda: [chain_points(rings, d) for d in distances], number=1, repeat=5))
+        table_s = min(timeit.repeat(lambda: [table.points(d) for d in distances], number=1, repeat=5))
+        chain_array_s = min(timeit.repeat(lambda: chain_points_array(rings, distance_array), number=1, repeat=5))
+        table_array_s = min(timeit.repeat(lambda: table.points_array(distance_array), number=1, repeat=5))
+        print("%6d %16.0f %16.0f %18.1f %18.1f %6s" % (count, chain_s / HITS * 1e9, table_s / HITS * 1e9,
+                                                        chain_array_s / HITS * 1e9, table_array_s / HITS * 1e9,
+                                                        agree))
+    if not all_agree:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark: cold-start time to first frame and to interactive
+
+Each run boots the game in a fresh Python process, with an empty
+leaderboard, and quits it as soon as every queued asset is built. The times are measured from just before the
+process is spawned:
+
+  window       the display is open
+  first frame  the start screen has been pushed to the display
+  interactive  every asset the later screens draw is cached, so no frame
+               waits on a cold cache
+
+The lazy startup is compared with LAZY_STARTUP = False, which initialises
+every pygame subsystem and builds every asset before the first frame.
+
+usage: python benchmarks/bench_startup.py [RUNS]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MILESTONES = ("window", "first_frame", "interactive")
+
+
+def child(mode, spawned):
+    """Run the game until it is interactive; print the milestones in ms after spawned"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    sys.path.insert(0, ROOT)
+
+    import pygame
+
+    import game_Q
+
+    game_Q.LAZY_STARTUP = mode == "lazy"
+    warm_up = game_Q.warm_up
+
+    def warm_up_then_quit():
+        warm_up()
+        if "interactive" in game_Q.startup_marks:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    game_Q.warm_up = warm_up_then_quit
+    with tempfile.TemporaryDirectory() as directory:
+        game_Q.LEADERBOARD_PATH = os.path.join(directory, "leaderboard.db")
+        try:
+            game_Q.main()
+        except SystemExit:
+            pass
+    # time.perf_counter() is the system-wide monotonic clock, so the parent's reading compares
+    print(json.dumps({name: (game_Q.startup_marks[name] - spawned) * 1e3 for name in MILESTONES}))
+
+
+def boot(mode):
+    """Boot the game once in a new process; return its milestones"""
+    spawned = time.perf_counter()
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, repr(spawned)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], float(sys.argv[3]))
+        return
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("%-8s %12s %16s %16s   (median ms after spawn, %d runs)" % ("startup", "window", "first frame",
+                                                                       "interactive", runs))
+    # Alternate the modes so both see the same disk and page caches
+    boots = {"lazy": [], "eager": []}
+    for _ in range(runs):
+        for mode in boots:
+            boots[mode].append(boot(mode))
+    for mode, mode_boots in boots.items():
+        print("%-8s %12.1f %16.1f %16.1f" % (mode, *(statistics.median(run[name] for run in mode_boots)
+                                                     for name in MILESTONES)))
+
+
+if __name__ == "__main__":
+    main()
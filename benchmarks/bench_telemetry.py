@@ -0,0 +1,129 @@
+"""Benchmark: what per-throw telemetry costs a frame
+
+Times emit() against encoding and writing the event to a gzip file in the
+frame. Then runs a level 3 frame loop (simulation step and a full redraw of
+a surface) paced at 60 FPS, with and without a stream, emitting one event
+every frame: far more than a player throws, with the drain thread running
+alongside. Finally times the drain thread's throughput and floods the
+buffer to show that a full buffer drops events instead of blocking.
+
+usage: python benchmarks/bench_telemetry.py [FRAMES]
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+import profiler
+import simulation
+import telemetry
+
+CALLS = 2000
+FRAME_S = 1 / 60
+DRAIN_EVENTS = 100000
+AIM = [simulation.Inputs(up=i // 30 % 2 == 0, down=i // 30 % 2 == 1) for i in range(60)]
+
+
+def event(i):
+    return (time.time(), "hit", 3, 272.5, i - 40, i, 300.0, 310.5, 40, 12500.0)
+
+
+def latencies(function, calls):
+    """Return the p50, p99 and worst time of `calls` calls of function(i), in microseconds"""
+    times = []
+    for i in range(calls):
+        start = time.perf_counter()
+        function(i)
+        times.append((time.perf_counter() - start) * 1e6)
+    return profiler.percentile(times, 50), profiler.percentile(times, 99), max(times)
+
+
+def frame_loop(frames, stream):
+    """Run `frames` level 3 frames at 60 FPS, emitting an event each when stream is given.
+
+    Returns the time each frame's work took, in ms; the rest of the frame is
+    spent asleep, as in clock.tick().
+    """
+    sim = simulation.Simulation(3)
+    screen = pygame.Surface((simulation.WIDTH, simulation.HEIGHT))
+    times = []
+    next_frame = time.perf_counter()
+    for i in range(frames):
+        next_frame += FRAME_S
+        time.sleep(max(0, next_frame - time.perf_counter()))
+        start = time.perf_counter()
+        sim.step(AIM[i % len(AIM)], 1000 / 60)
+        if sim.state.game_over:
+            sim.reset(3)
+        screen.fill((i % 256, 0, 0))
+        for x, y, width, height in sim.state.obstacles:
+            pygame.draw.rect(screen, (200, 200, 200), (x, y, width, height))
+        pygame.draw.circle(screen, (255, 255, 255), (sim.state.center_x, int(sim.state.center_y)), 100)
+        if stream is not None:
+            stream.emit(event(i))
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Per event, in the frame
+        inline = gzip.open(os.path.join(directory, "inline.ndjson.gz"), "ab")
+
+        def write_now(i):
+            inline.write((json.dumps(dict(zip(telemetry.FIELDS, event(i)))) + "\n").encode())
+            inline.flush()
+
+        stream = telemetry.TelemetryStream(os.path.join(directory, "emit"))
+        print("%-34s %10s %10s %10s" % ("per event (us)", "p50", "p99", "worst"))
+        print("%-34s %10.1f %10.1f %10.1f" % ("encode, compress and write now", *latencies(write_now, CALLS)))
+        print("%-34s %10.1f %10.1f %10.1f" % ("emit() (buffered)", *latencies(lambda i: stream.emit(event(i)), CALLS)))
+        stream.close()
+        inline.close()
+
+        # Frame times with the drain thread running; alternate so both see the same machine state
+        runs = {"without telemetry": [], "with telemetry": []}
+        for _ in range(2):
+            runs["without telemetry"] += frame_loop(frames, None)
+            stream = telemetry.TelemetryStream(os.path.join(directory, "frames"))
+            runs["with telemetry"] += frame_loop(frames, stream)
+            stream.close()
+        print("\n%-34s %10s %10s %10s" % ("level 3 frame at 60 FPS (ms)", "mean", "p99", "worst"))
+        for label, times in runs.items():
+            print("%-34s %10.3f %10.3f %10.3f" % (label, sum(times) / len(times), profiler.percentile(times, 99),
+                                                   max(times)))
+
+        # Drain throughput: queue everything, then let close() write it
+        stream = telemetry.TelemetryStream(os.path.join(directory, "drain"), capacity=DRAIN_EVENTS, interval=60,
+                                           max_bytes=256 * 1024)
+        for i in range(DRAIN_EVENTS):
+            stream.emit(event(i))
+        start = time.perf_counter()
+        stream.close()
+        drained = time.perf_counter() - start
+        files = len(os.listdir(os.path.join(directory, "drain")))
+        print("\ndrain: %d events in %.2f s (%.0f events/s), %d files of 256 KiB at most"
+              % (stream.written, drained, stream.written / drained, files))
+
+        # A burst with the default buffer: what does not fit is dropped
+        stream = telemetry.TelemetryStream(os.path.join(directory, "burst"))
+        start = time.perf_counter()
+        for i in range(DRAIN_EVENTS):
+            stream.emit(event(i))
+        emitted = time.perf_counter() - start
+        stream.close()
+    print("burst: %d events emitted in %.3f s, %d written, %d dropped"
+          % (DRAIN_EVENTS, emitted, stream.written, stream.dropped))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Visual diff: the sprite-cache dart against the polygon dart it replaces.
+
+Two checks, exiting non-zero on failure:
+  * at angles and offsets on the sprite grid the two paths must match pixel for pixel
+  * anywhere else snapping may only move edges: the painted areas must overlap
+    by at least MIN_OVERLAP (intersection over union)
+
+Requires NumPy for pygame.surfarray.
+"""
+import math
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+import render_cache
+
+COLORS = ((240, 240, 240), (0, 0, 0), (255, 107, 107))  # game_Q.DART_COLORS
+BACKGROUND = (22, 26, 54)
+SAMPLES = 1000
+MAX_ANGLE = 90  # The game aims within 30 degrees of a target in front of the dart
+MIN_OVERLAP = 0.75  # A one-pixel edge shift costs a 14px wide dart up to ~20%
+
+
+def render(x, y, angle, sprite):
+    """Draw one dart on a fresh canvas and return its pixels"""
+    canvas = pygame.Surface((200, 200))
+    canvas.fill(BACKGROUND)
+    if sprite:
+        base_x, base_y = math.floor(x), math.floor(y)
+        surface, (origin_x, origin_y) = render_cache.get_dart_sprite(angle, x - base_x, y - base_y, COLORS)
+        canvas.blit(surface, (base_x - origin_x, base_y - origin_y))
+    else:
+        render_cache.draw_dart_shape(canvas, x, y, angle, COLORS)
+    return pygame.surfarray.array3d(canvas)
+
+
+def overlap(reference, candidate):
+    """Return the intersection over union of the pixels painted in two renders"""
+    painted_reference = (reference != BACKGROUND).any(axis=2)
+    painted_candidate = (candidate != BACKGROUND).any(axis=2)
+    union = (painted_reference | painted_candidate).sum()
+    return (painted_reference & painted_candidate).sum() / union
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    rng = random.Random(11)
+    step, subpixel = render_cache.DART_ANGLE_STEP, render_cache.DART_SUBPIXEL
+
+    exact_failures = 0
+    for _ in range(SAMPLES):
+        angle = rng.randint(-round(MAX_ANGLE / step), round(MAX_ANGLE / step)) * step
+        x = 100 + rng.randint(0, subpixel - 1) / subpixel
+        y = 100 + rng.randint(0, subpixel - 1) / subpixel
+        if (render(x, y, angle, False) != render(x, y, angle, True)).any():
+            exact_failures += 1
+
+    changed = []
+    worst_overlap = 1.0
+    for _ in range(SAMPLES):
+        angle = rng.uniform(-MAX_ANGLE, MAX_ANGLE)
+        x, y = 100 + rng.random(), 100 + rng.random()
+        reference, candidate = render(x, y, angle, False), render(x, y, angle, True)
+        changed.append(int((reference != candidate).any(axis=2).sum()))
+        worst_overlap = min(worst_overlap, overlap(reference, candidate))
+
+    changed.sort()
+    print(f"on-grid mismatches:     {exact_failures} / {SAMPLES}")
+    print(f"off-grid changed pixels: median {changed[len(changed) // 2]}, max {changed[-1]}")
+    print(f"off-grid worst overlap:  {worst_overlap:.3f}")
+    pygame.quit()
+    if exact_failures or worst_overlap < MIN_OVERLAP:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Swept collision tests for the segment the dart travels in one step.
+
+Every test takes the segment from (x1, y1) at the start of the step to
+(x2, y2) at its end and returns the time of impact as a fraction t of the
+step (0 <= t <= 1), or None when nothing is hit. Because whole segments are
+tested, nothing is skipped however far the dart moves in a step.
+
+The tests are plain arithmetic on floats: no closures, no per-call
+allocations beyond the returned values. ObstacleGrid is the broad phase in
+front of them, so a step only tests the obstacles along its segment however
+many a level has.
+"""
+
+
+def segment_vs_rect(x1, y1, x2, y2, left, top, right, bottom):
+    """Return when the segment first touches the rect (edges included), or None"""
+    t_enter = 0.0
+    t_exit = 1.0
+
+    # Liang-Barsky: clip the segment against the rect's x slab, then its y slab
+    dx = x2 - x1
+    if dx == 0:
+        if x1 < left or x1 > right:
+            return None
+    else:
+        t0 = (left - x1) / dx
+        t1 = (right - x1) / dx
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_enter:
+            t_enter = t0
+        if t1 < t_exit:
+            t_exit = t1
+        if t_enter > t_exit:
+            return None
+
+    dy = y2 - y1
+    if dy == 0:
+        if y1 < top or y1 > bottom:
+            return None
+    else:
+        t0 = (top - y1) / dy
+        t1 = (bottom - y1) / dy
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_enter:
+            t_enter = t0
+        if t1 < t_exit:
+            t_exit = t1
+        if t_enter > t_exit:
+            return None
+
+    return t_enter
+
+
+def segment_vs_rects(x1, y1, x2, y2, rects):
+    """Return (t, index) of the first (x, y, width, height) rect the segment touches, or None"""
+    first = None
+    for index, (x, y, width, height) in enumerate(rects):
+        t = segment_vs_rect(x1, y1, x2, y2, x, y, x + width, y + height)
+        if t is not None and (first is None or t < first[0]):
+            first = (t, index)
+    return first
+
+
+def segment_leaves_screen(x1, y1, x2, y2, width, height):
+    """Return when the segment crosses the right, top or bottom screen edge, or None.
+
+    Like the game's own check, leaving means going past the edge: a dart
+    that ends exactly on it is still on screen.
+    """
+    first = None
+    if x2 > width:
+        first = (width - x1) / (x2 - x1)
+    if y2 < 0:
+        t = -y1 / (y2 - y1)
+        if first is None or t < first:
+            first = t
+    elif y2 > height:
+        t = (height - y1) / (y2 - y1)
+        if first is None or t < first:
+            first = t
+    if first is not None and first < 0:
+        # Already off screen when the step started
+        first = 0.0
+    return first
+
+
+def segment_vs_board(x1, y1, x2, y2, plane_x, board_y1, board_y2):
+    """Return (t, hit_y, board_y) where the segment crosses the board's plane, or None.
+
+    The board's center moves from board_y1 to board_y2 during the step;
+    board_y is where it is at the moment of impact.
+    """
+    if not ((x1 < plane_x and x2 >= plane_x) or (x1 > plane_x and x2 <= plane_x)):
+        return None
+
+    t = (plane_x - x1) / (x2 - x1)
+    hit_y = y1 + (y2 - y1) * t
+    board_y = board_y1 + (board_y2 - board_y1) * t
+    return t, hit_y, board_y
+
+
+GRID_CELL = 32  # Cell size in pixels of an ObstacleGrid
+
+
+class ObstacleGrid:
+    """Uniform grid broad phase over (x, y, width, height) rects.
+
+    Each rect is listed in every cell its area (edges included) overlaps, so
+    a segment only needs testing against the rects in the cells it passes
+    through. rects holds the rects by index, as given.
+    """
+
+    def __init__(self, rects=(), cell_size=GRID_CELL):
+        self.cell_size = cell_size
+        self.rects = []
+        self.cells = {}
+        self._seen = []  # Per rect, the last query that returned it
+        self._query = 0
+        for rect in rects:
+            self.add(rect)
+
+    def _cell_keys(self, rect):
+        """Return the (column, row) keys of the cells rect overlaps"""
+        x, y, width, height = rect
+        size = self.cell_size
+        return [(column, row)
+                for column in range(int(x // size), int((x + width) // size) + 1)
+                for row in range(int(y // size), int((y + height) // size) + 1)]
+
+    def add(self, rect):
+        """Index a new rect and return its index"""
+        index = len(self.rects)
+        self.rects.append(rect)
+        self._seen.append(0)
+        for key in self._cell_keys(rect):
+            self.cells.setdefault(key, []).append(index)
+        return index
+
+    def move(self, index, rect):
+        """Replace the rect at index, updating only the cells it left and entered"""
+        old_keys = self._cell_keys(self.rects[index])
+        new_keys = self._cell_keys(rect)
+        self.rects[index] = rect
+        if old_keys == new_keys:
+            return
+        for key in old_keys:
+            cell = self.cells[key]
+            cell.remove(index)
+            if not cell:
+                del self.cells[key]
+        for key in new_keys:
+            self.cells.setdefault(key, []).append(index)
+
+    def query(self, x1, y1, x2, y2):
+        """Return the indices of the rects in the cells the segment passes through"""
+        if x1 > x2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        size = self.cell_size
+        cells = self.cells
+        seen = self._seen
+        self._query += 1
+        query = self._query
+        found = []
+
+        # Walk the segment one column at a time, taking the rows its y spans within each
+        slope = (y2 - y1) / (x2 - x1) if x2 != x1 else 0.0
+        first_column = int(x1 // size)
+        last_column = int(x2 // size)
+        for column in range(first_column, last_column + 1):
+            if column == first_column:
+                low = y1
+            else:
+                low = y1 + slope * (column * size - x1)
+            if column == last_column:
+                high = y2
+            else:
+                high = y1 + slope * ((column + 1) * size - x1)
+            if low > high:
+                low, high = high, low
+            # Widened by a hair so rounding cannot drop a rect touching a cell edge
+            for row in range(int((low - 1e-6) // size), int((high + 1e-6) // size) + 1):
+                cell = cells.get((column, row))
+                if cell is not None:
+                    for index in cell:
+                        if seen[index] != query:
+                            seen[index] = query
+                            found.append(index)
+        return found
+
+
+def segment_vs_grid(x1, y1, x2, y2, grid):
+    """Like segment_vs_rects, testing only the grid's rects along the segment"""
+    first = None
+    rects = grid.rects
+    for index in grid.query(x1, y1, x2, y2):
+        x, y, width, height = rects[index]
+        t = segment_vs_rect(x1, y1, x2, y2, x, y, x + width, y + height)
+        # Ties go to the lowest index, as in segment_vs_rects
+        if t is not None and (first is None or t < first[0] or (t == first[0] and index < first[1])):
+            first = (t, index)
+    return first
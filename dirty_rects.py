@@ -0,0 +1,106 @@
+import pygame
+
+
+def merge_rects(rects, margin=4):
+    """Merge overlapping (or nearly touching) rects into a short list"""
+    merged = []
+    for rect in rects:
+        if rect.w <= 0 or rect.h <= 0:
+            continue
+        rect = rect.copy()
+        # Keep absorbing neighbours until this rect stops growing
+        absorbed = True
+        while absorbed:
+            absorbed = False
+            for other in merged:
+                if rect.inflate(margin, margin).colliderect(other):
+                    rect.union_ip(other)
+                    merged.remove(other)
+                    absorbed = True
+                    break
+        merged.append(rect)
+    return merged
+
+
+class DamageTracker:
+    """Collects the screen regions that changed since the previous frame.
+
+    Each frame, every visible element reports its rect plus a key describing
+    its content. An element whose rect or key differs from the last frame
+    damages both its old and new rect; an element that stops being reported
+    damages its old rect. A scene change or an explicit invalidate() asks
+    for a full redraw instead.
+
+    Elements drawn with pygame.draw primitives are reported as atomic: their
+    outlines rasterise differently when a clip rect cuts through them, so any
+    damage touching one grows to cover the whole element.
+    """
+
+    def __init__(self, screen_rect, max_coverage=0.5):
+        self.screen_rect = pygame.Rect(screen_rect)
+        self.max_coverage = max_coverage
+        self._scene = None
+        self._full = True
+        self._previous = {}
+        self._current = {}
+        self._atomic = []
+        self._dirty = []
+
+    def invalidate(self):
+        """Force the next frame to be redrawn and flipped in full"""
+        self._full = True
+
+    def begin_frame(self, scene):
+        """Start collecting reports for a frame of the given scene"""
+        if scene != self._scene:
+            self._scene = scene
+            self._full = True
+        self._current = {}
+        self._atomic = []
+        self._dirty = []
+
+    def report(self, name, rect, key=None, atomic=False):
+        """Report where an element is drawn this frame and what it shows"""
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        state = (rect, key)
+        self._current[name] = state
+        if atomic:
+            self._atomic.append(rect)
+
+        previous = self._previous.get(name)
+        if previous is None:
+            self._dirty.append(rect)
+        elif previous != state:
+            self._dirty.append(previous[0])
+            self._dirty.append(rect)
+
+    def end_frame(self):
+        """Return the rects to recomposite, or None when a full redraw is due"""
+        for name, (rect, key) in self._previous.items():
+            if name not in self._current:
+                self._dirty.append(rect)
+        self._previous = self._current
+
+        if self._full:
+            self._full = False
+            return None
+
+        rects = merge_rects(self._dirty)
+
+        # Never let a clip edge cut through an atomic element
+        grown = True
+        while grown:
+            grown = False
+            for element in self._atomic:
+                for rect in rects:
+                    if rect.colliderect(element) and not rect.contains(element):
+                        rect.union_ip(element)
+                        grown = True
+            if grown:
+                rects = merge_rects(rects)
+
+        damaged_area = sum(rect.w * rect.h for rect in rects)
+        if damaged_area > self.max_coverage * self.screen_rect.w * self.screen_rect.h:
+            # Clipped passes stop paying off once most of the screen changed
+            return None
+        return rects
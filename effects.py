@@ -0,0 +1,130 @@
+"""Pooled visual effects.
+
+EffectPool keeps every live particle in fixed-size arrays (position,
+velocity, remaining life, phase and style) allocated once up front. Spawning
+fills the next free slot and a dead particle is swapped out for the last
+live one, so no objects are created while effects run. Each particle is
+drawn by blitting its style's cached sprite, only over the area it covers.
+
+Life and phase count animation ticks like the game's old effect timer: a
+particle spawned with life n is shown for n ticks, its phase counting down
+from n to 1, then disappears.
+"""
+from array import array
+
+import pygame
+
+EFFECT_POOL_SIZE = 512
+
+
+class EffectPool:
+    """Fixed-capacity, array-backed particle pool"""
+
+    def __init__(self, capacity=EFFECT_POOL_SIZE):
+        self.capacity = capacity
+        self.x = array("d", bytes(8 * capacity))
+        self.y = array("d", bytes(8 * capacity))
+        self.vx = array("d", bytes(8 * capacity))
+        self.vy = array("d", bytes(8 * capacity))
+        self.life = array("i", bytes(4 * capacity))
+        self.phase = array("i", bytes(4 * capacity))  # Life when last advanced, 0 until then
+        self.style = array("i", bytes(4 * capacity))  # Index into the pool's sprites
+        self.count = 0  # Live particles occupy slots 0 .. count - 1
+        self.dropped = 0  # Spawns refused because the pool was full
+        self.sprites = []  # Per style: (sprite, (origin x, origin y))
+        self.bounds = pygame.Rect(0, 0, 0, 0)  # Area found by the last covered()
+
+    def add_style(self, sprite, origin):
+        """Register a sprite particles can be drawn with; return its style index"""
+        self.sprites.append((sprite, origin))
+        return len(self.sprites) - 1
+
+    def spawn(self, x, y, style, life, vx=0.0, vy=0.0):
+        """Start a particle; returns False (and drops it) if the pool is full"""
+        i = self.count
+        if i == self.capacity:
+            self.dropped += 1
+            return False
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.life[i] = life
+        self.phase[i] = 0
+        self.style[i] = style
+        self.count = i + 1
+        return True
+
+    def _remove(self, i):
+        """Drop particle i by moving the last live particle into its slot"""
+        last = self.count - 1
+        if i != last:
+            self.x[i] = self.x[last]
+            self.y[i] = self.y[last]
+            self.vx[i] = self.vx[last]
+            self.vy[i] = self.vy[last]
+            self.life[i] = self.life[last]
+            self.phase[i] = self.phase[last]
+            self.style[i] = self.style[last]
+        self.count = last
+
+    def update(self):
+        """Advance every particle by one animation tick"""
+        x, y, vx, vy, life, phase = self.x, self.y, self.vx, self.vy, self.life, self.phase
+        i = 0
+        while i < self.count:
+            if life[i] <= 0:
+                self._remove(i)
+                continue
+            phase[i] = life[i]
+            life[i] -= 1
+            x[i] += vx[i]
+            y[i] += vy[i]
+            i += 1
+
+    def clear(self):
+        """Remove every particle"""
+        self.count = 0
+
+    def max_phase(self):
+        """Return the highest phase of any shown particle (0 if none are shown)"""
+        highest = 0
+        phase = self.phase
+        for i in range(self.count):
+            if phase[i] > highest:
+                highest = phase[i]
+        return highest
+
+    def draw(self, surface):
+        """Blit every shown particle with its style's sprite"""
+        x, y, phase, style, sprites = self.x, self.y, self.phase, self.style, self.sprites
+        for i in range(self.count):
+            if phase[i] > 0:
+                sprite, (origin_x, origin_y) = sprites[style[i]]
+                surface.blit(sprite, (int(x[i]) - origin_x, int(y[i]) - origin_y))
+
+    def covered(self):
+        """Return the area draw() covers (pool.bounds, updated in place)"""
+        left = top = 1 << 30
+        right = bottom = -(1 << 30)
+        x, y, phase, style, sprites = self.x, self.y, self.phase, self.style, self.sprites
+        for i in range(self.count):
+            if phase[i] <= 0:
+                continue
+            sprite, (origin_x, origin_y) = sprites[style[i]]
+            blit_x = int(x[i]) - origin_x
+            blit_y = int(y[i]) - origin_y
+            left = min(left, blit_x)
+            top = min(top, blit_y)
+            right = max(right, blit_x + sprite.get_width())
+            bottom = max(bottom, blit_y + sprite.get_height())
+        if right < left:
+            self.bounds.update(0, 0, 0, 0)
+        else:
+            self.bounds.update(left, top, right - left, bottom - top)
+        return self.bounds
+
+    def key(self):
+        """Return what draw() shows: each shown particle's pixel position and style"""
+        x, y, phase, style = self.x, self.y, self.phase, self.style
+        return tuple((int(x[i]), int(y[i]), style[i]) for i in range(self.count) if phase[i] > 0)
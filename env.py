@@ -0,0 +1,312 @@
+"""Reset/step environments for training and benchmarking automatic aimers.
+
+Every step is one simulation tick (simulation.tick_ms). An action is an aim
+offset in degrees, clipped to [angle_min, angle_max] around the perfect
+angle (the one at the bullseye), plus whether to throw. The offset only
+steers the dart while it waits to be thrown; once it is released it flies
+on its own until it lands. The reward is the points the step scored. The
+board's motion, Level 3's obstacles and its timer all work as in the game.
+
+DartEnv steps one game through simulation.Simulation. VectorDartEnv steps N
+independent games in one call, with their state held in NumPy arrays, and
+plays exactly like N DartEnvs. ProcessVectorEnv spreads the games over
+worker processes. Both vector environments reset each game as it ends, the
+way gym's vector environments do.
+
+Observations are float arrays laid out as OBSERVATION_FIELDS. time_left is
+-1 on untimed levels.
+
+    import env
+
+    games = env.VectorDartEnv(4096, level=3)
+    obs, info = games.reset()
+    obs, rewards, terminated, truncated, info = games.step(offsets, throws)
+"""
+import multiprocessing
+
+import numpy as np
+
+import batch_sim
+import levels
+import simulation
+from simulation import angle_min, angle_max, dart_x, dart_y, tick_ms
+
+OBSERVATION_FIELDS = ("center_y", "move_direction", "perfect_angle", "aim_offset", "dart_in_motion",
+                      "dart_x", "dart_y", "throws_left", "time_left", "score")
+MAX_EPISODE_STEPS = 3600  # A game that has not ended after this many ticks (a minute) is truncated
+
+
+class DartEnv:
+    """One game behind a reset/step interface"""
+
+    def __init__(self, level=1, max_steps=MAX_EPISODE_STEPS):
+        self.level = level
+        self.max_steps = max_steps
+        self.sim = simulation.Simulation(level)
+        self.steps = 0
+
+    def observation(self):
+        """Return the game's state as an OBSERVATION_FIELDS array"""
+        state = self.sim.state
+        time_left = self.sim.remaining_time() if state.level.time_limit else -1
+        return np.array([state.center_y, state.move_direction, state.perfect_angle,
+                         state.dart_angle - state.perfect_angle, state.dart_in_motion,
+                         state.dart_pos_x, state.dart_pos_y, state.throws_left, time_left, state.score], dtype=float)
+
+    def reset(self):
+        """Start a new game; return (observation, info)"""
+        self.sim.reset(self.level)
+        self.steps = 0
+        return self.observation(), {}
+
+    def step(self, offset, throw=False):
+        """Aim offset degrees from the perfect angle, throw if asked and advance one tick.
+
+        Returns (observation, reward, terminated, truncated, info); info holds
+        the step's ThrowEvents.
+        """
+        state = self.sim.state
+        if not state.dart_in_motion and not state.game_over:
+            state.dart_angle = state.perfect_angle + min(max(offset, angle_min), angle_max)
+        events = self.sim.step(simulation.Inputs(throw=bool(throw)), tick_ms)
+        self.steps += 1
+
+        terminated = state.game_over
+        truncated = not terminated and self.steps >= self.max_steps
+        return self.observation(), sum(event.points for event in events), terminated, truncated, {"events": events}
+
+
+def board_cycle(level):
+    """Return the board's per-phase (center_y, move_direction, perfect angle) arrays.
+
+    Phase n is the board n steps after the level is reset, from the level's
+    track. Its motion ends up repeating, so the tables stop there; the second
+    value returned is the phase the step after the last one wraps back to.
+    """
+    sim = simulation.Simulation(level)
+    state = sim.state
+    if state.level.motion == "static":
+        positions, loop = ((state.center_y, state.move_direction),), 0
+    else:
+        positions, loop = state.level.track.positions, state.level.track.loop
+    perfect_angles = []
+    for state.center_y, state.move_direction in positions:
+        perfect_angles.append(sim.calculate_perfect_angle())
+    centers, directions = zip(*positions)
+    tables = np.array(centers, dtype=float), np.array(directions, dtype=float), np.array(perfect_angles)
+    return tables, loop
+
+
+class VectorDartEnv:
+    """num_envs independent games of one level, stepped together (requires NumPy)"""
+
+    def __init__(self, num_envs, level=1, max_steps=MAX_EPISODE_STEPS):
+        self.num_envs = num_envs
+        self.level = levels.get(level)
+        self.max_steps = max_steps
+        (self.centers, self.directions, self.perfect_angles), self.wrap_phase = board_cycle(level)
+
+        # Per-game state, one array entry per game
+        self.phase = np.zeros(num_envs, dtype=np.int64)  # Index into the board tables
+        self.dart_angle = np.zeros(num_envs)
+        self.in_motion = np.zeros(num_envs, dtype=bool)
+        self.pos_x = np.zeros(num_envs)
+        self.pos_y = np.zeros(num_envs)
+        self.vx = np.zeros(num_envs)  # Per-step velocity of a dart in flight
+        self.vy = np.zeros(num_envs)
+        self.throws_left = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.timer_started = np.zeros(num_envs, dtype=bool)
+        self.level_time_ms = np.zeros(num_envs)
+        self.game_over = np.zeros(num_envs, dtype=bool)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+    def _reset_games(self, games):
+        """Put the selected games (a mask or index array) back at the start of the level"""
+        self.phase[games] = 0
+        self.dart_angle[games] = 270  # Keep facing up initially
+        self.in_motion[games] = False
+        self.pos_x[games] = dart_x
+        self.pos_y[games] = dart_y
+        self.throws_left[games] = self.level.throws
+        self.score[games] = 0
+        self.timer_started[games] = False
+        self.level_time_ms[games] = 0
+        self.game_over[games] = False
+        self.steps[games] = 0
+
+    def observation(self):
+        """Return every game's state as a (num_envs, len(OBSERVATION_FIELDS)) array"""
+        obs = np.empty((self.num_envs, len(OBSERVATION_FIELDS)))
+        perfect = self.perfect_angles[self.phase]
+        obs[:, 0] = self.centers[self.phase]
+        obs[:, 1] = self.directions[self.phase]
+        obs[:, 2] = perfect
+        obs[:, 3] = self.dart_angle - perfect
+        obs[:, 4] = self.in_motion
+        obs[:, 5] = self.pos_x
+        obs[:, 6] = self.pos_y
+        obs[:, 7] = self.throws_left
+        time_limit = self.level.time_limit
+        obs[:, 8] = np.maximum(0, time_limit - self.level_time_ms) if time_limit else -1
+        obs[:, 9] = self.score
+        return obs
+
+    def reset(self):
+        """Start every game over; return (observations, info)"""
+        self._reset_games(slice(None))
+        return self.observation(), {}
+
+    def step(self, offsets, throws):
+        """Advance every game one tick; each takes an aim offset and whether to throw.
+
+        Returns (observations, rewards, terminated, truncated, info) arrays.
+        Games that ended are reset, so their observation starts the next
+        game; info["final_score"] holds the score each ended game finished
+        with (0 for the others) and info["outcome"] the batch_sim outcome
+        code of any throw a step resolved.
+        """
+        level = self.level
+        offsets = np.clip(np.broadcast_to(np.asarray(offsets, dtype=float), (self.num_envs,)), angle_min, angle_max)
+        throws = np.broadcast_to(np.asarray(throws, dtype=bool), (self.num_envs,))
+        rewards = np.zeros(self.num_envs, dtype=np.int64)
+        outcome = np.zeros(self.num_envs, dtype=np.int8)
+
+        # A waiting dart is pointed relative to the perfect angle
+        waiting = ~self.in_motion & ~self.game_over
+        self.dart_angle[waiting] = self.perfect_angles[self.phase[waiting]] + offsets[waiting]
+
+        thrown = np.nonzero(throws & waiting & (self.throws_left > 0))[0]
+        if thrown.size:
+            self.in_motion[thrown] = True
+            self.pos_x[thrown] = dart_x
+            self.pos_y[thrown] = dart_y
+            self.throws_left[thrown] -= 1
+            # The angle is fixed in flight, so the per-step velocity is worked out once
+            self.vx[thrown], self.vy[thrown] = batch_sim.dart_velocity(self.dart_angle[thrown])
+
+        # On timed levels, the timer starts with the first step of the level
+        if level.time_limit:
+            self.level_time_ms[self.timer_started] += tick_ms
+            self.timer_started[:] = True
+
+        board_start = self.centers[self.phase]
+        self.phase += 1
+        self.phase[self.phase == len(self.centers)] = self.wrap_phase
+
+        timer_checked = np.ones(self.num_envs, dtype=bool)
+        flying = np.nonzero(self.in_motion)[0]
+        if flying.size:
+            prev_x, prev_y = self.pos_x[flying], self.pos_y[flying]
+            new_x = prev_x + self.vx[flying]
+            new_y = prev_y + self.vy[flying]
+            self.pos_x[flying] = new_x
+            self.pos_y[flying] = new_y
+
+            kind, hit_y, points = batch_sim.sweep_segments(prev_x, prev_y, new_x, new_y, board_start[flying],
+                                                           self.centers[self.phase[flying]], level)
+            landed = kind != batch_sim.UNRESOLVED
+            if landed.any():
+                games = flying[landed]
+                kind = kind[landed]
+                self.score[games] += points[landed]
+                rewards[games] = points[landed]
+                outcome[games] = kind
+
+                # Reset the dart and check whether that was the game's last throw
+                self.in_motion[games] = False
+                self.pos_x[games] = dart_x
+                self.pos_y[games] = dart_y
+                over = self.throws_left[games] <= 0
+                if level.time_limit:
+                    over |= self.timer_started[games] & (self.level_time_ms[games] >= level.time_limit)
+                self.game_over[games] |= over
+
+                # A dart stopped by an obstacle ends the step before the timer check
+                timer_checked[games[kind == batch_sim.OBSTACLE]] = False
+
+        # End a timed level once its timer runs out
+        if level.time_limit:
+            self.game_over |= timer_checked & (self.level_time_ms >= level.time_limit)
+
+        self.steps += 1
+        terminated = self.game_over.copy()
+        truncated = ~terminated & (self.steps >= self.max_steps)
+        ended = terminated | truncated
+        final_score = np.where(ended, self.score, 0)
+        if ended.any():
+            self._reset_games(ended)
+        return self.observation(), rewards, terminated, truncated, {"final_score": final_score, "outcome": outcome}
+
+
+def _worker(connection, num_envs, level, level_path, max_steps):
+    """Run a VectorDartEnv in a worker process, serving ProcessVectorEnv's commands"""
+    if level_path != levels.path():
+        levels.use(level_path)
+    games = VectorDartEnv(num_envs, level, max_steps)
+    while True:
+        command, args = connection.recv()
+        if command == "step":
+            connection.send(games.step(*args))
+        elif command == "reset":
+            connection.send(games.reset())
+        elif command == "close":
+            connection.close()
+            return
+
+
+def _concatenate(results):
+    """Join the workers' step or reset results into one result for every game"""
+    joined = []
+    for parts in zip(*results):
+        if isinstance(parts[0], dict):
+            joined.append({key: np.concatenate([part[key] for part in parts]) for key in parts[0]})
+        else:
+            joined.append(np.concatenate(parts))
+    return tuple(joined)
+
+
+class ProcessVectorEnv:
+    """VectorDartEnv split across worker processes, one slice of the games each"""
+
+    def __init__(self, num_envs, level=1, workers=None, max_steps=MAX_EPISODE_STEPS):
+        workers = min(workers or multiprocessing.cpu_count(), num_envs)
+        self.num_envs = num_envs
+        # Each worker takes a contiguous slice of the games
+        self.bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        self.connections = []
+        self.processes = []
+        for i in range(workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, daemon=True,
+                                              args=(child, int(self.bounds[i + 1] - self.bounds[i]), level,
+                                                    levels.path(), max_steps))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def reset(self):
+        """Start every game over; return (observations, info)"""
+        for connection in self.connections:
+            connection.send(("reset", ()))
+        return _concatenate([connection.recv() for connection in self.connections])
+
+    def step(self, offsets, throws):
+        """VectorDartEnv.step() across the workers"""
+        offsets = np.broadcast_to(np.asarray(offsets, dtype=float), (self.num_envs,))
+        throws = np.broadcast_to(np.asarray(throws, dtype=bool), (self.num_envs,))
+        for i, connection in enumerate(self.connections):
+            games = slice(self.bounds[i], self.bounds[i + 1])
+            connection.send(("step", (offsets[games], throws[games])))
+        return _concatenate([connection.recv() for connection in self.connections])
+
+    def close(self):
+        """Stop the worker processes"""
+        for connection in self.connections:
+            connection.send(("close", ()))
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
@@ -2,14 +2,25 @@ import pygame
 import sys
 import math
 import random
+import sqlite3
+import time
+from functools import partial
 
-# Initialize Pygame
-pygame.init()
+import dirty_rects
+import effects
+import leaderboard
+import levels
+import popups
+import profiler
+import render_cache
+import replay
+import simulation
+import telemetry
+import warmup
+from simulation import WIDTH, HEIGHT, dart_x, dart_y
 
-# Screen dimensions
-WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Dart Throwing Game")
+# The display is opened by init_display() so importing this module stays headless
+screen = None
 
 # Colors - Modern Vibrant Palette
 WHITE = (255, 255, 255)
@@ -23,472 +34,333 @@ DARTBOARD_CENTER = (235, 77, 75)  # Tomato red #eb4d4b
 BUTTON_GREEN = (85, 239, 196)  # Mint green #55efc4
 BUTTON_HOVER = (129, 236, 236) # Light cyan #81ecec
 TEXT_HIGHLIGHT = (253, 203, 110) # Light orange #fdcb6e
+BOARD_PALETTE = (DARTBOARD_OUTER, DARTBOARD_MIDDLE, DARTBOARD_CENTER, BLACK, (BLACK, BLACK, WHITE))  # Rings, outline, labels
+DART_COLORS = ((240, 240, 240), BLACK, UI_ACCENT)  # White body, black outline, coral red fins
 
-# Game state
-current_level = 1
-throws_left = 3
-score = 0
-game_over = False
+# Background layer palettes (base color plus per-channel gradient offsets)
+BACKGROUND_PALETTE = (BACKGROUND, (5, 8, 15))  # Slightly lighter navy at the top
+CELEBRATION_PALETTE = ((0, 0, 20), (0, 0, 10), (0, 0, 0, 100))  # Dark to lighter blue bands
+
+# Game rules and physics run in the headless simulation; drawing reads its state
+sim = simulation.Simulation()
+state = sim.state
+
+# UI state
 show_helper = True
 helper_timer = 180
 game_started = False  # Track if the game has started
 
 # Celebration variables
 celebration_active = False
-celebration_start_time = 0
+celebration_start_time = 0  # Session time in ms, from the frame clock
 
-# Level 3 timer variables
-level3_time_limit = 20 * 1000  # 20 seconds in milliseconds
-level3_start_time = 0
-level3_time_remaining = level3_time_limit
-# Level 1 specific variables
-level1_center_x = WIDTH - 180
-level1_center_y = HEIGHT // 2
-level1_outer_radius = 100
-level1_middle_radius = 55
-level1_bullseye_radius = 20
+# Session time in milliseconds, advanced by each frame's dt (live or replayed)
+session_ms = 0
 
-# Level 2 specific variables
-level2_center_x = WIDTH - 180
-level2_center_y = HEIGHT // 2
-level2_outer_radius = 100
-level2_middle_radius = 55
-level2_bullseye_radius = 20
-level2_move_speed = 3
-level2_move_direction = 1
-level2_y_min = 150
-level2_y_max = HEIGHT - 150
+# Replay recorder for the current session, if it is being recorded
+recorder = None
 
-# Level 3 specific variables
-level3_center_x = WIDTH - 180
-level3_center_y = HEIGHT // 2
-level3_outer_radius = 100
-level3_middle_radius = 55
-level3_bullseye_radius = 20
-level3_move_speed = 3
-level3_move_direction = 1
-level3_y_min = 150
-level3_y_max = HEIGHT - 150
+# Leaderboard: each finished level is stored by a background writer (see leaderboard.py)
+LEADERBOARD_PATH = leaderboard.DB_PATH  # None keeps no leaderboard
+player_name = "Player"
+scores = None  # The open Leaderboard
+score_session = None  # This session's id in it; None while replaying
+level_recorded = False  # Whether the current level's end was handled
+top_scores = ()  # The ended level's best (player, score, this result?) rows, for the game over screen
 
-# Obstacle properties
-obstacle_width = 35  # Slightly wider obstacles
-obstacle_height = 160  # Taller obstacles
-obstacle_count = 2  # Two obstacles
-obstacle_min_y = 100  # Minimum y position
-obstacle_max_y = HEIGHT - 100 - obstacle_height  # Maximum y position
+# Per-throw telemetry, written to compressed NDJSON by a background thread (see telemetry.py)
+TELEMETRY_DIR = None  # None streams no telemetry
+throw_telemetry = None  # The open TelemetryStream; None while replaying
 
-# Current level properties (will be set based on level)
-center_x = level1_center_x
-center_y = level1_center_y
-outer_radius = level1_outer_radius
-middle_radius = level1_middle_radius
-bullseye_radius = level1_bullseye_radius
+# Where the board and the dart are drawn this frame, between the last two ticks
+tick_start = None  # (center_y, dart_in_motion, dart_pos_x, dart_pos_y) before the last tick
+view_center_y = state.center_y
+view_dart_x = dart_x
+view_dart_y = dart_y
 
-# Dart properties
-dart_x = 150
-dart_y = HEIGHT // 2
-dart_size = 8  # Increased from 6
-dart_angle = 270  # Initial angle to 270 degrees (facing up/north)
-angle_min = -30
-angle_max = 30
-angle_change_speed = 1
+# Persistent overlay the trajectories are drawn into, redrawn only when they change
+trajectory_overlay = None
+trajectory_overlay_key = None
+trajectory_overlay_rect = None
 
-# Dart motion properties
-dart_speed = 8.8  # Optimized dart speed
-dart_in_motion = False
-dart_pos_x = dart_x
-dart_pos_y = dart_y
+# Hit effects run as particles in a preallocated pool, drawn from cached sprites
+HIT_EFFECT_TICKS = 15  # Reduced from 30 to make the effect briefer
+hit_effects = effects.EffectPool()
+hit_effect_styles = {}  # Points -> pool style
 
-# Store previous throws' trajectories
-previous_trajectories = []  # Each element is (angle, hit_x, hit_y, hit_center_y)
+# Score popups play pre-baked frames, several at once
+score_popups = popups.ScorePopups()
 
 # Button properties
 throw_button = pygame.Rect(50, HEIGHT - 80, 120, 50)
+start_button = pygame.Rect(WIDTH//2 - 100, 490, 200, 60)
+
+# Overlay screen buttons as (action, rect, color, hover color, label, text size).
+# Labels are formatted with the level and previous level numbers. Input
+# handling hit-tests these layouts directly, without drawing anything.
+GREEN_BUTTON_COLORS = ((50, 150, 70), (60, 180, 80))
+CLEARED_BUTTONS = (
+    ("next_level", pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 50, 180, 60), *GREEN_BUTTON_COLORS, "Next Level", 36),
+    # Restart button (smaller and below)
+    ("restart", pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 120, 180, 40), (80, 80, 80), (100, 100, 100),
+     "Restart Level {level}", 28),
+)
+TRY_AGAIN_BUTTON = ("restart", pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 70, 180, 60), *GREEN_BUTTON_COLORS, "Try Again", 36)
+FAILED_BUTTONS = (
+    TRY_AGAIN_BUTTON,
+    ("prev_level", pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 140, 180, 40), (80, 80, 150), (100, 100, 180),
+     "Back to Level {previous}", 28),
+)
+FAILED_FIRST_LEVEL_BUTTONS = (
+    TRY_AGAIN_BUTTON,
+    ("quit", pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 140, 180, 40), (150, 50, 50), (180, 60, 60), "Quit Game", 28),
+)
+CELEBRATION_BUTTONS = (
+    ("restart_all", pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 150, 180, 60), *GREEN_BUTTON_COLORS, "Play Again", 36),
+    ("quit", pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 220, 180, 40), (150, 50, 50), (180, 60, 60), "Quit Game", 28),
+)
 
 # Clock for controlling frame rate
 clock = pygame.time.Clock()
 FPS = 60
 
-# Obstacle list
-obstacles = []
-# Basic drawing functions
-def draw_rounded_rect(surface, color, rect, radius=15):
-    """Draw a rounded rectangle"""
-    rect = pygame.Rect(rect)
-    color = pygame.Color(*color)
-    alpha = color.a
-    color.a = 0
-    pos = rect.topleft
-    rect.topleft = 0, 0
-    rectangle = pygame.Surface(rect.size, pygame.SRCALPHA)
+# Darts are blitted from pre-rotated sprites instead of drawn as polygons
+DART_SPRITES = True
 
-    circle = pygame.Surface([min(rect.size) * 3] * 2, pygame.SRCALPHA)
-    pygame.draw.ellipse(circle, (0, 0, 0), circle.get_rect(), 0)
-    circle = pygame.transform.smoothscale(circle, [int(min(rect.size) * radius * 2)] * 2)
+# Dirty-rect rendering: only damaged regions are recomposited and pushed
+DIRTY_RECT_RENDERING = True
+screen_damage = dirty_rects.DamageTracker((0, 0, WIDTH, HEIGHT))
 
-    radius = rectangle.blit(circle, (0, 0))
-    radius.bottomright = rect.bottomright
-    rectangle.blit(circle, radius)
-    radius.topright = rect.topright
-    rectangle.blit(circle, radius)
-    radius.bottomleft = rect.bottomleft
-    rectangle.blit(circle, radius)
+# Frame profiler (F3 toggles it and its overlay, F4 exports the frames as NDJSON)
+PROFILE_EXPORT_PATH = "frame_profile.ndjson"
+PROFILER_REFRESH_FRAMES = 30  # Overlay text is rebuilt this often
+profiler_overlay = None
+profiler_overlay_age = 0
 
-    rectangle.fill((0, 0, 0), rect.inflate(-radius.w, 0))
-    rectangle.fill((0, 0, 0), rect.inflate(0, -radius.h))
+# Lazy startup: only the subsystems the game uses are initialised, the window
+# opens straight onto the start screen and the assets of the later screens
+# are built in the spare time of the first frames
+LAZY_STARTUP = True  # False initialises everything and warms every cache before the first frame
+startup_warmup = warmup.Warmup()
+startup_marks = {}  # "window", "first_frame", "interactive" -> time.perf_counter()
 
-    rectangle.fill(color, special_flags=pygame.BLEND_RGBA_MAX)
-    rectangle.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MIN)
+def init_display():
+    """Initialize Pygame and open the game window"""
+    global screen
+    
+    if LAZY_STARTUP:
+        # No audio, joysticks or the like; the mixer alone can take longer to open than the window
+        pygame.display.init()
+        pygame.font.init()
+    else:
+        pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Dart Throwing Game")
+    startup_marks["window"] = time.perf_counter()
+    
+    # Queue the boards, popups, effects and panels of the game and game over screens
+    startup_warmup.add(warmup_jobs())
+    if not LAZY_STARTUP:
+        startup_warmup.finish()
+    return screen
 
-    surface.blit(rectangle, pos)
+def warmup_jobs():
+    """Return builders for the assets drawn after the start screen, soonest needed first"""
+    jobs = [partial(render_cache.get_rounded_rect, start_button.size, (60, 180, 80)),
+            partial(render_cache.get_rounded_rect, (180, 120), (40, 45, 75, 200)),
+            partial(render_cache.get_rounded_rect, (420, 100), (20, 20, 40, 180)),
+            partial(render_cache.get_rounded_rect, throw_button.size, BUTTON_GREEN),
+            partial(render_cache.get_rounded_rect, throw_button.size, BUTTON_HOVER),
+            partial(render_cache.render_text, "THROW", 32, WHITE),
+            partial(render_cache.render_text, "Throws:", 28, WHITE)]
+    
+    # Every level's board (at both vertical label shifts a moving board lands on), popups and hit effects
+    number = 1
+    while levels.has_level(number):
+        level = levels.get(number)
+        radii = (level.outer_radius, level.middle_radius, level.bullseye_radius)
+        jobs += [partial(render_cache.get_board_sprite, radii, BOARD_PALETTE, shift) for shift in ((0, 0), (0, 1))]
+        jobs += [partial(popups.frames, points) for points in level.scoring.ring_points if points > 0]
+        jobs += [partial(hit_effect_style, points) for points in level.scoring.ring_points]
+        jobs.append(partial(render_cache.render_text, f"Level {number}", 28, TEXT_HIGHLIGHT))
+        if level.goal is not None:
+            jobs.append(partial(render_cache.render_text, f"Goal: {level.goal} pts", 28, BUTTON_GREEN))
+        number += 1
+    
+    # The game over and celebration screens' backdrops, panels and buttons
+    jobs += [partial(render_cache.get_layer, "celebration", (WIDTH, HEIGHT), CELEBRATION_PALETTE),
+             partial(render_cache.get_rounded_rect, (360, 300), (40, 40, 60, 230)),
+             partial(render_cache.get_rounded_rect, (360, 60), (80, 20, 20, 230)),
+             partial(render_cache.get_rounded_rect, (180, 300), (40, 40, 60, 230))]
+    for buttons in (CLEARED_BUTTONS, (TRY_AGAIN_BUTTON,), FAILED_BUTTONS, FAILED_FIRST_LEVEL_BUTTONS, CELEBRATION_BUTTONS):
+        for action, button, color, hover_color, label, text_size in buttons:
+            jobs += [partial(render_cache.get_rounded_rect, button.size, color),
+                     partial(render_cache.get_rounded_rect, button.size, hover_color)]
+    return jobs
 
-def draw_hit_effect(hit_x, hit_y, points):
-    """Draw a more visible visual effect when the dart hits the dartboard"""
-    effect_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    
-    if points == 50:
-        # Bullseye hit - bright white/yellow flash
-        color = (255, 255, 200, 220)
-        max_radius = 50
-        rings = 8
-    elif points == 30:
-        # Middle ring hit - cyan flash
-        color = (100, 255, 255, 200)
-        max_radius = 40
-        rings = 6
-    elif points == 10:
-        # Outer ring hit - orange flash
-        color = (255, 180, 100, 180)
-        max_radius = 30
-        rings = 5
-    else:
-        # Miss or obstacle hit - red flash
-        color = (255, 80, 80, 180)
-        max_radius = 25
-        rings = 4
-    
-    # Draw multiple rings for a more dramatic effect
-    for i in range(rings):
-        r = max_radius * (1 - i/rings)
-        ring_width = max(2, int(r/5))
-        alpha = int(200 * (1 - i/rings))
-        pygame.draw.circle(effect_surface, (color[0], color[1], color[2], alpha), 
-                          (int(hit_x), int(hit_y)), int(r), ring_width)
-    
-    # Add a bright center flash
-    center_radius = max_radius // 4
-    pygame.draw.circle(effect_surface, (255, 255, 255, 200), 
-                      (int(hit_x), int(hit_y)), center_radius)
-    
-    return effect_surface
+def warm_up():
+    """Spend the rest of the frame on queued assets; note the startup milestones"""
+    startup_marks.setdefault("first_frame", time.perf_counter())
+    if not startup_warmup.done():
+        startup_warmup.step()
+    if startup_warmup.done():
+        startup_marks.setdefault("interactive", time.perf_counter())
 
-def draw_score_popup(hit_x, hit_y, points):
-    """Draw a more visible score popup at the hit location"""
-    if points > 0:
-        # Create a larger, more visible font
-        font = pygame.font.SysFont(None, 48)
-        
-        # Choose color based on points
+# Basic drawing functions
+def draw_rounded_rect(surface, color, rect, radius=15):
+    """Draw a rounded rectangle"""
+    # Each distinct (size, color, radius) panel is built once and reused
+    rect = pygame.Rect(rect)
+    surface.blit(render_cache.get_rounded_rect(rect.size, color, radius), rect.topleft)
+
+def hit_effect_style(points):
+    """Return the effect pool style for a hit worth points, registering it on first use"""
+    style = hit_effect_styles.get(points)
+    if style is None:
         if points == 50:
-            color = (255, 255, 150)  # Bright yellow for bullseye
-            outline_color = (200, 100, 0)
+            # Bullseye hit - bright white/yellow flash
+            burst = ((255, 255, 200, 220), 50, 8)
         elif points == 30:
-            color = (150, 255, 255)  # Bright cyan for middle ring
-            outline_color = (0, 100, 200)
-        else:  # 10 points
-            color = (255, 200, 100)  # Orange for outer ring
-            outline_color = (200, 100, 0)
-        
-        # Create the text with a point sign
-        text = font.render(f"+{points}", True, color)
-        
-        # Create a slightly larger text for the outline effect
-        outline = font.render(f"+{points}", True, outline_color)
-        
-        # Position the text above the hit point
-        text_rect = text.get_rect(center=(hit_x, hit_y - 40))
-        
-        # Create a surface that will hold both the outline and the text
-        combined_surface = pygame.Surface((text_rect.width + 4, text_rect.height + 4), pygame.SRCALPHA)
-        
-        # Blit the outline text at slightly offset positions for a shadow effect
-        for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-            combined_surface.blit(outline, (dx + 2, dy + 2))
-        
-        # Blit the main text on top
-        combined_surface.blit(text, (2, 2))
-        
-        return (combined_surface, text_rect)
-    return None
+            # Middle ring hit - cyan flash
+            burst = ((100, 255, 255, 200), 40, 6)
+        elif points == 10:
+            # Outer ring hit - orange flash
+            burst = ((255, 180, 100, 180), 30, 5)
+        else:
+            # Miss or obstacle hit - red flash
+            burst = ((255, 80, 80, 180), 25, 4)
+        style = hit_effect_styles[points] = hit_effects.add_style(*render_cache.get_burst_sprite(*burst))
+    return style
+
+def spawn_hit_effect(hit_x, hit_y, points):
+    """Start a ring burst at the hit location"""
+    hit_effects.spawn(hit_x, hit_y, hit_effect_style(points), HIT_EFFECT_TICKS)
+
 # Background and obstacle functions
 def draw_background():
     """Draw a dark navy background with subtle gradient"""
-    # Create a subtle gradient from darker to slightly lighter navy
-    for y in range(0, HEIGHT, 2):
-        # Calculate gradient color - slightly lighter at the top
-        progress = y / HEIGHT
-        r = int(22 + 5 * (1 - progress))
-        g = int(26 + 8 * (1 - progress))
-        b = int(54 + 15 * (1 - progress))
-        color = (r, g, b)
-        
-        # Draw horizontal line for gradient
-        pygame.draw.line(screen, color, (0, y), (WIDTH, y), 2)
-
-def create_obstacles():
-    """Create obstacles for level 3"""
-    global obstacles
-    
-    obstacles = []
-    
-    # Calculate positions for obstacles
-    # We want them between the dart and the dartboard
-    dart_to_board_distance = center_x - dart_x
-    
-    # Create two fixed obstacles - one in middle, one near dartboard
-    # First obstacle - middle position, moved up by 7px
-    x_pos1 = dart_x + dart_to_board_distance * 0.48  # 48% of the way from dart to board
-    y_pos1 = HEIGHT // 2 - 17  # Positioned 7px higher
-    
-    # Second obstacle - near dartboard
-    x_pos2 = dart_x + dart_to_board_distance * 0.65  # 65% of the way from dart to board
-    y_pos2 = 30  # Positioned with only 30px margin from the top
-    
-    obstacles.append(pygame.Rect(x_pos1, y_pos1, obstacle_width, obstacle_height))
-    obstacles.append(pygame.Rect(x_pos2, y_pos2, obstacle_width, obstacle_height))
-
-def update_obstacles():
-    """Update obstacle positions for level 3"""
-    # Obstacles are now fixed, so no need to update positions
-    pass
+    # The gradient is pre-rendered once per resolution/palette and blitted
+    layer = render_cache.get_layer("background", screen.get_size(), BACKGROUND_PALETTE)
+    screen.blit(layer, (0, 0))
 
 def draw_obstacles():
-    """Draw obstacles for level 3"""
-    if current_level == 3:
-        for obstacle in obstacles:
-            # Draw obstacle with uniform color
-            pygame.draw.rect(screen, (200, 50, 50), obstacle)  # Solid red color
-            
-            # Draw outline
-            pygame.draw.rect(screen, (255, 100, 100), obstacle, 2)
-
-def check_obstacle_collision(x1, y1, x2, y2):
-    """Check if a line from (x1,y1) to (x2,y2) intersects with any obstacle"""
-    if current_level != 3:
-        return False
-        
-    for obstacle in obstacles:
-        # Check if line intersects with obstacle rectangle
-        # Using the Cohen-Sutherland line clipping algorithm for better accuracy
-        
-        # Define rectangle edges
-        left = obstacle.x
-        right = obstacle.x + obstacle.width
-        top = obstacle.y
-        bottom = obstacle.y + obstacle.height
-        
-        # Define region codes
-        INSIDE = 0  # 0000
-        LEFT = 1    # 0001
-        RIGHT = 2   # 0010
-        BOTTOM = 4  # 0100
-        TOP = 8     # 1000
+    """Draw the level's obstacles"""
+    for obstacle in state.obstacles:
+        # Draw obstacle with uniform color
+        pygame.draw.rect(screen, (200, 50, 50), obstacle)  # Solid red color
         
-        # Function to compute region code
-        def compute_code(x, y):
-            code = INSIDE
-            if x < left:
-                code |= LEFT
-            elif x > right:
-                code |= RIGHT
-            if y < top:
-                code |= TOP
-            elif y > bottom:
-                code |= BOTTOM
-            return code
-        
-        # Compute region codes for the endpoints
-        code1 = compute_code(x1, y1)
-        code2 = compute_code(x2, y2)
+        # Draw outline
+        pygame.draw.rect(screen, (255, 100, 100), obstacle, 2)
+
+# Timer function for timed levels
+def timer_layout():
+    """Return the seconds left, the timer text surface, its rect and its background rect"""
+    # Convert to seconds
+    seconds_left = int(sim.remaining_time() // 1000)
+    
+    # Change color based on time remaining
+    if seconds_left > 10:
+        color = WHITE
+    elif seconds_left > 5:
+        color = TEXT_HIGHLIGHT
+    else:
+        color = UI_ACCENT
         
-        # If both endpoints are outside the same region, line doesn't intersect
-        while True:
-            # Both endpoints inside the rectangle
-            if code1 == 0 and code2 == 0:
-                return True
-                
-            # Line is completely outside the rectangle
-            if (code1 & code2) != 0:
-                break
-                
-            # Line may cross the rectangle, compute intersection
-            code_out = code1 if code1 != 0 else code2
-            
-            # Find intersection point
-            if code_out & TOP:
-                x = x1 + (x2 - x1) * (top - y1) / (y2 - y1)
-                y = top
-            elif code_out & BOTTOM:
-                x = x1 + (x2 - x1) * (bottom - y1) / (y2 - y1)
-                y = bottom
-            elif code_out & RIGHT:
-                y = y1 + (y2 - y1) * (right - x1) / (x2 - x1)
-                x = right
-            elif code_out & LEFT:
-                y = y1 + (y2 - y1) * (left - x1) / (x2 - x1)
-                x = left
-                
-            # Update endpoint and region code
-            if code_out == code1:
-                x1, y1 = x, y
-                code1 = compute_code(x1, y1)
-            else:
-                x2, y2 = x, y
-                code2 = compute_code(x2, y2)
+    timer_text = render_cache.render_text(f"Time: {seconds_left}s", 36, color)
+    timer_rect = timer_text.get_rect(topright=(WIDTH - 20, 20))
     
-    return False
-# Timer function for Level 3
+    # Background for better visibility
+    bg_rect = timer_rect.inflate(20, 10)
+    return seconds_left, timer_text, timer_rect, bg_rect
+
 def draw_timer():
-    """Draw the timer for Level 3"""
-    global game_over, level3_start_time
-    
-    if current_level == 3 and not game_over:
-        # Calculate remaining time
-        current_time = pygame.time.get_ticks()
-        elapsed_time = current_time - level3_start_time
-        remaining_time = max(0, level3_time_limit - elapsed_time)
-        
-        # Convert to seconds
-        seconds_left = remaining_time // 1000
-        
-        # Create timer display
-        font = pygame.font.SysFont(None, 36)
-        
-        # Change color based on time remaining
-        if seconds_left > 10:
-            color = WHITE
-        elif seconds_left > 5:
-            color = TEXT_HIGHLIGHT
-        else:
-            color = UI_ACCENT
-            
-        timer_text = font.render(f"Time: {seconds_left}s", True, color)
-        timer_rect = timer_text.get_rect(topright=(WIDTH - 20, 20))
-        
-        # Draw background for better visibility
-        bg_rect = timer_rect.copy()
-        bg_rect.inflate_ip(20, 10)
+    """Draw the timer for timed levels"""
+    if state.level.time_limit and not state.game_over:
+        seconds_left, timer_text, timer_rect, bg_rect = timer_layout()
         draw_rounded_rect(screen, (40, 45, 75, 200), bg_rect)
-        
-        # Draw timer text
         screen.blit(timer_text, timer_rect)
-        
-        # Check if time is up
-        if remaining_time <= 0 and not game_over:
-            return True  # Time's up
-            
-    return False  # Time still remaining or not Level 3
+
 # Drawing functions for game elements
 def draw_dart(x, y, angle):
     """Draw the dart at the specified position and angle with increased size"""
-    angle_rad = math.radians(angle)
-    length = 20  # Increased from 15
-    width = 7    # Increased from 5
-    
-    base_x = x
-    base_y = y
-    tip_x = x + length * 2 * math.cos(angle_rad)
-    tip_y = y + length * 2 * math.sin(angle_rad)
-    top_x = x - width * math.sin(angle_rad)
-    top_y = y + width * math.cos(angle_rad)
-    bottom_x = x + width * math.sin(angle_rad)
-    bottom_y = y - width * math.cos(angle_rad)
-    mid_top_x = x + length * math.cos(angle_rad) - width/2 * math.sin(angle_rad)
-    mid_top_y = y + length * math.sin(angle_rad) + width/2 * math.cos(angle_rad)
-    mid_bottom_x = x + length * math.cos(angle_rad) + width/2 * math.sin(angle_rad)
-    mid_bottom_y = y + length * math.sin(angle_rad) - width/2 * math.cos(angle_rad)
-    
-    dart_body_color = (240, 240, 240)  # Changed to white
-    pygame.draw.polygon(screen, dart_body_color, [
-        (base_x, base_y), (top_x, top_y), (mid_top_x, mid_top_y),
-        (tip_x, tip_y), (mid_bottom_x, mid_bottom_y), (bottom_x, bottom_y)
-    ])
-    
-    pygame.draw.polygon(screen, BLACK, [
-        (base_x, base_y), (top_x, top_y), (mid_top_x, mid_top_y),
-        (tip_x, tip_y), (mid_bottom_x, mid_bottom_y), (bottom_x, bottom_y)
-    ], 1)
-    
-    fin_length = width * 1.2
-    pygame.draw.polygon(screen, UI_ACCENT, [  # Changed to UI_ACCENT (coral red)
-        (base_x, base_y), 
-        (base_x - fin_length * math.cos(angle_rad), base_y - fin_length * math.sin(angle_rad)),
-        (top_x, top_y)
-    ])
-    pygame.draw.polygon(screen, UI_ACCENT, [  # Changed to UI_ACCENT (coral red)
-        (base_x, base_y), 
-        (base_x - fin_length * math.cos(angle_rad), base_y - fin_length * math.sin(angle_rad)),
-        (bottom_x, bottom_y)
-    ])
+    if not DART_SPRITES:
+        render_cache.draw_dart_shape(screen, x, y, angle, DART_COLORS)
+        return
+    
+    # Blit a pre-rotated sprite drawn at the position's sub-pixel offset
+    base_x = math.floor(x)
+    base_y = math.floor(y)
+    sprite, (origin_x, origin_y) = render_cache.get_dart_sprite(angle, x - base_x, y - base_y, DART_COLORS)
+    screen.blit(sprite, (base_x - origin_x, base_y - origin_y))
+
+def dart_bounds(x, y):
+    """Return a rect containing the dart drawn at (x, y) at any angle"""
+    # The tip reaches 40px from the base, the outline adds a pixel or two
+    return pygame.Rect(int(x) - 43, int(y) - 43, 86, 86)
+
+def draw_board(surface, x, y, radii, palette=BOARD_PALETTE):
+    """Blit a dartboard centered at (x, y); radii is (outer, middle, bullseye)"""
+    # Rings land on the truncated position and labels on the rounded one, as when drawn directly
+    base_x, base_y = int(x), int(y)
+    shift = (int(x + 0.5 if x >= 0 else x - 0.5) - base_x, int(y + 0.5 if y >= 0 else y - 0.5) - base_y)
+    sprite, (origin_x, origin_y) = render_cache.get_board_sprite(radii, palette, shift)
+    surface.blit(sprite, (base_x - origin_x, base_y - origin_y))
 
 def draw_dartboard():
     """Draw the dartboard with 3 concentric circles"""
-    pygame.draw.circle(screen, DARTBOARD_OUTER, (center_x, center_y), outer_radius)
-    pygame.draw.circle(screen, BLACK, (center_x, center_y), outer_radius, 2)
-    pygame.draw.circle(screen, DARTBOARD_MIDDLE, (center_x, center_y), middle_radius)
-    pygame.draw.circle(screen, BLACK, (center_x, center_y), middle_radius, 2)
-    pygame.draw.circle(screen, DARTBOARD_CENTER, (center_x, center_y), bullseye_radius)
-    pygame.draw.circle(screen, BLACK, (center_x, center_y), bullseye_radius, 2)
-    
-    font = pygame.font.SysFont(None, 24)
-    # Position the 10 text in the larger outer ring
-    outer_text = font.render("10", True, BLACK)
-    outer_rect = outer_text.get_rect(center=(center_x - (middle_radius + outer_radius) // 2, center_y))
-    screen.blit(outer_text, outer_rect)
-    
-    # Position the 30 text in the smaller middle ring
-    middle_text = font.render("30", True, BLACK)
-    middle_rect = middle_text.get_rect(center=(center_x - (bullseye_radius + middle_radius) // 2, center_y))
-    screen.blit(middle_text, middle_rect)
-    
-    bullseye_text = font.render("50", True, WHITE)
-    bullseye_rect = bullseye_text.get_rect(center=(center_x, center_y))
-    screen.blit(bullseye_text, bullseye_rect)
+    # The board is pre-rendered once per geometry and palette and blitted where it is
+    draw_board(screen, state.center_x, view_center_y, (state.outer_radius, state.middle_radius, state.bullseye_radius))
 
-def draw_previous_trajectories():
-    """Draw trajectories of previous throws with moderately bold lines"""
-    # Don't draw trajectories in Level 3
-    if current_level == 3:
-        return
-        
-    for i, (angle, hit_x, hit_y, hit_center_y) in enumerate(previous_trajectories):
-        # Calculate points along the trajectory
+def update_trajectory_overlay():
+    """Redraw the trajectory overlay if the trajectories changed since last time"""
+    global trajectory_overlay, trajectory_overlay_key, trajectory_overlay_rect
+    
+    # On a moving board, every hit position follows the dartboard's movement
+    follow = state.level.motion != "static"
+    y_offset = view_center_y if follow else None
+    overlay_key = (id(state.previous_trajectories), len(state.previous_trajectories), state.current_level, y_offset)
+    
+    if trajectory_overlay is None or trajectory_overlay.get_size() != screen.get_size():
+        trajectory_overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        trajectory_overlay_key = None
+    
+    if overlay_key != trajectory_overlay_key:
+        trajectory_overlay.fill((0, 0, 0, 0))
         start_x = dart_x
         start_y = dart_y
         
-        # For level 2, adjust the hit position based on dartboard movement
-        if current_level == 2:
-            # Calculate the vertical offset from the original hit position
-            y_offset = center_y - hit_center_y
-            end_x = hit_x
-            end_y = hit_y + y_offset
-        else:
-            end_x = hit_x
-            end_y = hit_y
-        
-        # Draw a moderately bold line for the trajectory
-        line_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        
-        # Use a brighter white with medium opacity
-        color = (255, 255, 255, 140)  # Adjusted opacity
+        end_points = []
+        for angle, hit_x, hit_y, hit_center_y in state.previous_trajectories:
+            if follow:
+                # Calculate the vertical offset from the original hit position
+                end_points.append((hit_x, hit_y + view_center_y - hit_center_y))
+            else:
+                end_points.append((hit_x, hit_y))
         
-        # Draw a medium thickness line (2 pixels instead of 3)
-        pygame.draw.line(line_surface, color, (start_x, start_y), (end_x, end_y), 2)
-        screen.blit(line_surface, (0, 0))
+        # Lines use the opacity the old double blit of a 140-alpha line produced,
+        # and all hit circles go on top of all lines
+        dirty = pygame.Rect(start_x, start_y, 0, 0)
+        for end_x, end_y in end_points:
+            dirty.union_ip(pygame.draw.line(trajectory_overlay, (255, 255, 255, 203), 
+                                            (start_x, start_y), (end_x, end_y), 2))
+        for end_x, end_y in end_points:
+            dirty.union_ip(pygame.draw.circle(trajectory_overlay, (255, 255, 255, 180), 
+                                              (int(end_x), int(end_y)), 4))
         
-        # Draw a medium circle at the hit point
-        pygame.draw.circle(line_surface, (255, 255, 255, 180), (int(end_x), int(end_y)), 4)  # Adjusted size
-        screen.blit(line_surface, (0, 0))
+        trajectory_overlay_key = overlay_key
+        trajectory_overlay_rect = dirty
+    
+    return trajectory_overlay_rect
+
+def draw_previous_trajectories():
+    """Draw trajectories of previous throws with moderately bold lines"""
+    # Some levels hide the trajectories
+    if not state.level.show_trajectories:
+        return
+    
+    # Only the area the trajectories cover is blended onto the screen
+    overlay_rect = update_trajectory_overlay()
+    screen.blit(trajectory_overlay, overlay_rect, overlay_rect)
 
 def draw_score_box():
     """Draw the score box with rounded corners"""
@@ -496,32 +368,28 @@ def draw_score_box():
     box_rect = pygame.Rect(20, 20, 180, 120)
     draw_rounded_rect(screen, (40, 45, 75, 200), box_rect)
     
-    font = pygame.font.SysFont(None, 28)
-    
     # Level indicator
-    level_text = font.render(f"Level {current_level}", True, TEXT_HIGHLIGHT)
+    level_text = render_cache.render_text(f"Level {state.current_level}", 28, TEXT_HIGHLIGHT)
     screen.blit(level_text, (box_rect.x + 15, box_rect.y + 15))
     
     # Score below level
-    score_text = font.render(f"Score: {score}", True, WHITE)
+    score_text = render_cache.render_text(f"Score: {state.score}", 28, WHITE)
     screen.blit(score_text, (box_rect.x + 15, box_rect.y + 45))
     
-    # Level goal
-    if current_level == 1:
-        goal_text = font.render("Goal: 70 pts", True, BUTTON_GREEN)
-        screen.blit(goal_text, (box_rect.x + 15, box_rect.y + 75))
-    elif current_level == 2:
-        goal_text = font.render("Goal: 60 pts", True, BUTTON_GREEN)
+    # Level goal, if it has one
+    goal = state.level.goal
+    if goal is not None:
+        goal_text = render_cache.render_text(f"Goal: {goal} pts", 28, BUTTON_GREEN)
         screen.blit(goal_text, (box_rect.x + 15, box_rect.y + 75))
     
     # Throws text below score
-    throws_text = font.render("Throws:", True, WHITE)
-    screen.blit(throws_text, (box_rect.x + 15, box_rect.y + 75 if current_level == 3 else box_rect.y + 95))
+    throws_text = render_cache.render_text("Throws:", 28, WHITE)
+    screen.blit(throws_text, (box_rect.x + 15, box_rect.y + 75 if goal is None else box_rect.y + 95))
     
     # Throw indicators (circles) properly aligned with the text
-    throw_y = box_rect.y + 85 if current_level == 3 else box_rect.y + 105
-    for i in range(3):
-        color = UI_ACCENT if i < throws_left else (80, 85, 120)
+    throw_y = box_rect.y + 85 if goal is None else box_rect.y + 105
+    for i in range(state.level.throws):
+        color = UI_ACCENT if i < state.throws_left else (80, 85, 120)
         pygame.draw.circle(screen, color, (box_rect.x + 110 + i * 25, throw_y), 8)
 
 def draw_throw_button():
@@ -531,53 +399,25 @@ def draw_throw_button():
     
     draw_rounded_rect(screen, button_color, throw_button)
     
-    font = pygame.font.SysFont(None, 32)  # Slightly larger font
-    text = font.render("THROW", True, WHITE)  # Changed from BLACK to WHITE
+    text = render_cache.render_text("THROW", 32, WHITE)  # Changed from BLACK to WHITE
     text_rect = text.get_rect(center=throw_button.center)
     screen.blit(text, text_rect)
 
 def draw_helper_text():
     """Draw helper text with better styling"""
-    global show_helper, helper_timer
-    
     if show_helper and helper_timer > 0:
         # Create a semi-transparent rounded rectangle for the helper text
         helper_rect = pygame.Rect(WIDTH//2 - 210, 80, 420, 100)
         draw_rounded_rect(screen, (20, 20, 40, 180), helper_rect)
         
-        helper_font = pygame.font.SysFont(None, 28)
-        title_font = pygame.font.SysFont(None, 32)
-        
-        # Title and instructions based on current level
-        if current_level == 1:
-            title_text = title_font.render("CONTROLS", True, (255, 220, 100))
-            screen.blit(title_text, (WIDTH//2 - 50, 90))
-            
-            helper_text1 = helper_font.render("Use UP/DOWN arrows to aim", True, WHITE)
-            helper_text2 = helper_font.render("Press SPACE or click THROW to throw the dart", True, WHITE)
-            
-            screen.blit(helper_text1, (WIDTH//2 - 140, 125))
-            screen.blit(helper_text2, (WIDTH//2 - 190, 155))
-        elif current_level == 2:
-            title_text = title_font.render("MOVING TARGET", True, (255, 220, 100))
-            screen.blit(title_text, (WIDTH//2 - 80, 90))
-            
-            helper_text1 = helper_font.render("Time your throw carefully!", True, WHITE)
-            helper_text2 = helper_font.render("The dartboard is moving up and down", True, WHITE)
-            
-            screen.blit(helper_text1, (WIDTH//2 - 140, 125))
-            screen.blit(helper_text2, (WIDTH//2 - 190, 155))
-        else:  # Level 3
-            title_text = title_font.render("OBSTACLES & TIMER", True, (255, 220, 100))
-            screen.blit(title_text, (WIDTH//2 - 90, 90))
-            
-            helper_text1 = helper_font.render("Wait for dartboard to move to the BOTTOM!", True, WHITE)
-            helper_text2 = helper_font.render("You have only 20 seconds - hurry!", True, WHITE)
-            
-            screen.blit(helper_text1, (WIDTH//2 - 190, 125))
-            screen.blit(helper_text2, (WIDTH//2 - 160, 155))
+        # Title and instructions from the level file
+        (title, title_x), lines = state.level.helper
+        title_text = render_cache.render_text(title, 32, (255, 220, 100))
+        screen.blit(title_text, (WIDTH//2 + title_x, 90))
         
-        helper_timer -= 1
+        for i, (line, line_x) in enumerate(lines):
+            helper_text = render_cache.render_text(line, 28, WHITE)
+            screen.blit(helper_text, (WIDTH//2 + line_x, 125 + i * 30))
 # Game screens
 def draw_start_screen():
     """Draw the start screen with game instructions"""
@@ -586,8 +426,7 @@ def draw_start_screen():
     draw_rounded_rect(screen, (40, 40, 60, 230), title_panel)
     
     # Game title
-    title_font = pygame.font.SysFont(None, 64)
-    title_text = title_font.render(f"DART GAME - LEVEL {current_level}", True, (255, 220, 100))
+    title_text = render_cache.render_text(f"DART GAME - LEVEL {state.current_level}", 64, (255, 220, 100))
     title_rect = title_text.get_rect(center=(WIDTH//2, 100))
     screen.blit(title_text, title_rect)
     
@@ -596,399 +435,441 @@ def draw_start_screen():
     draw_rounded_rect(screen, (30, 30, 50, 230), instructions_panel)
     
     # Instructions header
-    header_font = pygame.font.SysFont(None, 36)
-    header_text = header_font.render("HOW TO PLAY", True, WHITE)
+    header_text = render_cache.render_text("HOW TO PLAY", 36, WHITE)
     header_rect = header_text.get_rect(center=(WIDTH//2, 200))
     screen.blit(header_text, header_rect)
     
     # Instructions text
-    inst_font = pygame.font.SysFont(None, 28)
-    
-    if current_level == 1:
-        instructions = [
-            "1. Use UP/DOWN arrow keys to aim the dart",
-            "2. Press SPACE or click the THROW button to throw",
-            "3. Hit the bullseye (red center) for 50 points",
-            "4. Hit the middle ring (cyan) for 30 points",
-            "5. Hit the outer ring (amber) for 10 points",
-            "6. You have 3 throws per game",
-            "",
-            "Score at least 70 points to unlock Level 2!"
-        ]
-    elif current_level == 2:
-        instructions = [
-            "Welcome to Level 2!",
-            "",
-            "The dartboard now moves up and down.",
-            "This makes hitting the target more challenging.",
-            "",
-            "Same controls as before:",
-            "- UP/DOWN arrows to aim",
-            "- SPACE or THROW button to throw",
-            "",
-            "Score at least 60 points to unlock Level 3!"
-        ]
-    else:  # Level 3
-        instructions = [
-            "Welcome to Level 3!",
-            "",
-            "BEWARE OF OBSTACLES!",
-            "Red blocks will block your dart's path.",
-            "If your dart hits a block, it will be wasted!",
-            "",
-            "TIP: Wait for the dartboard to move to the BOTTOM",
-            "to find a clear path between the obstacles.",
-            "",
-            "You have only 20 SECONDS to complete this level!",
-            "Use your 3 throws wisely."
-        ]
+    instructions = state.level.instructions
     
     for i, line in enumerate(instructions):
-        text = inst_font.render(line, True, WHITE)
+        text = render_cache.render_text(line, 28, WHITE)
         screen.blit(text, (WIDTH//2 - 250, 240 + i * 32))
     
     # Start button
-    start_button = pygame.Rect(WIDTH//2 - 100, 490, 200, 60)
     mouse_pos = pygame.mouse.get_pos()
     button_color = (60, 180, 80) if start_button.collidepoint(mouse_pos) else (50, 150, 70)
     draw_rounded_rect(screen, button_color, start_button)
     
-    start_font = pygame.font.SysFont(None, 36)
-    start_text = start_font.render("START GAME", True, WHITE)
+    start_text = render_cache.render_text("START GAME", 36, WHITE)
     start_rect = start_text.get_rect(center=start_button.center)
     screen.blit(start_text, start_rect)
-    
-    return start_button
-def draw_game_over():
-    """Draw game over message with level progression options"""
-    if game_over:
-        # For level 3 completion, show celebration screen
-        if current_level == 3:
-            return draw_celebration_screen()
-            
-        # For levels 1 and 2, show the regular game over screen
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        screen.blit(overlay, (0, 0))
+def button_elements(buttons, hovered, level):
+    """Return the (surface, position) pieces that draw a list of overlay buttons"""
+    elements = []
+    for action, button, color, hover_color, label, text_size in buttons:
+        panel = render_cache.get_rounded_rect(button.size, hover_color if action == hovered else color)
+        elements.append((panel, button.topleft))
         
-        # Larger panel with better styling
-        panel_rect = pygame.Rect(WIDTH//2 - 180, HEIGHT//2 - 150, 360, 300)
-        draw_rounded_rect(screen, (40, 40, 60, 230), panel_rect)
-        
-        # Add a decorative header
-        header_rect = pygame.Rect(WIDTH//2 - 180, HEIGHT//2 - 150, 360, 60)
-        draw_rounded_rect(screen, (80, 20, 20, 230), header_rect)
-        
-        font = pygame.font.SysFont(None, 64)
-        game_over_text = font.render("LEVEL COMPLETE", True, WHITE)
-        text_rect = game_over_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 110))
-        screen.blit(game_over_text, text_rect)
-        
-        score_font = pygame.font.SysFont(None, 48)
-        final_score_text = score_font.render(f"Final Score: {score}", True, WHITE)
-        score_rect = final_score_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 40))
-        screen.blit(final_score_text, score_rect)
-        
-        # Different options based on score and current level
-        message_font = pygame.font.SysFont(None, 32)
-        buttons = []
-        
-        if current_level == 1 and score >= 70:
-            # Player cleared level 1 with enough points
-            message_text = message_font.render("You've unlocked Level 2!", True, (150, 255, 150))
-            message_rect = message_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 10))
-            screen.blit(message_text, message_rect)
-            
-            # Next level button
-            next_button = pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 50, 180, 60)
-            mouse_pos = pygame.mouse.get_pos()
-            button_color = (60, 180, 80) if next_button.collidepoint(mouse_pos) else (50, 150, 70)
-            draw_rounded_rect(screen, button_color, next_button)
-            
-            next_text = pygame.font.SysFont(None, 36).render("Next Level", True, WHITE)
-            next_rect = next_text.get_rect(center=next_button.center)
-            screen.blit(next_text, next_rect)
-            buttons.append(("next_level", next_button))
-            
-            # Restart button (smaller and below)
-            restart_button = pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 120, 180, 40)
-            button_color = (100, 100, 100) if restart_button.collidepoint(mouse_pos) else (80, 80, 80)
-            draw_rounded_rect(screen, button_color, restart_button)
-            
-            restart_text = pygame.font.SysFont(None, 28).render("Restart Level 1", True, WHITE)
-            restart_rect = restart_text.get_rect(center=restart_button.center)
-            screen.blit(restart_text, restart_rect)
-            buttons.append(("restart", restart_button))
-            
-        elif current_level == 1 and score < 70:
-            # Player didn't score enough to unlock level 2
-            message_text = message_font.render("Score 70+ to unlock Level 2", True, (255, 150, 150))
-            message_rect = message_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 10))
-            screen.blit(message_text, message_rect)
-            
-            # Restart button
-            restart_button = pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 70, 180, 60)
-            mouse_pos = pygame.mouse.get_pos()
-            button_color = (60, 180, 80) if restart_button.collidepoint(mouse_pos) else (50, 150, 70)
-            draw_rounded_rect(screen, button_color, restart_button)
-            
-            restart_text = pygame.font.SysFont(None, 36).render("Try Again", True, WHITE)
-            restart_rect = restart_text.get_rect(center=restart_button.center)
-            screen.blit(restart_text, restart_rect)
-            buttons.append(("restart", restart_button))
-            
-            # Quit button
-            quit_button = pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 140, 180, 40)
-            button_color = (180, 60, 60) if quit_button.collidepoint(mouse_pos) else (150, 50, 50)
-            draw_rounded_rect(screen, button_color, quit_button)
-            
-            quit_text = pygame.font.SysFont(None, 28).render("Quit Game", True, WHITE)
-            quit_rect = quit_text.get_rect(center=quit_button.center)
-            screen.blit(quit_text, quit_rect)
-            buttons.append(("quit", quit_button))
-            
-        elif current_level == 2 and score >= 60:
-            # Player cleared level 2 with enough points
-            message_text = message_font.render("You've unlocked Level 3!", True, (150, 255, 150))
-            message_rect = message_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 10))
-            screen.blit(message_text, message_rect)
-            
-            # Next level button
-            next_button = pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 50, 180, 60)
-            mouse_pos = pygame.mouse.get_pos()
-            button_color = (60, 180, 80) if next_button.collidepoint(mouse_pos) else (50, 150, 70)
-            draw_rounded_rect(screen, button_color, next_button)
-            
-            next_text = pygame.font.SysFont(None, 36).render("Next Level", True, WHITE)
-            next_rect = next_text.get_rect(center=next_button.center)
-            screen.blit(next_text, next_rect)
-            buttons.append(("next_level", next_button))
-            
-            # Restart button (smaller and below)
-            restart_button = pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 120, 180, 40)
-            button_color = (100, 100, 100) if restart_button.collidepoint(mouse_pos) else (80, 80, 80)
-            draw_rounded_rect(screen, button_color, restart_button)
-            
-            restart_text = pygame.font.SysFont(None, 28).render("Restart Level 2", True, WHITE)
-            restart_rect = restart_text.get_rect(center=restart_button.center)
-            screen.blit(restart_text, restart_rect)
-            buttons.append(("restart", restart_button))
-            
-        elif current_level == 2 and score < 60:
-            # Player didn't score enough to unlock level 3
-            message_text = message_font.render("Score 60+ to unlock Level 3", True, (255, 150, 150))
-            message_rect = message_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 10))
-            screen.blit(message_text, message_rect)
-            
-            # Restart button
-            restart_button = pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 70, 180, 60)
-            mouse_pos = pygame.mouse.get_pos()
-            button_color = (60, 180, 80) if restart_button.collidepoint(mouse_pos) else (50, 150, 70)
-            draw_rounded_rect(screen, button_color, restart_button)
-            
-            restart_text = pygame.font.SysFont(None, 36).render("Try Again", True, WHITE)
-            restart_rect = restart_text.get_rect(center=restart_button.center)
-            screen.blit(restart_text, restart_rect)
-            buttons.append(("restart", restart_button))
-            
-            # Previous level button
-            prev_button = pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 140, 180, 40)
-            button_color = (100, 100, 180) if prev_button.collidepoint(mouse_pos) else (80, 80, 150)
-            draw_rounded_rect(screen, button_color, prev_button)
-            
-            prev_text = pygame.font.SysFont(None, 28).render("Back to Level 1", True, WHITE)
-            prev_rect = prev_text.get_rect(center=prev_button.center)
-            screen.blit(prev_text, prev_rect)
-            buttons.append(("prev_level", prev_button))
-        
-        return buttons
-    return []
-def draw_celebration_screen():
-    """Draw a celebration screen with simple gradient background when level 3 is completed"""
-    global celebration_active, celebration_start_time
+        text = render_cache.render_text(label.format(level=level, previous=level - 1), text_size, WHITE)
+        elements.append((text, text.get_rect(center=button.center)))
+    return elements
+
+def build_game_over_layer(message, message_color, hovered):
+    """Compose the game over overlay: dimmed screen, panel, texts and buttons"""
+    # Larger panel with better styling
+    panel_rect = pygame.Rect(WIDTH//2 - 180, HEIGHT//2 - 150, 360, 300)
+    elements = [(render_cache.get_rounded_rect(panel_rect.size, (40, 40, 60, 230)), panel_rect.topleft)]
     
-    if not celebration_active:
-        return False
+    # Add a decorative header
+    header_rect = pygame.Rect(WIDTH//2 - 180, HEIGHT//2 - 150, 360, 60)
+    elements.append((render_cache.get_rounded_rect(header_rect.size, (80, 20, 20, 230)), header_rect.topleft))
     
-    # Create a simple gradient background
-    gradient_surface = pygame.Surface((WIDTH, HEIGHT))
+    game_over_text = render_cache.render_text("LEVEL COMPLETE", 64, WHITE)
+    elements.append((game_over_text, game_over_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 110))))
     
-    # Draw simple gradient rectangles
-    rect_height = HEIGHT // 10
-    for i in range(10):
-        # Simple blue gradient from dark to slightly lighter
-        color_value = 20 + (i * 10)  # Simple gradient from dark to slightly lighter blue
-        color = (0, 0, color_value)
-        
-        rect = pygame.Rect(0, i * rect_height, WIDTH, rect_height)
-        pygame.draw.rect(gradient_surface, color, rect)
+    final_score_text = render_cache.render_text(f"Final Score: {state.score}", 48, WHITE)
+    elements.append((final_score_text, final_score_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 40))))
+    
+    message_text = render_cache.render_text(message, 32, message_color)
+    elements.append((message_text, message_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 10))))
+    
+    # The level's best scores beside the panel, this result highlighted
+    if top_scores:
+        board_rect = pygame.Rect(WIDTH//2 + 200, HEIGHT//2 - 150, 180, 300)
+        elements.append((render_cache.get_rounded_rect(board_rect.size, (40, 40, 60, 230)), board_rect.topleft))
+        header_text = render_cache.render_text("TOP SCORES", 32, TEXT_HIGHLIGHT)
+        elements.append((header_text, header_text.get_rect(center=(board_rect.centerx, board_rect.y + 30))))
+        for rank, (player, score, latest) in enumerate(top_scores, 1):
+            color = TEXT_HIGHLIGHT if latest else WHITE
+            row_y = board_rect.y + 30 + rank * 44
+            name_text = render_cache.render_text(f"{rank}. {player[:8]}", 28, color)
+            elements.append((name_text, name_text.get_rect(midleft=(board_rect.x + 15, row_y))))
+            score_text = render_cache.render_text(str(score), 28, color)
+            elements.append((score_text, score_text.get_rect(midright=(board_rect.right - 15, row_y))))
+    
+    elements += button_elements(overlay_buttons(), hovered, state.current_level)
+    return render_cache.compose_translucent((WIDTH, HEIGHT), (0, 0, 0, 180), elements)
+
+def draw_game_over():
+    """Draw game over message with level progression options"""
+    if not state.game_over:
+        return
+    
+    # Completing the last level shows the celebration screen
+    if sim.game_completed():
+        draw_celebration_screen()
+        return
     
-    # Apply a dark overlay to make text more readable
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 100))  # Semi-transparent black
-    gradient_surface.blit(overlay, (0, 0))
+    # Different message based on whether the level's goal was met
+    level = state.current_level
+    if sim.level_cleared():
+        message = f"You've unlocked Level {level + 1}!"
+        message_color = (150, 255, 150)
+    elif levels.has_level(level + 1):
+        message = f"Score {state.level.goal}+ to unlock Level {level + 1}"
+        message_color = (255, 150, 150)
+    else:
+        message = f"Score {state.level.goal}+ to win the game"
+        message_color = (255, 150, 150)
     
-    screen.blit(gradient_surface, (0, 0))
+    # The whole overlay is composed once per level, score, message, best scores and hovered button
+    hovered = hovered_button()
+    layer = render_cache.get_overlay(("game_over", level, state.score, message, top_scores, hovered),
+                                     lambda: build_game_over_layer(message, message_color, hovered))
+    screen.blit(layer, (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+
+def build_celebration_screen(hovered):
+    """Compose the celebration screen shown when the last level is completed"""
+    # Start from the pre-rendered gradient background
+    surface = render_cache.get_layer("celebration", screen.get_size(), CELEBRATION_PALETTE).copy()
     
     # Draw congratulatory text
-    title_font = pygame.font.SysFont(None, 72)
-    title_text = title_font.render("CONGRATULATIONS!", True, (255, 255, 255))
-    title_rect = title_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 100))
-    screen.blit(title_text, title_rect)
+    title_text = render_cache.render_text("CONGRATULATIONS!", 72, (255, 255, 255))
+    surface.blit(title_text, title_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 100)))
     
     # Draw final score
-    score_font = pygame.font.SysFont(None, 64)
-    score_text = score_font.render(f"Final Score: {score}", True, (220, 220, 255))
-    score_rect = score_text.get_rect(center=(WIDTH//2, HEIGHT//2))
-    screen.blit(score_text, score_rect)
+    score_text = render_cache.render_text(f"Final Score: {state.score}", 64, (220, 220, 255))
+    surface.blit(score_text, score_text.get_rect(center=(WIDTH//2, HEIGHT//2)))
     
     # Draw level completion message
-    message_font = pygame.font.SysFont(None, 36)
-    message_text = message_font.render("You've completed all levels!", True, (150, 255, 150))
-    message_rect = message_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 80))
-    screen.blit(message_text, message_rect)
+    message_text = render_cache.render_text("You've completed all levels!", 36, (150, 255, 150))
+    surface.blit(message_text, message_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 80)))
     
-    # Draw buttons
-    buttons = []
+    for element in button_elements(CELEBRATION_BUTTONS, hovered, state.current_level):
+        surface.blit(*element)
+    return surface
+
+def draw_celebration_screen():
+    """Draw the celebration screen with simple gradient background when the last level is completed"""
+    if not celebration_active:
+        return
     
-    # Play again button
-    restart_button = pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 150, 180, 60)
-    mouse_pos = pygame.mouse.get_pos()
-    button_color = (60, 180, 80) if restart_button.collidepoint(mouse_pos) else (50, 150, 70)
-    draw_rounded_rect(screen, button_color, restart_button)
+    hovered = hovered_button()
+    screen.blit(render_cache.get_overlay(("celebration", screen.get_size(), state.score, hovered),
+                                         lambda: build_celebration_screen(hovered)), (0, 0))
+# Frame composition and dirty-rect presentation
+def draw_start_scene():
+    """Draw the start screen over the background"""
+    draw_background()
+    draw_start_screen()
+
+def draw_game_scene(flash_alpha, popup_blits):
+    """Draw one gameplay frame"""
+    draw_background()
     
-    restart_text = pygame.font.SysFont(None, 36).render("Play Again", True, WHITE)
-    restart_rect = restart_text.get_rect(center=restart_button.center)
-    screen.blit(restart_text, restart_rect)
-    buttons.append(("restart_all", restart_button))
+    draw_dartboard()
     
-    # Quit button
-    quit_button = pygame.Rect(WIDTH//2 - 90, HEIGHT//2 + 220, 180, 40)
-    button_color = (180, 60, 60) if quit_button.collidepoint(mouse_pos) else (150, 50, 50)
-    draw_rounded_rect(screen, button_color, quit_button)
+    # Draw the level's obstacles
+    if state.obstacles:
+        draw_obstacles()
     
-    quit_text = pygame.font.SysFont(None, 28).render("Quit Game", True, WHITE)
-    quit_rect = quit_text.get_rect(center=quit_button.center)
-    screen.blit(quit_text, quit_rect)
-    buttons.append(("quit", quit_button))
+    # Draw previous trajectories (if any)
+    if state.previous_trajectories:
+        draw_previous_trajectories()
     
-    return buttons
-# Game mechanics functions
-def update_dartboard_position():
-    """Update the dartboard position for level 2 and 3"""
-    global center_y, level2_move_direction
+    if state.dart_in_motion:
+        draw_dart(view_dart_x, view_dart_y, state.dart_angle)
+    else:
+        draw_dart(dart_x, dart_y, state.dart_angle)
     
-    if current_level >= 2:  # For both level 2 and 3
-        # Move the dartboard up or down
-        center_y += level2_move_speed * level2_move_direction
+    if hit_effects.max_phase() > 0:
+        hit_effects.draw(screen)
         
-        # Reverse direction if reaching the boundaries
-        if center_y <= level2_y_min:
-            center_y = level2_y_min
-            level2_move_direction = 1  # Start moving down
-        elif center_y >= level2_y_max:
-            center_y = level2_y_max
-            level2_move_direction = -1  # Start moving up
+        # Add a screen flash effect when hit effect is active
+        if flash_alpha > 0:
+            screen.blit(render_cache.get_flash_surface((WIDTH, HEIGHT), flash_alpha), (0, 0))
+    
+    for popup_blit in popup_blits:
+        screen.blit(*popup_blit)
+    
+    draw_score_box()
+    draw_throw_button()
+    
+    # Call the helper text function
+    draw_helper_text()
+    
+    # Draw the timer on timed levels
+    if state.level.time_limit:
+        draw_timer()
+    
+    # Draw game over screen if game is over
+    if state.game_over:
+        draw_game_over()
+
+def overlay_buttons():
+    """Return the buttons of the overlay screen being shown (none during play)"""
+    if celebration_active:
+        return CELEBRATION_BUTTONS
+    if not state.game_over or sim.game_completed():
+        return ()
+    if sim.level_cleared():
+        return CLEARED_BUTTONS
+    return FAILED_BUTTONS if state.current_level > 1 else FAILED_FIRST_LEVEL_BUTTONS
+
+def button_at(pos):
+    """Return the action of the overlay button at pos, if any"""
+    for button in overlay_buttons():
+        if button[1].collidepoint(pos):
+            return button[0]
+    return None
+
+def hovered_button():
+    """Return the action of the overlay button under the mouse, if any"""
+    return button_at(pygame.mouse.get_pos())
+
+def report_game_damage(flash_alpha, popup_blits):
+    """Report where each gameplay element is drawn this frame and what it shows"""
+    board_rect = pygame.Rect(0, 0, state.outer_radius * 2 + 4, state.outer_radius * 2 + 4)
+    board_rect.center = (state.center_x, view_center_y)
+    screen_damage.report("dartboard", board_rect, atomic=True)
+    
+    if state.obstacles:
+        screen_damage.report("obstacles", pygame.Rect(state.obstacles[0]).unionall(state.obstacles[1:]), atomic=True)
+    
+    if state.previous_trajectories and state.level.show_trajectories:
+        screen_damage.report("trajectories", update_trajectory_overlay(), trajectory_overlay_key)
+    
+    if state.dart_in_motion:
+        screen_damage.report("dart", dart_bounds(view_dart_x, view_dart_y), (view_dart_x, view_dart_y, state.dart_angle),
+                             atomic=True)
+    else:
+        screen_damage.report("dart", dart_bounds(dart_x, dart_y), (dart_x, dart_y, state.dart_angle), atomic=True)
+    
+    if hit_effects.max_phase() > 0:
+        screen_damage.report("hit_effect", hit_effects.covered(), hit_effects.key())
+        if flash_alpha > 0:
+            screen_damage.report("flash", screen.get_rect(), flash_alpha)
+    
+    if popup_blits:
+        popup_rects = [popup_surface.get_rect(topleft=popup_rect.topleft) for popup_surface, popup_rect in popup_blits]
+        screen_damage.report("score_popup", popup_rects[0].unionall(popup_rects[1:]),
+                             tuple(tuple(rect) for rect in popup_rects))
+    
+    screen_damage.report("score_box", pygame.Rect(20, 20, 180, 120), (state.current_level, state.score, state.throws_left),
+                         atomic=True)
+    screen_damage.report("throw_button", throw_button, throw_button.collidepoint(pygame.mouse.get_pos()))
+    
+    if show_helper and helper_timer > 0:
+        screen_damage.report("helper", pygame.Rect(WIDTH//2 - 210, 80, 420, 100), state.current_level)
+    
+    if state.level.time_limit and not state.game_over:
+        seconds_left, timer_text, timer_rect, bg_rect = timer_layout()
+        screen_damage.report("timer", bg_rect, seconds_left)
+    
+    if state.game_over:
+        screen_damage.report("game_over", screen.get_rect(), (state.score, top_scores, hovered_button()))
+
+def present_frame(draw_scene):
+    """Draw a frame and push it to the display, repainting only damaged regions"""
+    dirty = screen_damage.end_frame()
+    
+    # Scene changes and heavily damaged frames are redrawn and flipped in full
+    if dirty is None or not DIRTY_RECT_RENDERING:
+        result = draw_scene()
+        draw_profiler_overlay()
+        pygame.display.flip()
+        return result
+    
+    # Otherwise recomposite each damaged region with the screen clipped to it
+    result = None
+    for rect in dirty:
+        screen.set_clip(rect)
+        result = draw_scene()
+    screen.set_clip(None)
+    
+    # The profiler overlay sits on top of everything and is pushed every frame
+    overlay_rect = draw_profiler_overlay()
+    if overlay_rect:
+        dirty.append(overlay_rect)
+    
+    if dirty:
+        pygame.display.update(dirty)
+    return result
+
+# Render interpolation
+def remember_tick_start():
+    """Note where the board and dart are before a simulation tick"""
+    global tick_start
+    tick_start = (state.center_y, state.dart_in_motion, state.dart_pos_x, state.dart_pos_y)
+
+def update_view(alpha):
+    """Place the board and dart alpha of the way from the last tick's start to its end"""
+    global view_center_y, view_dart_x, view_dart_y
+    
+    if tick_start is None:
+        view_center_y, view_dart_x, view_dart_y = state.center_y, state.dart_pos_x, state.dart_pos_y
+        return
+    
+    center_y, in_motion, pos_x, pos_y = tick_start
+    # Whole pixels keep the board's text crisp and its trajectory overlay cached
+    view_center_y = round(center_y + (state.center_y - center_y) * alpha)
+    if in_motion and state.dart_in_motion:
+        view_dart_x = pos_x + (state.dart_pos_x - pos_x) * alpha
+        view_dart_y = pos_y + (state.dart_pos_y - pos_y) * alpha
+    else:
+        view_dart_x, view_dart_y = state.dart_pos_x, state.dart_pos_y
 
-def calculate_perfect_angle():
-    """Calculate the perfect angle to hit the bullseye"""
-    dx = center_x - dart_x
-    dy = center_y - dart_y
-    return math.degrees(math.atan2(dy, dx))
+# Profiling
+def poll_events():
+    """Fetch this frame's input events"""
+    return pygame.event.get()
 
-def throw_dart():
-    """Initialize dart throwing"""
-    global dart_in_motion, dart_pos_x, dart_pos_y, throws_left
-    
-    if not dart_in_motion and not game_over and throws_left > 0:
-        dart_in_motion = True
-        dart_pos_x = dart_x
-        dart_pos_y = dart_y
-        throws_left -= 1
+def profiled_targets():
+    """Return the functions the frame profiler times, as profiler.enable() targets"""
+    module = sys.modules[__name__]
+    stages = ["poll_events", "present_frame"]
+    stages += [name for name in dir(module) if name.startswith("draw_")]
+    return [(module, stages, ""),
+            (sim, ["step", "update_dartboard_position", "sweep_dart"], "sim.")]
 
-def reset_dart():
-    """Reset the dart to its starting position"""
-    global dart_in_motion, dart_pos_x, dart_pos_y
-    dart_in_motion = False
-    dart_pos_x = dart_x
-    dart_pos_y = dart_y
+def toggle_profiler():
+    """Switch the frame profiler and its overlay on or off"""
+    global profiler_overlay
+    
+    if profiler.enabled:
+        profiler.disable()
+    else:
+        profiler.enable(profiled_targets())
+    profiler_overlay = None
+    
+    # The overlay appears or leaves a hole behind
+    screen_damage.invalidate()
 
-def check_game_over():
-    """Check if the game is over"""
-    global game_over, level3_start_time
-    
-    # Game is over if no throws left
-    if throws_left <= 0:
-        game_over = True
-        return True
+def draw_profiler_overlay():
+    """Draw the profiler's rolling percentiles; return the rect drawn, if any"""
+    global profiler_overlay, profiler_overlay_age
+    
+    if not profiler.enabled:
+        return None
+    
+    profiler_overlay_age += 1
+    if profiler_overlay is None or profiler_overlay_age >= PROFILER_REFRESH_FRAMES:
+        profiler_overlay_age = 0
+        stats = profiler.summary()
+        frame_ms = stats.pop("frame_ms")
+        net_blocks = stats.pop("net_blocks")
+        rows = [("ms", "p50", "p95", "p99"),
+                ("frame",) + tuple("%.2f" % v for v in frame_ms),
+                # Blocks allocated minus blocks freed: a net change, not an allocation count
+                ("allocs - frees",) + tuple("%d" % v for v in net_blocks)]
+        # Slowest stages first
+        for name, values in sorted(stats.items(), key=lambda item: -item[1][1])[:12]:
+            rows.append((name,) + tuple("%.2f" % v for v in values))
         
-    # For Level 3, also check if time is up
-    if current_level == 3 and level3_start_time > 0:
-        current_time = pygame.time.get_ticks()
-        elapsed_time = current_time - level3_start_time
-        if elapsed_time >= level3_time_limit:
-            game_over = True
-            return True
-            
-    return game_over
+        # Rendered directly: the text changes too often for the text cache
+        font = render_cache.get_font(16)
+        line_height = font.get_linesize()
+        profiler_overlay = pygame.Surface((360, line_height * len(rows) + 10))
+        profiler_overlay.fill(BLACK)
+        for i, row in enumerate(rows):
+            color = TEXT_HIGHLIGHT if i == 0 else WHITE
+            y = 5 + i * line_height
+            profiler_overlay.blit(font.render(row[0], True, color), (5, y))
+            # Right-aligned value columns
+            for column, value in enumerate(row[1:]):
+                text = font.render(value, True, color)
+                profiler_overlay.blit(text, text.get_rect(topright=(230 + column * 60, y)))
+    
+    overlay_rect = profiler_overlay.get_rect(topright=(WIDTH - 10, 10))
+    screen.blit(profiler_overlay, overlay_rect)
+    return overlay_rect
 
+# Game mechanics functions
 def reset_game(level=1):
     """Reset the game to initial state"""
-    global throws_left, score, game_over, dart_angle, dart_in_motion, previous_trajectories
-    global show_helper, helper_timer, current_level, center_x, center_y, level2_move_direction
-    global obstacles, level3_start_time, level3_time_remaining
-    
-    throws_left = 3
-    score = 0
-    game_over = False
-    dart_angle = 270  # Keep facing up initially
-    dart_in_motion = False
-    previous_trajectories = []  # Clear previous trajectories
+    global show_helper, helper_timer, tick_start, level_recorded, top_scores
+    
+    sim.reset(level)
     show_helper = False
     helper_timer = 0
+    tick_start = None
+    level_recorded = False
+    top_scores = ()
+    update_view(0)
     
-    # Set the level
-    current_level = level
-    
-    # Set level-specific properties
-    if current_level == 1:
-        center_x = level1_center_x
-        center_y = level1_center_y
-        obstacles = []  # No obstacles in level 1
-    elif current_level == 2:
-        center_x = level2_center_x
-        center_y = level2_center_y
-        level2_move_direction = 1
-        obstacles = []  # No obstacles in level 2
-    elif current_level == 3:
-        center_x = level3_center_x
-        center_y = level3_center_y
-        level2_move_direction = 1
-        
-        # Reset Level 3 timer
-        level3_start_time = 0  # Will be set when game starts
-        level3_time_remaining = level3_time_limit
-        
-        # Create obstacles for level 3
-        create_obstacles()
+    if recorder:
+        recorder.add_action(replay.RESET, level)
+    
+    # Everything on screen changes with a reset
+    screen_damage.invalidate()
+
+def finish_level():
+    """Store the ended level's result and read its best scores for the game over screen"""
+    global level_recorded, top_scores
+    
+    level_recorded = True
+    if scores is None:
+        return
     
-    reset_dart()
+    # The best scores are kept in memory, pending rows included; read them before queueing
+    # this result so it can be ranked in and marked here
+    level = state.current_level
+    best = [(player, score, False) for player, score, throws in scores.top(level)]
+    if score_session is not None:
+        throws = state.level.throws - state.throws_left
+        scores.record_score(score_session, player_name, level, state.score, throws, sim.level_cleared())
+        # Ties stay with the earlier result
+        best.append((player_name, state.score, True))
+        best.sort(key=lambda row: -row[1])
+    top_scores = tuple(best[:leaderboard.TOP_SCORES])
+
+def start_game():
+    """Leave the start screen"""
+    global game_started
+    
+    game_started = True
+    if recorder:
+        recorder.add_action(replay.START)
 # Main game loop
-def main():
+def main(record_path=None, replay_path=None):
     """Main game loop"""
-    global dart_angle, dart_in_motion, dart_pos_x, dart_pos_y, score, throws_left, game_over, previous_trajectories
-    global show_helper, helper_timer, game_started, center_y, celebration_active, celebration_start_time
-    global level3_start_time, level3_time_remaining
+    global show_helper, helper_timer, game_started, celebration_active, celebration_start_time
+    global session_ms, recorder, scores, score_session, throw_telemetry
+    
+    # A replayed session takes its seed, inputs and frame times from the log
+    playback = None
+    if replay_path:
+        session = replay.load(replay_path)
+        seed = session.seed
+        playback = iter(session.frames)
+    else:
+        seed = random.randrange(2 ** 32)
+    random.seed(seed)
+    if record_path:
+        recorder = replay.Recorder(seed, state.current_level)
     
+    init_display()
     running = True
     
-    perfect_angle = calculate_perfect_angle()
-    dart_angle = 270  # Start with dart facing up
+    # Replays show the leaderboard but add nothing to it
+    if LEADERBOARD_PATH:
+        try:
+            scores = leaderboard.Leaderboard(LEADERBOARD_PATH)
+        except sqlite3.Error as error:
+            # A read-only install or a locked file should not keep the game from starting
+            print("leaderboard: cannot open %s (%s); playing without one" % (LEADERBOARD_PATH, error),
+                  file=sys.stderr)
+    if scores and playback is None:
+        score_session = scores.start_session(player_name, seed, levels.digest())
+    # Replayed throws were streamed when they were played
+    if TELEMETRY_DIR and playback is None:
+        throw_telemetry = telemetry.TelemetryStream(TELEMETRY_DIR)
     
-    hit_effect = None
-    hit_effect_timer = 0
-    score_popup = None
-    score_popup_timer = 0
+    hit_effects.clear()
+    score_popups.clear()
+    timestep = simulation.FixedTimestep()
+    frame_ms = 0
     
     # Reset helper variables
     show_helper = False  # Disable initial instructions
@@ -997,267 +878,227 @@ def main():
     celebration_active = False
     
     while running:
-        for event in pygame.event.get():
+        throw_requested = False
+        aim_perfect = False
+        
+        if playback is not None:
+            frame = next(playback, None)
+            if frame is None:
+                break
+            frame_ms = frame.dt
+        session_ms += frame_ms
+        
+        if profiler.enabled:
+            profiler.end_frame()
+        
+        for event in poll_events():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.VIDEORESIZE:
+                # Cached background layers are sized to the old window
+                render_cache.invalidate_layers()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
+                elif event.key == pygame.K_F3:
+                    toggle_profiler()
+                elif event.key == pygame.K_F4:
+                    profiler.export_ndjson(PROFILE_EXPORT_PATH)
+                elif playback is not None:
+                    # The replay log drives the game
+                    continue
                 elif event.key == pygame.K_SPACE:
                     if not game_started:
-                        game_started = True
-                    elif not dart_in_motion and not game_over and not celebration_active:
-                        throw_dart()
+                        start_game()
+                    elif not state.dart_in_motion and not state.game_over and not celebration_active:
+                        throw_requested = True
                         show_helper = False
-                elif event.key == pygame.K_r and game_over and not celebration_active:
-                    reset_game(current_level)
-                    hit_effect = None
-                    score_popup = None
+                elif event.key == pygame.K_r and state.game_over and not celebration_active:
+                    reset_game(state.current_level)
+                    hit_effects.clear()
+                    score_popups.clear()
                 elif event.key == pygame.K_p and not celebration_active:
-                    dart_angle = perfect_angle
-            elif event.type == pygame.MOUSEBUTTONDOWN:
+                    aim_perfect = True
+            elif event.type == pygame.MOUSEBUTTONDOWN and playback is None:
                 if event.button == 1:
                     if not game_started:
                         # Check if start button was clicked
-                        start_button = pygame.Rect(WIDTH//2 - 100, 490, 200, 60)
                         if start_button.collidepoint(event.pos):
-                            game_started = True
-                    elif not dart_in_motion and not game_over and throw_button.collidepoint(event.pos) and not celebration_active:
-                        throw_dart()
+                            start_game()
+                    elif not state.dart_in_motion and not state.game_over and throw_button.collidepoint(event.pos) and not celebration_active:
+                        throw_requested = True
                         show_helper = False
                     
-                    if game_over:
-                        if celebration_active:
-                            buttons = draw_celebration_screen()
-                        else:
-                            buttons = draw_game_over()
-                            
-                        for action, button in buttons:
-                            if button.collidepoint(event.pos):
-                                if action == "next_level":
-                                    # Move to next level
-                                    reset_game(current_level + 1)
-                                    hit_effect = None
-                                    score_popup = None
-                                    celebration_active = False
-                                    show_helper = False  # Disable helper for new level
-                                    helper_timer = 0
-                                elif action == "restart":
-                                    # Restart current level
-                                    reset_game(current_level)
-                                    hit_effect = None
-                                    score_popup = None
-                                    celebration_active = False
-                                elif action == "restart_all":
-                                    # Restart from level 1
-                                    reset_game(1)
-                                    hit_effect = None
-                                    score_popup = None
-                                    celebration_active = False
-                                elif action == "prev_level":
-                                    # Go back to previous level
-                                    reset_game(current_level - 1)
-                                    hit_effect = None
-                                    score_popup = None
-                                    celebration_active = False
-                                elif action == "quit":
-                                    running = False
+                    if state.game_over:
+                        # Hit-test the overlay's button layout; nothing is drawn here
+                        action = button_at(event.pos)
+                        if action == "next_level":
+                            # Move to next level
+                            reset_game(state.current_level + 1)
+                            hit_effects.clear()
+                            score_popups.clear()
+                            celebration_active = False
+                            show_helper = False  # Disable helper for new level
+                            helper_timer = 0
+                        elif action == "restart":
+                            # Restart current level
+                            reset_game(state.current_level)
+                            hit_effects.clear()
+                            score_popups.clear()
+                            celebration_active = False
+                        elif action == "restart_all":
+                            # Restart from level 1
+                            reset_game(1)
+                            hit_effects.clear()
+                            score_popups.clear()
+                            celebration_active = False
+                        elif action == "prev_level":
+                            # Go back to previous level
+                            reset_game(state.current_level - 1)
+                            hit_effects.clear()
+                            score_popups.clear()
+                            celebration_active = False
+                        elif action == "quit":
+                            running = False
+        
+        if playback is not None:
+            # Replay the frame's recorded actions the way the handlers above apply them
+            for code, level in frame.actions:
+                if code == replay.START:
+                    start_game()
+                elif code == replay.RESET:
+                    reset_game(level)
+                    hit_effects.clear()
+                    score_popups.clear()
+                    celebration_active = False
+            throw_requested = frame.inputs.throw
+            aim_perfect = frame.inputs.aim_perfect
+            if throw_requested:
+                show_helper = False
         
         # If we're on the start screen, draw it and continue to next frame
         if not game_started:
-            screen.fill(BACKGROUND)
-            draw_background()
-            draw_start_screen()
-            pygame.display.flip()
-            clock.tick(FPS)
+            screen_damage.begin_frame(("start", state.current_level))
+            screen_damage.report("start_button", start_button, start_button.collidepoint(pygame.mouse.get_pos()))
+            present_frame(draw_start_scene)
+            if recorder:
+                recorder.end_frame(frame_ms)
+            warm_up()
+            frame_ms = clock.tick(FPS)
             continue
             
         # If celebration is active, only draw celebration screen
         if celebration_active:
-            draw_celebration_screen()
-            pygame.display.flip()
-            clock.tick(FPS)
+            screen_damage.begin_frame(("celebration", state.score))
+            screen_damage.report("buttons", screen.get_rect(), hovered_button())
+            present_frame(draw_celebration_screen)
+            if recorder:
+                recorder.end_frame(frame_ms)
+            warm_up()
+            frame_ms = clock.tick(FPS)
             continue
-            
-        # For Level 3, start the timer when game starts
-        if current_level == 3 and level3_start_time == 0:
-            level3_start_time = pygame.time.get_ticks()
-        
-        # Update dartboard position for level 2 and 3
-        if current_level >= 2:
-            update_dartboard_position()
         
-        # Update obstacles for level 3
-        if current_level == 3:
-            update_obstacles()
-        
-        # Recalculate perfect angle as dartboard may move
-        perfect_angle = calculate_perfect_angle()
-        
-        if not dart_in_motion and not game_over:
+        if playback is not None:
+            aim_up, aim_down = frame.inputs.up, frame.inputs.down
+        else:
             keys = pygame.key.get_pressed()
-            if keys[pygame.K_UP]:
-                dart_angle = max(perfect_angle + angle_min, dart_angle - angle_change_speed)
-                show_helper = False
-            if keys[pygame.K_DOWN]:
-                dart_angle = min(perfect_angle + angle_max, dart_angle + angle_change_speed)
-                show_helper = False
+            aim_up, aim_down = keys[pygame.K_UP], keys[pygame.K_DOWN]
+        if not state.dart_in_motion and not state.game_over and (aim_up or aim_down):
+            show_helper = False
         
-        if dart_in_motion:
-            prev_x, prev_y = dart_pos_x, dart_pos_y
-            
-            # Normal dart movement for all levels (no wind)
-            dart_pos_x += dart_speed * math.cos(math.radians(dart_angle))
-            dart_pos_y += dart_speed * math.sin(math.radians(dart_angle))
-            
-            # Check for obstacle collision in Level 3
-            if current_level == 3 and check_obstacle_collision(prev_x, prev_y, dart_pos_x, dart_pos_y):
-                # Dart hit an obstacle - create a hit effect at collision point
-                hit_effect = draw_hit_effect(dart_pos_x, dart_pos_y, 0)  # 0 points = red effect
-                hit_effect_timer = 15  # Reduced from 30 to make the effect briefer
-                
-                # Reset dart
-                reset_dart()
-                
-                # Check if all throws are used, if so, show game over screen
-                if check_game_over() and current_level == 3:
-                    celebration_active = True
-                    celebration_start_time = pygame.time.get_ticks()
-                continue
-            
-            if dart_pos_x > WIDTH or dart_pos_y < 0 or dart_pos_y > HEIGHT:
-                reset_dart()
-                
-                # Check if all throws are used, if so, show game over screen
-                if check_game_over() and current_level == 3:
-                    celebration_active = True
-                    celebration_start_time = pygame.time.get_ticks()
+        inputs = simulation.Inputs(up=aim_up, down=aim_down, throw=throw_requested, aim_perfect=aim_perfect)
+        if recorder:
+            recorder.end_frame(frame_ms, inputs)
+        
+        # Run the fixed-rate simulation ticks this frame's time pays for
+        for tick_inputs in timestep.add_frame(frame_ms, inputs):
+            remember_tick_start()
+            throw_events = sim.step(tick_inputs, timestep.tick_ms)
             
-            elif (prev_x < center_x and dart_pos_x >= center_x) or (prev_x > center_x and dart_pos_x <= center_x):
-                if dart_pos_x != prev_x:
-                    m = (dart_pos_y - prev_y) / (dart_pos_x - prev_x)
-                    b = prev_y - m * prev_x
-                    intersect_y = m * center_x + b
-                else:
-                    intersect_y = dart_pos_y
-                
-                distance = abs(intersect_y - center_y)
+            obstacle_hit = False
+            for throw_event in throw_events:
+                if throw_telemetry:
+                    # One tuple append; the drain thread encodes and writes it
+                    throw_telemetry.emit((time.time(), throw_event.kind, state.current_level, state.dart_angle,
+                                          state.release_frame, state.frame, throw_event.board_y, throw_event.y,
+                                          throw_event.points,
+                                          sim.remaining_time() if state.level.time_limit else None))
                 
-                points_earned = 0
-                if distance <= outer_radius:
-                    if distance <= bullseye_radius:
-                        points_earned = 50
-                    elif distance <= middle_radius:
-                        points_earned = 30
-                    else:
-                        points_earned = 10
-                    
-                    score += points_earned
-                    
-                    # Store this throw's trajectory
-                    # For level 2 and 3, also store the center_y position at the time of hit
-                    previous_trajectories.append((dart_angle, center_x, intersect_y, center_y))
+                if throw_event.kind == "obstacle":
+                    # Dart hit an obstacle - create a hit effect at collision point
+                    spawn_hit_effect(throw_event.x, throw_event.y, 0)  # 0 points = red effect
+                    obstacle_hit = True
+                elif throw_event.kind == "hit":
+                    spawn_hit_effect(throw_event.x, throw_event.y, throw_event.points)
                     
-                    hit_effect = draw_hit_effect(center_x, intersect_y, points_earned)
-                    hit_effect_timer = 15  # Reduced from 30 to make the effect briefer
-                    
-                    if points_earned > 0:
-                        score_popup = draw_score_popup(center_x, intersect_y, points_earned)
-                        score_popup_timer = 60
+                    score_popups.spawn(throw_event.x, throw_event.y, throw_event.points)
+            
+            # Animations count ticks; a dart stopped by an obstacle ends its tick before they advance
+            if not obstacle_hit:
+                # Advance the hit effect particles
+                hit_effects.update()
                 
-                reset_dart()
+                # Advance the score popups
+                score_popups.update()
                 
-                # Check if all throws are used, if so, show game over screen
-                if check_game_over() and current_level == 3:
-                    celebration_active = True
-                    celebration_start_time = pygame.time.get_ticks()
-        
-        screen.fill(BACKGROUND)
-        draw_background()
-        
-        draw_dartboard()
-        
-        # Draw obstacles for level 3
-        if current_level == 3:
-            draw_obstacles()
-        
-        # Draw previous trajectories (if any)
-        if previous_trajectories:
-            draw_previous_trajectories()
-        
-        if dart_in_motion:
-            draw_dart(dart_pos_x, dart_pos_y, dart_angle)
-        else:
-            draw_dart(dart_x, dart_y, dart_angle)
-        
-        if hit_effect and hit_effect_timer > 0:
-            screen.blit(hit_effect, (0, 0))
-            hit_effect_timer -= 1
+                if show_helper and helper_timer > 0:
+                    helper_timer -= 1
             
-            # Add a screen flash effect when hit effect is active
-            if hit_effect_timer > 12:  # Only during the first few frames (adjusted for shorter duration)
-                flash_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                flash_alpha = int(40 * (hit_effect_timer - 12) / 3)  # Fade quickly, reduced intensity
-                flash_surface.fill((255, 255, 255, flash_alpha))
-                screen.blit(flash_surface, (0, 0))
+            # Once the last level is completed, by its final throw or its timer, show the celebration screen
+            if sim.game_completed():
+                celebration_active = True
+                celebration_start_time = session_ms
+                break
         
-        if score_popup and score_popup_timer > 0:
-            text, rect = score_popup
-            # Make the popup move upward and bounce slightly
-            if score_popup_timer > 45:
-                rect.y -= 2  # Move up faster initially
-            elif score_popup_timer > 30:
-                rect.y -= 1  # Slow down
-            elif score_popup_timer > 15:
-                rect.y -= 0.5  # Even slower
-                
-            # Add a slight horizontal bounce
-            bounce_offset = math.sin(score_popup_timer * 0.2) * 3
-            display_rect = rect.copy()
-            display_rect.x += bounce_offset
-            
-            # Scale the popup for a "pop" effect
-            scale = 1.0
-            if score_popup_timer > 50:
-                scale = 0.7 + 0.3 * ((score_popup_timer - 50) / 10)  # Grow in
-            elif score_popup_timer < 15:
-                scale = 0.7 + 0.3 * (score_popup_timer / 15)  # Shrink out
-                
-            if scale != 1.0:
-                w, h = text.get_width(), text.get_height()
-                scaled_text = pygame.transform.smoothscale(
-                    text, 
-                    (int(w * scale), int(h * scale))
-                )
-                # Recenter after scaling
-                display_rect.x += (w - scaled_text.get_width()) // 2
-                display_rect.y += (h - scaled_text.get_height()) // 2
-                screen.blit(scaled_text, display_rect)
-            else:
-                screen.blit(text, display_rect)
-                
-            score_popup_timer -= 1
+        # Store the level's result the frame it ends
+        if state.game_over and not level_recorded:
+            finish_level()
         
-        draw_score_box()
-        draw_throw_button()
+        # Draw the board and dart between the last two ticks
+        update_view(timestep.alpha())
         
-        # Call the helper text function
-        draw_helper_text()
+        # Screen flash during the first few ticks of the newest effect (adjusted for shorter duration)
+        flash_alpha = 0
+        effect_phase = hit_effects.max_phase()
+        if effect_phase - 1 > 12:
+            flash_alpha = int(40 * (effect_phase - 1 - 12) / 3)  # Fade quickly, reduced intensity
         
-        # Draw timer for Level 3
-        if current_level == 3:
-            if draw_timer() and not game_over:
-                game_over = True
+        popup_blits = score_popups.blits()
         
-        # Draw game over screen if game is over
-        if game_over:
-            draw_game_over()
+        # Repaint only what changed since the last frame
+        screen_damage.begin_frame(("game", state.current_level))
+        report_game_damage(flash_alpha, popup_blits)
+        present_frame(lambda: draw_game_scene(flash_alpha, popup_blits))
         
-        pygame.display.flip()
-        clock.tick(FPS)
+        warm_up()
+        frame_ms = clock.tick(FPS)
+    
+    if recorder:
+        recorder.save(record_path)
+    if scores:
+        scores.close()
+    if throw_telemetry:
+        throw_telemetry.close()
     
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Dart Throwing Game")
+    parser.add_argument("--record", metavar="FILE", help="record the session to a replay log")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recorded session in real time")
+    parser.add_argument("--levels", metavar="FILE", help="load the levels from this level file")
+    parser.add_argument("--player", default=player_name, help="name to store scores under (default: %(default)s)")
+    parser.add_argument("--leaderboard", metavar="FILE", default=LEADERBOARD_PATH,
+                        help="SQLite leaderboard file (default: leaderboard.db next to the game)")
+    parser.add_argument("--telemetry", metavar="DIR", help="stream per-throw events to compressed NDJSON files here")
+    args = parser.parse_args()
+    player_name = args.player
+    LEADERBOARD_PATH = args.leaderboard
+    TELEMETRY_DIR = args.telemetry
+    if args.levels:
+        levels.use(args.levels)
+        reset_game(1)
+    main(args.record, args.replay)
@@ -0,0 +1,189 @@
+"""Local leaderboard and session history, kept in SQLite.
+
+Every finished level is stored with its player, score, throws used and
+whether its goal was met, next to the session it was played in (player,
+start time, random seed and level file checksum).
+
+Writes never wait on the disk: record_score() and start_session() only put
+the row on a bounded queue. A writer thread with its own connection
+commits the queued rows in batches, one transaction per batch. When the
+queue is full, the row is dropped and counted rather than blocking a frame.
+
+The game over screen's top scores never touch the disk either: each
+level's best TOP_SCORES rows are read once when the leaderboard is opened
+and kept in memory, and record_score() ranks every queued row in, so they
+include rows the writer has not committed yet. Rows written by another
+process after the open are not seen. history() reads the database, which is
+in WAL mode, so it runs alongside the writer's commits; a score shows up
+there once the writer has committed it, and flush() waits for that.
+"""
+import bisect
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "leaderboard.db")
+WRITE_QUEUE_SIZE = 256  # Rows waiting for the writer; more are dropped
+WRITE_BATCH_SIZE = 64  # Rows committed per transaction at most
+FLUSH_INTERVAL = 0.25  # Seconds the writer waits for a batch to fill
+CLOSE_TIMEOUT = 5  # Seconds close() waits for the writer before leaving its rows
+TOP_SCORES = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    player TEXT NOT NULL,
+    started REAL NOT NULL,
+    seed INTEGER NOT NULL,
+    level_file INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    session TEXT NOT NULL REFERENCES sessions (id),
+    player TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    throws INTEGER NOT NULL,
+    cleared INTEGER NOT NULL,
+    finished REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_level ON scores (level, score DESC, finished);
+CREATE INDEX IF NOT EXISTS scores_by_player ON scores (player, finished DESC);
+"""
+
+_INSERT_SESSION = "INSERT INTO sessions (id, player, started, seed, level_file) VALUES (?, ?, ?, ?, ?)"
+_INSERT_SCORE = ("INSERT INTO scores (session, player, level, score, throws, cleared, finished) "
+                 "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+
+def connect(path=DB_PATH):
+    """Open the database at path in WAL mode, creating its tables if needed"""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # With WAL, NORMAL only risks the last commits on power loss, never corruption
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+class Leaderboard:
+    """The score store, written through a background writer thread"""
+
+    def __init__(self, path=DB_PATH, queue_size=WRITE_QUEUE_SIZE):
+        self.path = path
+        self.dropped = 0  # Rows turned away by a full queue
+        self.failed = 0  # Rows lost to a failed commit
+        self._reader = connect(path)
+        # Per level, its best rows as (-score, finished, player, throws), best first
+        self._best = {}
+        level = self._reader.execute("SELECT MIN(level) FROM scores").fetchone()[0]
+        while level is not None:
+            self._best[level] = [(-score, finished, player, throws) for player, score, throws, finished
+                                 in self._read_top(level)]
+            level = self._reader.execute("SELECT MIN(level) FROM scores WHERE level > ?", (level,)).fetchone()[0]
+        self._queue = queue.Queue(queue_size)
+        self._stopping = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="leaderboard-writer", daemon=True)
+        self._writer.start()
+
+    def start_session(self, player, seed, level_file):
+        """Queue a new session's metadata; return its id for record_score()"""
+        session = uuid.uuid4().hex
+        self._put((_INSERT_SESSION, (session, player, time.time(), seed, level_file)))
+        return session
+
+    def record_score(self, session, player, level, score, throws, cleared):
+        """Queue a finished level's result and rank it into the level's top scores"""
+        finished = time.time()
+        if self._put((_INSERT_SCORE, (session, player, level, score, throws, int(cleared), finished))):
+            best = self._best.setdefault(level, [])
+            bisect.insort(best, (-score, finished, player, throws))
+            del best[TOP_SCORES:]
+
+    def _put(self, row):
+        """Queue a row for the writer; return whether it was queued"""
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _write_loop(self):
+        try:
+            connection = connect(self.path)
+        except sqlite3.Error as error:
+            # Keep taking rows, so flush() and close() still return
+            connection = None
+            print("leaderboard: cannot write to %s: %s" % (self.path, error), file=sys.stderr)
+        running = True
+        while running:
+            # Wait for a row, then give the batch a moment to fill
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while batch[-1] is not None and len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+
+            if connection is None:
+                self.failed += len(batch)
+            else:
+                try:
+                    with connection:
+                        for statement, parameters in batch:
+                            connection.execute(statement, parameters)
+                except sqlite3.Error as error:
+                    self.failed += len(batch)
+                    print("leaderboard: dropped %d rows: %s" % (len(batch), error), file=sys.stderr)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            # close() could not queue its stop marker into a full queue; stop once the rows are in
+            running = not stop and not (self._stopping.is_set() and self._queue.empty())
+        if connection is not None:
+            connection.close()
+
+    def flush(self):
+        """Wait until every queued row is committed"""
+        self._queue.join()
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Commit the queued rows and stop the writer, waiting at most timeout seconds"""
+        self._stopping.set()
+        try:
+            # Wakes a writer waiting for rows
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._writer.join(timeout)
+        if self._writer.is_alive():
+            print("leaderboard: gave up on %d queued rows" % self._queue.qsize(), file=sys.stderr)
+        self._reader.close()
+
+    def top(self, level, count=TOP_SCORES):
+        """Return the level's best (player, score, throws) rows, best first; ties go to the earlier.
+
+        Served from memory, queued rows included; count is capped at TOP_SCORES.
+        """
+        return [(player, -score, throws) for score, finished, player, throws in self._best.get(level, ())[:count]]
+
+    def _read_top(self, level):
+        """Read the level's best committed (player, score, throws, finished) rows from the database"""
+        return self._reader.execute(
+            "SELECT player, score, throws, finished FROM scores WHERE level = ? ORDER BY score DESC, finished "
+            "LIMIT ?", (level, TOP_SCORES)).fetchall()
+
+    def history(self, player, count=20):
+        """Return the player's latest (level, score, throws, cleared, finished) rows, newest first"""
+        return [(level, score, throws, bool(cleared), finished) for level, score, throws, cleared, finished in
+                self._reader.execute(
+                    "SELECT level, score, throws, cleared, finished FROM scores WHERE player = ? "
+                    "ORDER BY finished DESC LIMIT ?", (player, count))]
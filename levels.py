@@ -0,0 +1,216 @@
+"""Level definitions, loaded from a JSON level file.
+
+Each level in the file describes its board, how the board moves, its
+obstacles, throws, time limit, goal score and on-screen text (see
+levels.json). load() validates every level and compiles it into a Level
+with its derived geometry worked out once: the board's track, its scoring
+table and a prebuilt obstacle grid. The table is loaded on first
+use, after which get(number) is a dict lookup.
+
+A level whose goal is None is cleared by playing it out; finishing the last
+level with its goal met completes the game.
+"""
+import json
+import os
+import zlib
+from collections import namedtuple
+
+import collision
+import scoring
+
+LEVELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.json")
+
+MOTION_PATTERNS = ("static", "bounce")
+MAX_TRACK_STEPS = 100000  # A bouncing board must repeat its motion within this many steps
+
+# A compiled level. motion is one of MOTION_PATTERNS; for "bounce" the board
+# moves move_speed px per step between y_min and y_max and track is its
+# BoardTrack. scoring is the board's ScoringTable.
+# obstacles is a tuple of (x, y, width, height) rects, grid their shared
+# ObstacleGrid; obstacles do not move.
+# time_limit is in milliseconds, or None. helper is (title, lines), each an
+# (text, x offset from the screen center) pair.
+Level = namedtuple("Level", "number center_x center_y outer_radius middle_radius bullseye_radius "
+                            "motion move_speed y_min y_max track scoring obstacles grid "
+                            "throws time_limit goal show_trajectories helper instructions")
+
+# Where a bouncing board is, step by step from the level's reset: positions[n]
+# is its (center_y, move_direction) after n steps and phases maps each of
+# them back to n. After the last position the board returns to positions[loop].
+BoardTrack = namedtuple("BoardTrack", "positions phases loop")
+
+_levels = None  # {number: Level} for the loaded level file
+_digest = 0  # CRC-32 of the loaded level file's contents
+_path = LEVELS_PATH  # Where the loaded level file came from
+
+
+def _field(data, key, kind, where):
+    """Return data[key], checking it is of the given type(s)"""
+    if key not in data:
+        raise ValueError("%s: missing %r" % (where, key))
+    value = data[key]
+    # JSON has no separate bool, and a bool is not a number here
+    if not isinstance(value, kind) or (isinstance(value, bool) and kind is not bool):
+        raise ValueError("%s: %r has the wrong type" % (where, key))
+    return value
+
+
+def _number(data, key, where, minimum=None, optional=False):
+    """Return a numeric field, checking its lower bound; None is allowed if optional"""
+    if optional and data.get(key, 0) is None:
+        return None
+    value = _field(data, key, (int, float), where)
+    if minimum is not None and value < minimum:
+        raise ValueError("%s: %r must be at least %s" % (where, key, minimum))
+    return value
+
+
+def bounce_step(center_y, direction, speed, y_min, y_max):
+    """Return a bouncing board's (center_y, direction) one step later"""
+    center_y += speed * direction
+
+    # Reverse direction if reaching the boundaries
+    if center_y <= y_min:
+        return y_min, 1  # Start moving down
+    if center_y >= y_max:
+        return y_max, -1  # Start moving up
+    return center_y, direction
+
+
+def board_track(center_y, speed, y_min, y_max, where):
+    """Step a bouncing board from its start until its motion repeats; return its BoardTrack.
+
+    The positions come from the same repeated additions as the simulation's,
+    so they match it to the last bit whatever the speed and bounds.
+    """
+    positions = []
+    phases = {}
+    position = (center_y, 1)
+    while position not in phases:
+        if len(positions) == MAX_TRACK_STEPS:
+            raise ValueError("%s: the board's motion must repeat within %d steps" % (where, MAX_TRACK_STEPS))
+        phases[position] = len(positions)
+        positions.append(position)
+        position = bounce_step(*position, speed, y_min, y_max)
+    return BoardTrack(tuple(positions), phases, phases[position])
+
+
+def _text_line(item, where):
+    """Return a (text, x offset) pair"""
+    if (not isinstance(item, list) or len(item) != 2 or not isinstance(item[0], str)
+            or not isinstance(item[1], int) or isinstance(item[1], bool)):
+        raise ValueError("%s: expected a [text, x offset] pair" % where)
+    return item[0], item[1]
+
+
+def compile_level(data):
+    """Validate one level's JSON object and compile it into a Level"""
+    if not isinstance(data, dict):
+        raise ValueError("Level entries must be objects")
+    number = _field(data, "number", int, "level")
+    where = "level %d" % number
+
+    board = _field(data, "board", dict, where)
+    center_x = _number(board, "x", where + " board")
+    center_y = _number(board, "y", where + " board")
+    outer = _number(board, "outer_radius", where + " board", 1)
+    middle = _number(board, "middle_radius", where + " board", 1)
+    bullseye = _number(board, "bullseye_radius", where + " board", 1)
+    if not bullseye < middle < outer:
+        raise ValueError("%s: board radii must grow from bullseye to outer" % where)
+
+    motion = _field(data, "motion", dict, where)
+    pattern = _field(motion, "pattern", str, where + " motion")
+    if pattern not in MOTION_PATTERNS:
+        raise ValueError("%s: unknown motion pattern %r" % (where, pattern))
+    move_speed = y_min = y_max = track = None
+    if pattern == "bounce":
+        move_speed = _number(motion, "speed", where + " motion")
+        y_min = _number(motion, "y_min", where + " motion")
+        y_max = _number(motion, "y_max", where + " motion")
+        if move_speed <= 0 or y_min >= y_max:
+            raise ValueError("%s: a bouncing board needs a positive speed and y_min < y_max" % where)
+        track = board_track(center_y, move_speed, y_min, y_max, where + " motion")
+
+    obstacles = []
+    for rect in _field(data, "obstacles", list, where):
+        if (not isinstance(rect, list) or len(rect) != 4
+                or not all(isinstance(v, int) and not isinstance(v, bool) for v in rect)
+                or rect[2] <= 0 or rect[3] <= 0):
+            raise ValueError("%s: obstacles must be [x, y, width, height] with positive integer sizes" % where)
+        obstacles.append(tuple(rect))
+
+    helper = _field(data, "helper", dict, where)
+    title = _text_line(_field(helper, "title", list, where + " helper"), where + " helper title")
+    lines = tuple(_text_line(item, where + " helper line") for item in _field(helper, "lines", list, where + " helper"))
+    instructions = _field(data, "instructions", list, where)
+    if not all(isinstance(line, str) for line in instructions):
+        raise ValueError("%s: instructions must be strings" % where)
+
+    return Level(
+        number, center_x, center_y, outer, middle, bullseye,
+        pattern, move_speed, y_min, y_max, track,
+        scoring.table_for(((bullseye, 50), (middle, 30), (outer, 10))),
+        tuple(obstacles), collision.ObstacleGrid(obstacles),
+        _field(data, "throws", int, where), _number(data, "time_limit", where, 1, optional=True),
+        _number(data, "goal", where, 0, optional=True), _field(data, "show_trajectories", bool, where),
+        (title, lines), tuple(instructions))
+
+
+def load(path=LEVELS_PATH):
+    """Load, validate and compile a level file; return ({number: Level}, digest)"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        data = json.loads(raw)
+    except ValueError as error:
+        raise ValueError("%s is not valid JSON: %s" % (path, error)) from None
+    if not isinstance(data, dict) or not isinstance(data.get("levels"), list) or not data["levels"]:
+        raise ValueError("%s must hold a non-empty \"levels\" list" % path)
+
+    table = {}
+    for entry in data["levels"]:
+        level = compile_level(entry)
+        if level.throws < 1:
+            raise ValueError("level %d: needs at least one throw" % level.number)
+        table[level.number] = level
+    # Levels are played in order from 1, so the numbers must run 1..N
+    if sorted(table) != list(range(1, len(data["levels"]) + 1)):
+        raise ValueError("%s: levels must be numbered 1 to %d, once each" % (path, len(data["levels"])))
+    return table, zlib.crc32(raw)
+
+
+def use(path=LEVELS_PATH):
+    """Make the level file at path the one get() serves"""
+    global _levels, _digest, _path
+    _levels, _digest = load(path)
+    _path = path
+
+
+def get(number):
+    """Return the compiled Level with the given number"""
+    if _levels is None:
+        use()
+    try:
+        return _levels[number]
+    except KeyError:
+        raise ValueError("No level %d" % number) from None
+
+
+def has_level(number):
+    """Return whether the level file defines the given level"""
+    if _levels is None:
+        use()
+    return number in _levels
+
+
+def digest():
+    """Return a checksum of the level file in use, for replays to check against"""
+    if _levels is None:
+        use()
+    return _digest
+
+
+def path():
+    """Return the path of the level file get() serves"""
+    return _path
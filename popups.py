@@ -0,0 +1,150 @@
+"""Score popups with pre-baked animation frames.
+
+A popup's "+points" text, outlined, grows in over its first ticks and
+shrinks out over its last. Every frame of that animation is baked once per
+point value (see frames()), so showing a popup is one blit of the frame for
+its phase; nothing is rendered or scaled while it plays. ScorePopups runs
+any number of popups at once.
+
+Like the hit effects, popups count animation ticks: a popup lives
+POPUP_TICKS ticks, its phase counting down from POPUP_TICKS to 1.
+"""
+import math
+
+import pygame
+
+import render_cache
+
+POPUP_TICKS = 60
+POPUP_FONT_SIZE = 48
+
+# Text and outline colors by point value; other values use the outer ring's
+POPUP_COLORS = {
+    50: ((255, 255, 150), (200, 100, 0)),  # Bright yellow for bullseye
+    30: ((150, 255, 255), (0, 100, 200)),  # Bright cyan for middle ring
+}
+DEFAULT_POPUP_COLORS = ((255, 200, 100), (200, 100, 0))  # Orange for outer ring
+
+_frames = {}  # Points -> (text size, [(surface, dx, dy) per phase])
+
+
+def popup_scale(phase):
+    """Return the popup's size factor at a phase"""
+    if phase > 50:
+        return 0.7 + 0.3 * ((phase - 50) / 10)  # Grow in
+    if phase < 15:
+        return 0.7 + 0.3 * (phase / 15)  # Shrink out
+    return 1.0
+
+
+def build_popup_surface(points):
+    """Render "+points" over its outline; return it with the plain text's size"""
+    color, outline_color = POPUP_COLORS.get(points, DEFAULT_POPUP_COLORS)
+    text = render_cache.render_text(f"+{points}", POPUP_FONT_SIZE, color)
+    outline = render_cache.render_text(f"+{points}", POPUP_FONT_SIZE, outline_color)
+
+    # Create a surface that will hold both the outline and the text
+    combined_surface = pygame.Surface((text.get_width() + 4, text.get_height() + 4), pygame.SRCALPHA)
+
+    # Blit the outline text at slightly offset positions for a shadow effect
+    for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
+        combined_surface.blit(outline, (dx + 2, dy + 2))
+
+    # Blit the main text on top
+    combined_surface.blit(text, (2, 2))
+    return combined_surface, text.get_size()
+
+
+def build_popup_frames(points):
+    """Bake every phase's frame as (surface, dx, dy), dx/dy recentering a scaled frame"""
+    surface, text_size = build_popup_surface(points)
+    w, h = surface.get_size()
+    scaled = {}  # Scale -> frame; the grow-in and shrink-out share sizes
+    frames = [None]  # Indexed by phase, which starts at 1
+    for phase in range(1, POPUP_TICKS + 1):
+        scale = popup_scale(phase)
+        frame = scaled.get(scale)
+        if frame is None:
+            if scale != 1.0:
+                # Scaled from the unconverted surface, as the per-frame smoothscale was
+                image = pygame.transform.smoothscale(surface, (int(w * scale), int(h * scale)))
+            else:
+                image = surface
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha()
+            frame = scaled[scale] = (image, (w - image.get_width()) // 2, (h - image.get_height()) // 2)
+        frames.append(frame)
+    return text_size, frames
+
+
+def frames(points):
+    """Return the baked (text size, frames) for a point value, baking it on first use"""
+    baked = _frames.get(points)
+    if baked is None:
+        baked = _frames[points] = build_popup_frames(points)
+    return baked
+
+
+def prebake(point_values):
+    """Bake the frames for each point value ahead of the first hit"""
+    for points in point_values:
+        frames(points)
+
+
+class ScorePopups:
+    """The popups currently on screen"""
+
+    def __init__(self):
+        # Per popup: [frames, rect, display rect, ticks left, phase]
+        self.active = []
+
+    def spawn(self, hit_x, hit_y, points):
+        """Start a popup for a hit worth points (none for a miss)"""
+        if points <= 0:
+            return
+        text_size, popup_frames = frames(points)
+        # Position the text above the hit point
+        rect = pygame.Rect((0, 0), text_size)
+        rect.center = (hit_x, hit_y - 40)
+        self.active.append([popup_frames, rect, rect.copy(), POPUP_TICKS, 0])
+
+    def update(self):
+        """Advance every popup by one animation tick"""
+        active = self.active
+        i = 0
+        while i < len(active):
+            popup = active[i]
+            ticks = popup[3]
+            if ticks <= 0:
+                del active[i]
+                continue
+            popup[4] = ticks
+            rect = popup[1]
+            # Make the popup move upward and bounce slightly
+            if ticks > 45:
+                rect.y -= 2  # Move up faster initially
+            elif ticks > 30:
+                rect.y -= 1  # Slow down
+            elif ticks > 15:
+                rect.y -= 0.5  # Even slower
+            popup[3] = ticks - 1
+            i += 1
+
+    def clear(self):
+        """Remove every popup"""
+        self.active.clear()
+
+    def blits(self):
+        """Return (surface, screen rect) for every shown popup, in spawn order"""
+        shown = []
+        for popup_frames, rect, display_rect, ticks, phase in self.active:
+            if phase <= 0:
+                continue
+            image, dx, dy = popup_frames[phase]
+            display_rect.topleft = rect.topleft
+            # Add a slight horizontal bounce
+            display_rect.x += math.sin(phase * 0.2) * 3
+            display_rect.x += dx
+            display_rect.y += dy
+            shown.append((image, display_rect))
+        return shown
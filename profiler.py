@@ -0,0 +1,136 @@
+"""Optional frame-time instrumentation.
+
+While disabled nothing is wrapped and the game pays for a single flag check
+per frame. enable() swaps the named functions of each target (a module or
+an object) for timing wrappers and disable() puts the originals back.
+
+Every frame records each stage's self time (its own time minus the stages
+it called) in milliseconds, the wall time since the previous frame and
+net_blocks, the change in sys.getallocatedblocks() over the frame. That is
+a net figure, not an allocation count: a frame that allocates and frees
+1000 objects shows about 0, and one that frees more than it allocates is
+negative. The last WINDOW frames are kept for rolling percentiles and
+NDJSON export.
+"""
+import functools
+import json
+import sys
+import time
+from collections import deque
+
+WINDOW = 600  # Frames kept for percentiles and export
+
+enabled = False
+
+_wrapped = []  # (target, name, original, own attribute) for every wrapped function
+_stack = []  # Active stages as [name, start, child time]
+_stage_ms = {}  # Self time per stage in the current frame
+_frames = deque(maxlen=WINDOW)
+_frame_count = 0
+_frame_start = 0.0
+_blocks_start = 0
+
+
+def _timed(name, function):
+    """Wrap function so its calls are timed as stage `name`"""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        entry = [name, time.perf_counter(), 0.0]
+        _stack.append(entry)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _stack.pop()
+            elapsed = time.perf_counter() - entry[1]
+            if _stack:
+                _stack[-1][2] += elapsed
+            _stage_ms[name] = _stage_ms.get(name, 0.0) + (elapsed - entry[2]) * 1000
+    return wrapper
+
+
+def enable(targets):
+    """Start profiling; targets is a list of (module or object, function names, label prefix)"""
+    global enabled, _frame_start, _blocks_start
+
+    if enabled:
+        return
+    for target, names, prefix in targets:
+        for name in names:
+            original = getattr(target, name)
+            own = name in vars(target)
+            _wrapped.append((target, name, original, own))
+            setattr(target, name, _timed(prefix + name, original))
+
+    _stage_ms.clear()
+    _frame_start = time.perf_counter()
+    _blocks_start = sys.getallocatedblocks()
+    enabled = True
+
+
+def disable():
+    """Stop profiling and restore every wrapped function"""
+    global enabled
+
+    for target, name, original, own in reversed(_wrapped):
+        if own:
+            setattr(target, name, original)
+        else:
+            # The wrapper shadowed a class attribute; removing it uncovers the original
+            delattr(target, name)
+    _wrapped.clear()
+    _stack.clear()
+    enabled = False
+
+
+def end_frame():
+    """Close the current frame's record and start the next one"""
+    global _frame_count, _frame_start, _blocks_start
+
+    now = time.perf_counter()
+    blocks = sys.getallocatedblocks()
+    _frames.append({
+        "frame": _frame_count,
+        "frame_ms": (now - _frame_start) * 1000,
+        "net_blocks": blocks - _blocks_start,
+        "stages": dict(_stage_ms),
+    })
+    _frame_count += 1
+    _stage_ms.clear()
+    _frame_start = now
+    _blocks_start = blocks
+
+
+def percentile(values, p):
+    """Return the p-th percentile of values (nearest rank)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summary():
+    """Return {stage: (p50, p95, p99)} over the recorded frames, plus frame_ms and net_blocks"""
+    series = {"frame_ms": [f["frame_ms"] for f in _frames],
+              "net_blocks": [f["net_blocks"] for f in _frames]}
+    for record in _frames:
+        for name in record["stages"]:
+            series.setdefault(name, [])
+    for name in series:
+        if name not in ("frame_ms", "net_blocks"):
+            # A stage that did not run in a frame took no time in it
+            series[name] = [f["stages"].get(name, 0.0) for f in _frames]
+
+    return {name: tuple(percentile(values, p) for p in (50, 95, 99)) for name, values in series.items()}
+
+
+def export_ndjson(path):
+    """Write each recorded frame to path as a JSON line of frame, frame_ms, net_blocks and stages.
+
+    net_blocks is the net change in allocated blocks, not an allocation count.
+    Returns the number of frames written.
+    """
+    with open(path, "w") as f:
+        for record in _frames:
+            f.write(json.dumps(record) + "\n")
+    return len(_frames)
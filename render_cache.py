@@ -0,0 +1,458 @@
+import math
+from collections import OrderedDict
+
+import pygame
+
+# Pre-rendered full-screen layers by name, each stored with the size and
+# palette it was built for so a resize or theme change rebuilds it
+_background_layers = {}
+
+# Fonts resolved once per (face, size); SysFont lookups scan the system
+# fonts on first use, so the default face skips them
+_fonts = {}
+
+# Rendered text surfaces, least recently used evicted first
+TEXT_CACHE_SIZE = 256
+_text_surfaces = OrderedDict()
+text_cache_hits = 0
+text_cache_misses = 0
+
+# Finished rounded-rect panels keyed by (size, color, radius)
+PANEL_CACHE_SIZE = 64
+_panels = OrderedDict()
+
+# Pre-rotated dart sprites keyed by (angle step, sub-pixel offset, colors).
+# Angles snap to DART_ANGLE_STEP degrees and positions to 1/DART_SUBPIXEL px.
+DART_ANGLE_STEP = 0.25
+DART_SUBPIXEL = 4
+DART_CACHE_SIZE = 512
+DART_SPRITE_BIAS = 256  # Screen-scale position sprites are laid out around
+_dart_sprites = OrderedDict()
+
+# Dartboard sprites keyed by (radii, palette, label shift)
+BOARD_CACHE_SIZE = 64
+BOARD_KEY_COLORS = ((255, 0, 255), (1, 2, 3), (0, 255, 1))  # Color keys to try, in order
+_board_sprites = OrderedDict()
+
+# Hit-effect burst sprites keyed by (color, max radius, rings); few distinct
+# styles exist, so they are kept for the whole session
+_burst_sprites = {}
+
+# Pre-composed overlay screens keyed by everything they show, least recently used evicted first
+OVERLAY_CACHE_SIZE = 16
+_overlays = OrderedDict()
+
+# One full-screen white flash surface, refilled only when its alpha changes
+_flash = None
+
+
+def _finish_layer(surface):
+    """Convert a finished layer to the display format when a display exists"""
+    if pygame.display.get_surface() is not None:
+        return surface.convert()
+    return surface
+
+
+def build_background_layer(size, palette):
+    """Build the navy gradient used behind every gameplay frame"""
+    width, height = size
+    base, highlight = palette
+    surface = pygame.Surface(size)
+    surface.fill(base)
+
+    # Same 2px bands as the old per-frame gradient, slightly lighter at the top
+    for y in range(0, height, 2):
+        progress = y / height
+        r = int(base[0] + highlight[0] * (1 - progress))
+        g = int(base[1] + highlight[1] * (1 - progress))
+        b = int(base[2] + highlight[2] * (1 - progress))
+        pygame.draw.line(surface, (r, g, b), (0, y), (width, y), 2)
+
+    return _finish_layer(surface)
+
+
+def build_celebration_layer(size, palette):
+    """Build the banded blue celebration backdrop with its darkening overlay"""
+    width, height = size
+    base, step, overlay_color = palette
+    surface = pygame.Surface(size)
+
+    rect_height = height // 10
+    for i in range(10):
+        color = tuple(c + i * s for c, s in zip(base, step))
+        pygame.draw.rect(surface, color, pygame.Rect(0, i * rect_height, width, rect_height))
+
+    # Apply a dark overlay to make text more readable
+    overlay = pygame.Surface(size, pygame.SRCALPHA)
+    overlay.fill(overlay_color)
+    surface.blit(overlay, (0, 0))
+
+    return _finish_layer(surface)
+
+
+def get_layer(name, size, palette):
+    """Return a cached background layer, rebuilding it if size or palette changed"""
+    size = tuple(size)
+    cached = _background_layers.get(name)
+    if cached is not None and cached[0] == size and cached[1] == palette:
+        return cached[2]
+
+    builder = build_celebration_layer if name == "celebration" else build_background_layer
+    layer = builder(size, palette)
+    _background_layers[name] = (size, palette, layer)
+    return layer
+
+
+def invalidate_layers():
+    """Drop every cached layer (call on resize or palette change)"""
+    _background_layers.clear()
+
+
+def get_font(size, face=None):
+    """Return the shared font for (face, size), resolving it on first use"""
+    key = (face, size)
+    font = _fonts.get(key)
+    if font is None:
+        # SysFont(None, size) is the default font too, but only after scanning the system fonts
+        font = pygame.font.Font(None, size) if face is None else pygame.font.SysFont(face, size)
+        _fonts[key] = font
+    return font
+
+
+def render_text(text, size, color, antialias=True, face=None):
+    """Return a cached rendering of text; callers must not draw onto it"""
+    global text_cache_hits, text_cache_misses
+
+    key = (text, face, size, tuple(color), antialias)
+    surface = _text_surfaces.get(key)
+    if surface is not None:
+        _text_surfaces.move_to_end(key)
+        text_cache_hits += 1
+        return surface
+
+    text_cache_misses += 1
+    surface = get_font(size, face).render(text, antialias, color)
+    _text_surfaces[key] = surface
+    if len(_text_surfaces) > TEXT_CACHE_SIZE:
+        _text_surfaces.popitem(last=False)
+    return surface
+
+
+def text_cache_stats():
+    """Return (hits, misses, entries) for the text cache"""
+    return text_cache_hits, text_cache_misses, len(_text_surfaces)
+
+
+def build_rounded_rect(size, color, radius=15):
+    """Build a rounded-rectangle panel surface with per-pixel alpha"""
+    rect = pygame.Rect((0, 0), size)
+    color = pygame.Color(*color)
+    alpha = color.a
+    color.a = 0
+    rectangle = pygame.Surface(rect.size, pygame.SRCALPHA)
+
+    circle = pygame.Surface([min(rect.size) * 3] * 2, pygame.SRCALPHA)
+    pygame.draw.ellipse(circle, (0, 0, 0), circle.get_rect(), 0)
+    circle = _scaled_corner(circle, int(min(rect.size) * radius * 2), rect.size)
+
+    radius = rectangle.blit(circle, (0, 0))
+    radius.bottomright = rect.bottomright
+    rectangle.blit(circle, radius)
+    radius.topright = rect.topright
+    rectangle.blit(circle, radius)
+    radius.bottomleft = rect.bottomleft
+    rectangle.blit(circle, radius)
+
+    rectangle.fill((0, 0, 0), rect.inflate(-radius.w, 0))
+    rectangle.fill((0, 0, 0), rect.inflate(0, -radius.h))
+
+    rectangle.fill(color, special_flags=pygame.BLEND_RGBA_MAX)
+    rectangle.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MIN)
+
+    return rectangle
+
+
+def _scaled_corner(circle, diameter, size):
+    """Return the top-left size of circle smoothscaled to diameter square.
+
+    The panels only show that corner of a circle scaled to many times their
+    own size, so just the rows and columns it samples are scaled, with
+    smoothscale's own passes: across the top rows, then down the columns.
+    """
+    width, height = min(size[0], diameter), min(size[1], diameter)
+    source = circle.get_width()
+    if diameter <= source or not width or not height:
+        return pygame.transform.smoothscale(circle, (diameter, diameter))
+
+    # Output row y blends source rows y * (source - 1) // diameter and the one below
+    rows = min(source, (height - 1) * (source - 1) // diameter + 2)
+    across = pygame.transform.smoothscale(circle.subsurface((0, 0, source, rows)), (diameter, rows))
+
+    # Rows no output pixel samples are left clear; the vertical pass still needs the full source height
+    columns = pygame.Surface((width, source), pygame.SRCALPHA)
+    columns.blit(across, (0, 0), (0, 0, width, rows), pygame.BLEND_RGBA_ADD)
+    return pygame.transform.smoothscale(columns, (width, diameter)).subsurface((0, 0, width, height))
+
+
+def get_rounded_rect(size, color, radius=15):
+    """Return a cached rounded-rect panel, building it on first use"""
+    key = (tuple(size), tuple(pygame.Color(*color)), radius)
+    panel = _panels.get(key)
+    if panel is not None:
+        _panels.move_to_end(key)
+        return panel
+
+    panel = build_rounded_rect(key[0], color, radius)
+    if pygame.display.get_surface() is not None:
+        panel = panel.convert_alpha()
+    _panels[key] = panel
+    if len(_panels) > PANEL_CACHE_SIZE:
+        _panels.popitem(last=False)
+    return panel
+
+
+def dart_polygons(x, y, angle):
+    """Return the dart's body and fin polygons with its base at (x, y)"""
+    angle_rad = math.radians(angle)
+    length = 20  # Increased from 15
+    width = 7    # Increased from 5
+    
+    base_x = x
+    base_y = y
+    tip_x = x + length * 2 * math.cos(angle_rad)
+    tip_y = y + length * 2 * math.sin(angle_rad)
+    top_x = x - width * math.sin(angle_rad)
+    top_y = y + width * math.cos(angle_rad)
+    bottom_x = x + width * math.sin(angle_rad)
+    bottom_y = y - width * math.cos(angle_rad)
+    mid_top_x = x + length * math.cos(angle_rad) - width/2 * math.sin(angle_rad)
+    mid_top_y = y + length * math.sin(angle_rad) + width/2 * math.cos(angle_rad)
+    mid_bottom_x = x + length * math.cos(angle_rad) + width/2 * math.sin(angle_rad)
+    mid_bottom_y = y + length * math.sin(angle_rad) - width/2 * math.cos(angle_rad)
+    
+    body = [(base_x, base_y), (top_x, top_y), (mid_top_x, mid_top_y),
+            (tip_x, tip_y), (mid_bottom_x, mid_bottom_y), (bottom_x, bottom_y)]
+    
+    fin_length = width * 1.2
+    fin_x = base_x - fin_length * math.cos(angle_rad)
+    fin_y = base_y - fin_length * math.sin(angle_rad)
+    top_fin = [(base_x, base_y), (fin_x, fin_y), (top_x, top_y)]
+    bottom_fin = [(base_x, base_y), (fin_x, fin_y), (bottom_x, bottom_y)]
+    return body, top_fin, bottom_fin
+
+
+def _fill_dart(surface, polygons, colors):
+    """Fill the dart's polygons; colors is (body, outline, fins)"""
+    body_color, outline_color, fin_color = colors
+    body, top_fin, bottom_fin = polygons
+    pygame.draw.polygon(surface, body_color, body)
+    pygame.draw.polygon(surface, outline_color, body, 1)
+    pygame.draw.polygon(surface, fin_color, top_fin)
+    pygame.draw.polygon(surface, fin_color, bottom_fin)
+
+
+def draw_dart_shape(surface, x, y, angle, colors):
+    """Draw the dart with pygame.draw polygons; colors is (body, outline, fins)"""
+    _fill_dart(surface, dart_polygons(x, y, angle), colors)
+
+
+def build_dart_sprite(angle, offset_x, offset_y, colors):
+    """Draw the dart on its own surface; return it with the base's pixel in it"""
+    # The polygons are computed around a screen-sized position and shifted back
+    # (exactly), so float noise next to whole pixels rounds away as on screen
+    polygons = dart_polygons(DART_SPRITE_BIAS + offset_x, DART_SPRITE_BIAS + offset_y, angle)
+    points = [(x - DART_SPRITE_BIAS, y - DART_SPRITE_BIAS) for polygon in polygons for x, y in polygon]
+    
+    # Two pixels of margin absorb the outline and the sub-pixel offset
+    origin_x = math.ceil(-min(x for x, y in points)) + 2
+    origin_y = math.ceil(-min(y for x, y in points)) + 2
+    width = origin_x + math.ceil(max(x for x, y in points)) + 3
+    height = origin_y + math.ceil(max(y for x, y in points)) + 3
+    
+    shift_x = DART_SPRITE_BIAS - origin_x
+    shift_y = DART_SPRITE_BIAS - origin_y
+    polygons = [[(x - shift_x, y - shift_y) for x, y in polygon] for polygon in polygons]
+    
+    sprite = pygame.Surface((width, height), pygame.SRCALPHA)
+    _fill_dart(sprite, polygons, colors)
+    return sprite, (origin_x, origin_y)
+
+
+def get_dart_sprite(angle, offset_x, offset_y, colors):
+    """Return a cached (sprite, base pixel) for the dart at the nearest angle and offset.
+
+    offset_x/offset_y are the fractional part of the dart's position; the
+    sprite is blitted so that its base pixel lands on the integer part.
+    """
+    key = (round(angle / DART_ANGLE_STEP), round(offset_x * DART_SUBPIXEL),
+           round(offset_y * DART_SUBPIXEL), colors)
+    cached = _dart_sprites.get(key)
+    if cached is not None:
+        _dart_sprites.move_to_end(key)
+        return cached
+    
+    cached = build_dart_sprite(key[0] * DART_ANGLE_STEP, key[1] / DART_SUBPIXEL, key[2] / DART_SUBPIXEL, colors)
+    if pygame.display.get_surface() is not None:
+        cached = (cached[0].convert_alpha(), cached[1])
+    _dart_sprites[key] = cached
+    if len(_dart_sprites) > DART_CACHE_SIZE:
+        _dart_sprites.popitem(last=False)
+    return cached
+
+
+def build_board_sprite(radii, palette, shift):
+    """Draw a dartboard on its own surface; return it with its center pixel.
+
+    radii is (outer, middle, bullseye) and palette (outer, middle, bullseye,
+    outline, (label colors)). On screen the circles are centered on the
+    truncated board position and the labels on the rounded one; shift is
+    how far (-1, 0 or 1 on each axis) the labels sit from the circles.
+    """
+    outer, middle, bullseye = radii
+    *ring_colors, outline_color, label_colors = palette
+    
+    # The 10 in the outer ring, the 30 in the middle ring and the 50 on the bullseye
+    labels = []
+    for text, offset, color in zip(("10", "30", "50"), (-((middle + outer) // 2), -((bullseye + middle) // 2), 0),
+                                   label_colors):
+        label = render_text(text, 24, color)
+        labels.append((label, label.get_rect(center=(offset + shift[0], shift[1]))))
+    
+    # Sized to whatever the rings and labels cover around the center
+    bounds = pygame.Rect(-outer, -outer, outer * 2 + 1, outer * 2 + 1).unionall([rect for _, rect in labels])
+    center = (-bounds.x, -bounds.y)
+    labels = [(label, rect.move(center)) for label, rect in labels]
+    
+    # Where the board itself covers the sprite
+    disc = pygame.Surface(bounds.size, pygame.SRCALPHA)
+    pygame.draw.circle(disc, (255, 255, 255), center, outer)
+    inside = pygame.mask.from_surface(disc)
+    outside = inside.copy()
+    outside.invert()
+    
+    # An opaque sprite with a color key outside the rings blits fastest (RLE
+    # copies just the board). It needs the labels to stay on the rings, so
+    # they blend onto them as on screen, and a key no board pixel uses.
+    if not any(outside.overlap(pygame.mask.from_surface(label, 0), rect.topleft) for label, rect in labels):
+        for key_color in BOARD_KEY_COLORS:
+            sprite = pygame.Surface(bounds.size)
+            sprite.fill(key_color)
+            _draw_board(sprite, center, radii, ring_colors, outline_color, labels)
+            if not pygame.mask.from_threshold(sprite, key_color, (1, 1, 1, 255)).overlap(inside, (0, 0)):
+                sprite.set_colorkey(key_color, pygame.RLEACCEL)
+                return sprite, center
+    
+    # Labels spill off the board: per-pixel alpha, so they blend onto the screen
+    sprite = pygame.Surface(bounds.size, pygame.SRCALPHA)
+    _draw_board(sprite, center, radii, ring_colors, outline_color, labels)
+    return sprite, center
+
+
+def _draw_board(surface, center, radii, ring_colors, outline_color, labels):
+    """Draw the rings and then the (label, rect) pairs onto a board sprite"""
+    for radius, color in zip(radii, ring_colors):
+        pygame.draw.circle(surface, color, center, radius)
+        pygame.draw.circle(surface, outline_color, center, radius, 2)
+    for label, rect in labels:
+        surface.blit(label, rect)
+
+
+def get_board_sprite(radii, palette, shift=(0, 0)):
+    """Return a cached (sprite, center pixel) for a dartboard, building it on first use"""
+    key = (tuple(radii), palette, tuple(shift))
+    cached = _board_sprites.get(key)
+    if cached is not None:
+        _board_sprites.move_to_end(key)
+        return cached
+    
+    cached = build_board_sprite(*key)
+    if pygame.display.get_surface() is not None:
+        sprite, center = cached
+        if sprite.get_flags() & pygame.SRCALPHA:
+            cached = (sprite.convert_alpha(), center)
+        else:
+            converted = sprite.convert()
+            converted.set_colorkey(sprite.get_colorkey(), pygame.RLEACCEL)
+            cached = (converted, center)
+    _board_sprites[key] = cached
+    if len(_board_sprites) > BOARD_CACHE_SIZE:
+        _board_sprites.popitem(last=False)
+    return cached
+
+
+def build_burst_sprite(color, max_radius, rings):
+    """Draw the hit-effect ring burst on its own surface; return it with its center pixel"""
+    # Wide enough for the outermost ring whichever way pygame rounds its edge
+    center = max_radius + 1
+    sprite = pygame.Surface((center * 2 + 1, center * 2 + 1), pygame.SRCALPHA)
+    
+    # Draw multiple rings for a more dramatic effect
+    for i in range(rings):
+        r = max_radius * (1 - i/rings)
+        ring_width = max(2, int(r/5))
+        alpha = int(200 * (1 - i/rings))
+        pygame.draw.circle(sprite, (color[0], color[1], color[2], alpha), (center, center), int(r), ring_width)
+    
+    # Add a bright center flash
+    pygame.draw.circle(sprite, (255, 255, 255, 200), (center, center), max_radius // 4)
+    return sprite, (center, center)
+
+
+def get_burst_sprite(color, max_radius, rings):
+    """Return a cached (sprite, center pixel) for a hit-effect burst"""
+    key = (tuple(color), max_radius, rings)
+    cached = _burst_sprites.get(key)
+    if cached is None:
+        cached = build_burst_sprite(*key)
+        if pygame.display.get_surface() is not None:
+            cached = (cached[0].convert_alpha(), cached[1])
+        _burst_sprites[key] = cached
+    return cached
+
+
+def get_flash_surface(size, alpha):
+    """Return the shared white flash surface at the given size and alpha"""
+    global _flash
+    size = tuple(size)
+    if _flash is None or _flash[0] != size:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        _flash = [size, None, surface]
+    if _flash[1] != alpha:
+        # A per-pixel fill, not set_alpha(), so it blends exactly like a fresh flash surface
+        _flash[2].fill((255, 255, 255, alpha))
+        _flash[1] = alpha
+    return _flash[2]
+
+
+def compose_translucent(size, fill, elements):
+    """Pre-compose a translucent fill and (surface, position) elements into one layer.
+
+    The layer holds premultiplied alpha and must be blitted with
+    special_flags=pygame.BLEND_PREMULTIPLIED. Stacking in premultiplied form
+    matches blitting the elements one by one to within a unit of rounding,
+    which plain SRCALPHA-onto-SRCALPHA blits do not.
+    """
+    layer = pygame.Surface(size, pygame.SRCALPHA)
+    layer.fill(fill)
+    layer = layer.premul_alpha()
+    for surface, position in elements:
+        # premul_alpha() garbles surfaces with padded rows (font renders); a copy has none
+        layer.blit(surface.copy().premul_alpha(), position, special_flags=pygame.BLEND_PREMULTIPLIED)
+    if pygame.display.get_surface() is not None:
+        layer = layer.convert_alpha()
+    return layer
+
+
+def get_overlay(key, build):
+    """Return the cached overlay for key, composing it with build() on first use"""
+    overlay = _overlays.get(key)
+    if overlay is not None:
+        _overlays.move_to_end(key)
+        return overlay
+
+    overlay = _overlays[key] = build()
+    if len(_overlays) > OVERLAY_CACHE_SIZE:
+        _overlays.popitem(last=False)
+    return overlay
@@ -0,0 +1,210 @@
+"""Session recording and deterministic playback.
+
+A replay log holds everything the simulation consumed during a session: the
+random seed, the starting level, a checksum of the level file and the dart
+speed it was recorded with and, for every frame of the main loop, the held
+aim keys, throw / perfect-aim requests, the frame time in milliseconds and
+any start / level reset actions. Frames are stored in order, so a record's
+position is its frame index.
+
+Game frames feed their recorded time to the same simulation.FixedTimestep
+the game uses, so the simulation runs the same ticks with the same inputs
+and a level timer expires on the same tick. A session replays identically
+whether it is re-run in real time through the game window
+(python game_Q.py --replay FILE) or headless at full speed
+(python replay.py FILE).
+
+Log layout (little endian):
+    header: magic, version, seed, level, config
+    frame:  flags byte, dt varint, then (if FLAG_ACTIONS) an action count
+            varint followed by (code, level) byte pairs
+"""
+import random
+import struct
+import sys
+from collections import namedtuple
+
+import levels
+import simulation
+
+MAGIC = b"DRTR"
+VERSION = 4  # 2: frame times feed a FixedTimestep; 3: swept dart collision; 4: level file checksum
+
+# Header: magic, version, seed, level, level file checksum, dart_speed
+_HEADER = struct.Struct("<4sBIBId")
+
+# Frame flags
+FLAG_UP = 1
+FLAG_DOWN = 2
+FLAG_THROW = 4
+FLAG_AIM_PERFECT = 8
+FLAG_STEPPED = 16  # A gameplay frame: its time was fed to the simulation
+FLAG_ACTIONS = 32
+
+# Action codes
+START = 1  # Left the start screen
+RESET = 2  # Reset to a level (retry, next/previous level, restart)
+
+# One frame of the main loop; actions is a tuple of (code, level) pairs
+Frame = namedtuple("Frame", "inputs dt stepped actions")
+
+# A loaded replay log
+Session = namedtuple("Session", "seed level config frames")
+
+
+def level_config():
+    """Return the simulation settings a replay depends on"""
+    return levels.digest(), simulation.dart_speed
+
+
+def _write_varint(out, value):
+    """Append an unsigned LEB128 integer"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    """Read an unsigned LEB128 integer, returning (value, new position)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Recorder:
+    """Collects the frames of a live session"""
+
+    def __init__(self, seed, level=1):
+        self.seed = seed
+        self.level = level
+        self.frames = []
+        self._actions = []
+
+    def add_action(self, code, level=0):
+        """Note an action taken during the current frame"""
+        self._actions.append((code, level))
+
+    def end_frame(self, dt, inputs=None):
+        """Close the current frame; inputs is None if the simulation did not run"""
+        stepped = inputs is not None
+        if not stepped:
+            inputs = simulation.Inputs()
+        self.frames.append(Frame(inputs, dt, stepped, tuple(self._actions)))
+        self._actions = []
+
+    def to_bytes(self):
+        """Encode the recorded session"""
+        return encode(Session(self.seed, self.level, level_config(), self.frames))
+
+    def save(self, path):
+        """Write the recorded session to path"""
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+def encode(session):
+    """Encode a Session as a replay log"""
+    checksum, speed = session.config
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, session.seed, session.level, checksum, speed))
+
+    for frame in session.frames:
+        inputs = frame.inputs
+        flags = ((FLAG_UP if inputs.up else 0) | (FLAG_DOWN if inputs.down else 0) |
+                 (FLAG_THROW if inputs.throw else 0) | (FLAG_AIM_PERFECT if inputs.aim_perfect else 0) |
+                 (FLAG_STEPPED if frame.stepped else 0) | (FLAG_ACTIONS if frame.actions else 0))
+        out.append(flags)
+        _write_varint(out, frame.dt)
+        if frame.actions:
+            _write_varint(out, len(frame.actions))
+            for code, level in frame.actions:
+                out.append(code)
+                out.append(level)
+
+    return bytes(out)
+
+
+def decode(data):
+    """Decode a replay log into a Session"""
+    if len(data) < _HEADER.size:
+        raise ValueError("Replay log is truncated")
+    magic, version, seed, level, checksum, speed = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a replay log")
+    if version != VERSION:
+        raise ValueError("Unsupported replay log version %d" % version)
+
+    frames = []
+    pos = _HEADER.size
+    try:
+        while pos < len(data):
+            flags = data[pos]
+            dt, pos = _read_varint(data, pos + 1)
+            actions = ()
+            if flags & FLAG_ACTIONS:
+                count, pos = _read_varint(data, pos)
+                actions = tuple((data[pos + 2 * i], data[pos + 2 * i + 1]) for i in range(count))
+                pos += 2 * count
+                if pos > len(data):
+                    raise IndexError
+            inputs = simulation.Inputs(bool(flags & FLAG_UP), bool(flags & FLAG_DOWN),
+                                       bool(flags & FLAG_THROW), bool(flags & FLAG_AIM_PERFECT))
+            frames.append(Frame(inputs, dt, bool(flags & FLAG_STEPPED), actions))
+    except IndexError:
+        raise ValueError("Replay log is truncated") from None
+
+    return Session(seed, level, (checksum, speed), frames)
+
+
+def load(path):
+    """Load a replay log, checking it was recorded with the current level config"""
+    with open(path, "rb") as f:
+        session = decode(f.read())
+    if session.config != level_config():
+        raise ValueError("Replay was recorded with a different level file or dart speed")
+    return session
+
+
+def play(session):
+    """Re-run a session headless at full speed; return (simulation, throw events)"""
+    random.seed(session.seed)
+    sim = simulation.Simulation(session.level)
+    timestep = simulation.FixedTimestep()
+    events = []
+
+    for frame in session.frames:
+        for code, level in frame.actions:
+            if code == RESET:
+                sim.reset(level)
+        # The game shows the celebration screen, without stepping, until a reset
+        if not frame.stepped or sim.game_completed():
+            continue
+
+        for tick_inputs in timestep.add_frame(frame.dt, frame.inputs):
+            tick_events = sim.step(tick_inputs, timestep.tick_ms)
+            events.extend(tick_events)
+            # The game leaves for the celebration screen once the last level is completed, mid-frame or not
+            if sim.game_completed():
+                break
+
+    return sim, events
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        sys.exit("usage: python replay.py REPLAY_FILE [LEVEL_FILE]")
+
+    if len(sys.argv) == 3:
+        levels.use(sys.argv[2])
+    session = load(sys.argv[1])
+    sim, events = play(session)
+    state = sim.state
+    print("%d frames, %d throws" % (len(session.frames), len(events)))
+    print("Level %d, score %d, throws left %d, game over: %s" %
+          (state.current_level, state.score, state.throws_left, state.game_over))
@@ -0,0 +1,189 @@
+"""Closed-form throw resolution.
+
+The dart flies in a straight line at a constant dart_speed and the Level 2/3
+board follows its level's precomputed track, so the outcome of a throw can be
+worked out the moment it is thrown instead of frame by frame. The frames at
+which the dart could leave the screen, cross the board plane or enter an
+obstacle come from solving the line equations; only the frames next to
+those solutions are then checked with the exact per-frame rules of
+simulation.Simulation, so predictions match the frame loop frame for frame.
+
+Dart positions on the checked frames are accumulated with the same repeated
+additions the frame loop uses, which keeps hit_y identical to the last bit.
+
+This is a library for tools that run throws without watching them, such as
+scripts that check reported scores; tests/test_resolver.py holds it to the
+frame loop. The game and replay.play() do not use it: the game animates the
+flight, and a recorded aim_perfect input can turn a dart mid-flight, which a
+prediction made at throw time cannot know about.
+"""
+import math
+from collections import namedtuple
+
+import levels
+import simulation
+from simulation import WIDTH, HEIGHT, dart_speed
+
+# Outcome of a throw: the ThrowEvent fields plus the frames the dart spends
+# in flight (the throw frame counts as 1) and the board center at the impact
+ThrowPrediction = namedtuple("ThrowPrediction", "kind x y points frames center_y")
+
+# Candidate frames are widened by this much to absorb floating point rounding
+_EPSILON = 1e-9
+
+
+def board_after(center_y, direction, frames, level):
+    """Return (center_y, direction) after `frames` dartboard updates of a levels.Level"""
+    if level.motion == "static" or frames <= 0:
+        return center_y, direction
+
+    # Look the board up on the level's precomputed track, which repeats from its loop phase
+    track = level.track
+    phase = track.phases.get((center_y, direction))
+    if phase is None:
+        # A board moved off its track by hand is stepped instead
+        for _ in range(frames):
+            center_y, direction = levels.bounce_step(center_y, direction, level.move_speed, level.y_min,
+                                                     level.y_max)
+        return center_y, direction
+    phase += frames
+    if phase >= len(track.positions):
+        phase = track.loop + (phase - track.loop) % (len(track.positions) - track.loop)
+    return track.positions[phase]
+
+
+def _first_frame_beyond(start, velocity, limit):
+    """Frames until start + k * velocity passes limit (closed-form, may be inexact)"""
+    return (limit - start) / velocity
+
+
+def _candidate_frames(state, vx, vy):
+    """Frames at which the throw might resolve, from the continuous path"""
+    x0, y0 = state.dart_pos_x, state.dart_pos_y
+    solutions = []
+
+    # Leaving the screen
+    if vx > 0:
+        solutions.append(_first_frame_beyond(x0, vx, WIDTH))
+    if vy < 0:
+        solutions.append(_first_frame_beyond(y0, vy, 0))
+    elif vy > 0:
+        solutions.append(_first_frame_beyond(y0, vy, HEIGHT))
+    # A frame past the first of them the dart has certainly gone
+    reach = max(0, min(solutions)) + 1 if solutions else None
+
+    # Crossing the board plane
+    if vx != 0:
+        solutions.append(_first_frame_beyond(x0, vx, state.center_x))
+
+    # Entering an obstacle (slab test on the path, for the obstacles along it)
+    if state.obstacles:
+        grid = state.obstacle_grid
+        if reach is None:
+            nearby = range(len(grid.rects))
+        else:
+            nearby = grid.query(x0, y0, x0 + vx * reach, y0 + vy * reach)
+        for index in nearby:
+            left, top, width, height = grid.rects[index]
+            t_enter, t_exit = 0.0, math.inf
+            for start, velocity, low, high in ((x0, vx, left, left + width), (y0, vy, top, top + height)):
+                if velocity == 0:
+                    if not low - _EPSILON <= start <= high + _EPSILON:
+                        t_enter, t_exit = math.inf, -math.inf
+                    continue
+                t0 = (low - start) / velocity
+                t1 = (high - start) / velocity
+                t_enter = max(t_enter, min(t0, t1))
+                t_exit = min(t_exit, max(t0, t1))
+            if t_enter <= t_exit + _EPSILON:
+                solutions.append(t_enter)
+
+    frames = set()
+    for t in solutions:
+        if t < 0 or math.isinf(t):
+            continue
+        # The event lands on the first whole frame at or after t; check the neighbours too
+        k = math.ceil(t)
+        frames.update(f for f in (k - 1, k, k + 1) if f >= 1)
+    return sorted(frames)
+
+
+def _frame_outcome(sim, frame, prev_x, prev_y, x, y):
+    """Apply the frame loop's checks for one flight frame; None if nothing happens"""
+    state = sim.state
+
+    # The board moves from where it was after the previous frame to where it is after this one
+    board_start, _ = board_after(state.center_y, state.move_direction, frame - 1, state.level)
+    board_end, _ = board_after(state.center_y, state.move_direction, frame, state.level)
+
+    event, board_y = sim.sweep_dart(prev_x, prev_y, x, y, board_start, board_end)
+    if event is None:
+        return None
+    return event.kind, event.x, event.y, event.points, board_y
+
+
+def predict_throw(sim):
+    """Predict how the dart just thrown in sim will land, without stepping.
+
+    Call right after Simulation.throw_dart(), before the frame's step runs.
+    Returns a ThrowPrediction, or None if the dart would never resolve.
+    """
+    state = sim.state
+    vx = dart_speed * math.cos(math.radians(state.dart_angle))
+    vy = dart_speed * math.sin(math.radians(state.dart_angle))
+
+    x, y = state.dart_pos_x, state.dart_pos_y
+    reached = 0
+    for frame in _candidate_frames(state, vx, vy):
+        # Accumulate exactly as the frame loop does, up to the frame before this one
+        while reached < frame - 1:
+            x += vx
+            y += vy
+            reached += 1
+        prev_x, prev_y = x, y
+        outcome = _frame_outcome(sim, frame, prev_x, prev_y, prev_x + vx, prev_y + vy)
+        if outcome is not None:
+            return ThrowPrediction(*outcome[:4], frame, outcome[4])
+    return None
+
+
+def resolve_throw(sim, dt=0):
+    """Skip a thrown dart's flight: apply its predicted outcome to sim at once.
+
+    Equivalent to stepping sim with no input until the throw resolves, each
+    step taking dt milliseconds. Returns the ThrowEvent the last step would
+    have produced, or None if the dart would never resolve.
+    """
+    prediction = predict_throw(sim)
+    if prediction is None:
+        return None
+
+    state = sim.state
+    frames = prediction.frames
+    state.frame += frames
+
+    # A level timer starts on the first step and counts every later one. dt
+    # need not be a whole number of ms, so it is added step by step as the
+    # frame loop does: dt * frames can round to a different total
+    if state.level.time_limit:
+        counted = frames
+        if not state.timer_started:
+            state.timer_started = True
+            counted -= 1
+        for _ in range(counted):
+            state.level_time_ms += dt
+
+    state.center_y, state.move_direction = board_after(state.center_y, state.move_direction,
+                                                       frames, state.level)
+    state.perfect_angle = sim.calculate_perfect_angle()
+
+    event = simulation.ThrowEvent(prediction.kind, prediction.x, prediction.y, prediction.points,
+                                  prediction.center_y)
+    if prediction.kind == "hit":
+        state.score += prediction.points
+        state.previous_trajectories.append((state.dart_angle, prediction.x, prediction.y, prediction.center_y))
+
+    # check_game_over() also catches a level timer that ran out mid-flight
+    sim.reset_dart()
+    sim.check_game_over()
+    return event
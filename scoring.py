@@ -0,0 +1,117 @@
+"""Precomputed scoring tables for dartboards.
+
+A board is a list of rings, innermost first, each (radius, points) or
+(radius, points, sector multiplier), plus optional sector values spread
+evenly around the board like a real dartboard's 20, 1, 18, ... A hit
+distance d from the center lands in the first ring with d <= radius and
+scores points + sector multiplier * the value of the sector it lands in.
+Beyond the last ring it scores 0.
+
+ScoringTable buckets distances (by whole pixel, or finer for boards with
+many thin rings), so finding the ring is one list index however many rings
+the board has. The few buckets a ring edge passes through are marked and
+settled with a binary search, which keeps every lookup exactly equal to
+comparing d against each radius.
+"""
+import bisect
+import math
+
+_BOUNDARY = -1  # Bucket marker: a ring edge lies inside it
+_BUCKETS_PER_RING = 4  # Finer buckets once rings are thinner than this many pixels
+
+_tables = {}  # (rings, sectors, sector_offset) -> ScoringTable, shared by identical boards
+
+
+class ScoringTable:
+    """Distance (and angle) to points lookup for one board"""
+
+    def __init__(self, rings, sectors=(), sector_offset=0.0):
+        rings = [tuple(ring) + (0,) * (3 - len(ring)) for ring in rings]
+        self.radii = [ring[0] for ring in rings]
+        if self.radii != sorted(self.radii):
+            raise ValueError("Rings must be listed innermost first")
+        # Per ring, then a final entry for a miss
+        self.ring_points = [ring[1] for ring in rings] + [0]
+        self.ring_multipliers = [ring[2] for ring in rings] + [0]
+        self.sectors = tuple(sectors)
+        self.sector_offset = sector_offset
+        self.sector_width = 360 / len(self.sectors) if self.sectors else 360
+        self.miss = len(rings)
+        self._arrays = None  # NumPy copies of the lookup lists, made on first vectorised use
+
+        # Bucket k holds distances d with ceil(d * scale) == k
+        outer = self.radii[-1] if rings else 0
+        self.scale = max(1, math.ceil(_BUCKETS_PER_RING * len(rings) / outer)) if outer > 0 else 1
+        self.buckets = []
+        for k in range(math.ceil(outer * self.scale) + 1):
+            low = (k - 1) / self.scale
+            high = k / self.scale
+            # Widened so rounding in d * scale cannot carry a distance past a ring edge
+            margin = 1e-9 * max(1.0, high)
+            first = bisect.bisect_left(self.radii, low - margin)
+            last = bisect.bisect_right(self.radii, high + margin)
+            self.buckets.append(first if first == last else _BOUNDARY)
+
+    def ring(self, distance):
+        """Return the index of the ring distance falls in (len(rings) for a miss)"""
+        k = math.ceil(distance * self.scale)
+        if k >= len(self.buckets):
+            return self.miss
+        ring = self.buckets[k]
+        if ring == _BOUNDARY:
+            ring = bisect.bisect_left(self.radii, distance)
+        return ring
+
+    def sector_value(self, angle):
+        """Return the value of the sector at angle (degrees); 0 without sectors or an angle"""
+        if not self.sectors or angle is None:
+            return 0
+        return self.sectors[int(((angle - self.sector_offset) % 360) // self.sector_width) % len(self.sectors)]
+
+    def points(self, distance, angle=None):
+        """Return the points for a hit at distance from the center, at angle degrees around it"""
+        # ring(), inlined: this runs for every hit
+        k = math.ceil(distance * self.scale)
+        if k >= len(self.buckets):
+            return 0
+        ring = self.buckets[k]
+        if ring == _BOUNDARY:
+            ring = bisect.bisect_left(self.radii, distance)
+        multiplier = self.ring_multipliers[ring]
+        if multiplier:
+            return self.ring_points[ring] + multiplier * self.sector_value(angle)
+        return self.ring_points[ring]
+
+    def points_array(self, distances, angles=None):
+        """Vectorised points(): score arrays of distances and angles (requires NumPy)"""
+        import numpy as np
+
+        if self._arrays is None:
+            self._arrays = (np.asarray(self.buckets), np.asarray(self.ring_points),
+                            np.asarray(self.ring_multipliers), np.asarray(self.sectors))
+        buckets, ring_points, ring_multipliers, sectors = self._arrays
+
+        distances = np.asarray(distances, dtype=float)
+        k = np.ceil(distances * self.scale).astype(np.int64)
+        inside = k < len(buckets)
+        rings = np.full(distances.shape, self.miss, dtype=np.int64)
+        rings[inside] = buckets[k[inside]]
+        edge = rings == _BOUNDARY
+        if edge.any():
+            rings[edge] = np.searchsorted(self.radii, distances[edge], side="left")
+
+        points = ring_points[rings]
+        if self.sectors and angles is not None:
+            angles = np.broadcast_to(np.asarray(angles, dtype=float), distances.shape)
+            sector = ((angles - self.sector_offset) % 360 // self.sector_width).astype(np.int64) % len(self.sectors)
+            points = points + ring_multipliers[rings] * sectors[sector]
+        return points
+
+
+def table_for(rings, sectors=(), sector_offset=0.0):
+    """Return the shared ScoringTable for a board, building it on first use"""
+    key = (tuple(tuple(ring) for ring in rings), tuple(sectors), sector_offset)
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = ScoringTable(*key)
+    return table
@@ -0,0 +1,333 @@
+import math
+from collections import namedtuple
+
+import collision
+import levels
+
+# Playfield dimensions
+WIDTH, HEIGHT = 800, 600
+
+# Per-level settings (board, motion, obstacles, throws, time limit, goal)
+# live in the level file, see levels.py
+
+# Dart properties
+dart_x = 150
+dart_y = HEIGHT // 2
+dart_size = 8  # Increased from 6
+angle_min = -30
+angle_max = 30
+angle_change_speed = 1
+
+# Dart motion properties
+dart_speed = 8.8  # Optimized dart speed
+
+# Fixed simulation rate: every step is one tick of 1000 / tick_rate ms,
+# whatever rate the game is drawn at
+tick_rate = 60
+tick_ms = 1000 / tick_rate
+max_ticks_per_frame = 5  # Catch-up cap, so a stalled frame cannot snowball
+
+# Player input for one simulation step
+Inputs = namedtuple("Inputs", "up down throw aim_perfect", defaults=(False, False, False, False))
+
+# Outcome of a resolved throw: kind is "hit", "miss", "offscreen" or "obstacle";
+# board_y is where the board's center was at the impact
+ThrowEvent = namedtuple("ThrowEvent", "kind x y points board_y")
+
+
+class FixedTimestep:
+    """Turns variable frame times into whole fixed-rate simulation ticks.
+
+    Time is kept in ms * tick_rate units so integer frame times add up
+    exactly, and the same frame times always yield the same ticks.
+    """
+
+    def __init__(self, rate=None, max_ticks=None):
+        self.rate = rate or tick_rate
+        self.tick_ms = 1000 / self.rate
+        self.max_ticks = max_ticks or max_ticks_per_frame
+        self._units = 0
+        self._throw = False
+        self._aim_perfect = False
+
+    def add_frame(self, frame_ms, inputs):
+        """Add a frame's time and input; return the Inputs of each tick now due.
+
+        Held keys apply to every tick. Throw and perfect-aim requests go to
+        the next tick only, waiting for it if the frame was too short for one.
+        """
+        self._throw = self._throw or inputs.throw
+        self._aim_perfect = self._aim_perfect or inputs.aim_perfect
+
+        # Time beyond the catch-up cap is dropped rather than owed
+        self._units = min(self._units + frame_ms * self.rate, self.max_ticks * 1000)
+        ticks = int(self._units // 1000)
+        self._units -= ticks * 1000
+
+        tick_inputs = []
+        for _ in range(ticks):
+            tick_inputs.append(Inputs(inputs.up, inputs.down, self._throw, self._aim_perfect))
+            self._throw = self._aim_perfect = False
+        return tick_inputs
+
+    def alpha(self):
+        """Return how far the current time is between the last tick and the next (0-1)"""
+        return self._units / 1000
+
+
+class GameState:
+    """Everything that changes while a game is played"""
+
+    def __init__(self):
+        # The compiled levels.Level being played, and its number
+        self.level = None
+        self.current_level = 1
+        self.throws_left = 0
+        self.score = 0
+        self.game_over = False
+
+        # Current level properties (set from the level by Simulation.reset())
+        self.center_x = 0
+        self.center_y = 0
+        self.outer_radius = 0
+        self.middle_radius = 0
+        self.bullseye_radius = 0
+        self.move_direction = 1
+
+        self.dart_angle = 270  # Initial angle to 270 degrees (facing up/north)
+        self.perfect_angle = 0
+        self.dart_in_motion = False
+        self.dart_pos_x = dart_x
+        self.dart_pos_y = dart_y
+
+        # Each element is (angle, hit_x, hit_y, hit_center_y)
+        self.previous_trajectories = []
+
+        # Obstacles as (x, y, width, height) tuples, indexed by obstacle_grid
+        self.obstacle_grid = collision.ObstacleGrid()
+        self.obstacles = self.obstacle_grid.rects
+
+        # Level 3 timer, counted from the first step of the level
+        self.timer_started = False
+        self.level_time_ms = 0
+
+        # Number of steps since the level was reset, and the step the last dart was thrown on
+        self.frame = 0
+        self.release_frame = 0
+
+
+class Simulation:
+    """Game rules and physics, advanced one frame at a time with step()"""
+
+    def __init__(self, level=1):
+        self.state = GameState()
+        self.reset(level)
+
+    def reset(self, level=1):
+        """Reset the game to initial state"""
+        state = self.state
+        spec = levels.get(level)
+        state.level = spec
+        state.throws_left = spec.throws
+        state.score = 0
+        state.game_over = False
+        state.dart_angle = 270  # Keep facing up initially
+        state.previous_trajectories = []  # Clear previous trajectories
+        state.frame = 0
+
+        # Set the level
+        state.current_level = level
+
+        # Set level-specific properties
+        state.center_x = spec.center_x
+        state.center_y = spec.center_y
+        state.outer_radius = spec.outer_radius
+        state.middle_radius = spec.middle_radius
+        state.bullseye_radius = spec.bullseye_radius
+        state.move_direction = 1
+
+        # Reset the level timer, it starts with the first step
+        state.timer_started = False
+        state.level_time_ms = 0
+
+        # Obstacles never move, so every simulation of a level shares its prebuilt grid
+        state.obstacle_grid = spec.grid
+        state.obstacles = spec.grid.rects
+
+        state.perfect_angle = self.calculate_perfect_angle()
+        self.reset_dart()
+
+    def update_dartboard_position(self):
+        """Update the dartboard position on levels where it moves"""
+        state = self.state
+
+        level = state.level
+        if level.motion == "bounce":
+            # Move the dartboard up or down, turning at the bounds
+            state.center_y, state.move_direction = levels.bounce_step(state.center_y, state.move_direction,
+                                                                      level.move_speed, level.y_min, level.y_max)
+
+    def calculate_perfect_angle(self):
+        """Calculate the perfect angle to hit the bullseye"""
+        dx = self.state.center_x - dart_x
+        dy = self.state.center_y - dart_y
+        return math.degrees(math.atan2(dy, dx))
+
+    def throw_dart(self):
+        """Initialize dart throwing"""
+        state = self.state
+
+        if not state.dart_in_motion and not state.game_over and state.throws_left > 0:
+            state.dart_in_motion = True
+            state.release_frame = state.frame
+            state.dart_pos_x = dart_x
+            state.dart_pos_y = dart_y
+            state.throws_left -= 1
+
+    def reset_dart(self):
+        """Reset the dart to its starting position"""
+        state = self.state
+        state.dart_in_motion = False
+        state.dart_pos_x = dart_x
+        state.dart_pos_y = dart_y
+
+    def remaining_time(self):
+        """Return the milliseconds left on a timed level's timer"""
+        return max(0, self.state.level.time_limit - self.state.level_time_ms)
+
+    def check_game_over(self):
+        """Check if the game is over"""
+        state = self.state
+
+        # Game is over if no throws left
+        if state.throws_left <= 0:
+            state.game_over = True
+            return True
+
+        # For timed levels, also check if time is up
+        if state.level.time_limit and state.timer_started:
+            if state.level_time_ms >= state.level.time_limit:
+                state.game_over = True
+                return True
+
+        return state.game_over
+
+    def level_cleared(self):
+        """Whether the level's goal is met; a level without one is cleared by playing it out"""
+        goal = self.state.level.goal
+        return goal is None or self.state.score >= goal
+
+    def game_completed(self):
+        """Whether the last level is over with its goal met"""
+        state = self.state
+        return state.game_over and self.level_cleared() and not levels.has_level(state.current_level + 1)
+
+    def sweep_dart(self, x1, y1, x2, y2, board_y1, board_y2):
+        """Resolve one step of the dart's flight from (x1, y1) to (x2, y2).
+
+        Obstacles, the screen edges and the board's plane are tested along the
+        whole segment while the board moves from board_y1 to board_y2, and the
+        earliest impact wins (on a tie, in that order). Returns the ThrowEvent
+        and where the board's center was at that moment, or (None, None).
+        """
+        state = self.state
+        first_t, kind = None, None
+
+        if state.obstacles:
+            obstacle = collision.segment_vs_grid(x1, y1, x2, y2, state.obstacle_grid)
+            if obstacle is not None:
+                first_t, kind = obstacle[0], "obstacle"
+
+        exit_t = collision.segment_leaves_screen(x1, y1, x2, y2, WIDTH, HEIGHT)
+        if exit_t is not None and (first_t is None or exit_t < first_t):
+            first_t, kind = exit_t, "offscreen"
+
+        crossing = collision.segment_vs_board(x1, y1, x2, y2, state.center_x, board_y1, board_y2)
+        if crossing is not None and (first_t is None or crossing[0] < first_t):
+            t, hit_y, board_y = crossing
+            # The dart lands on the board's vertical axis: below the center (90 deg) or above it (270)
+            points_earned = self.score_hit(abs(hit_y - board_y), 90.0 if hit_y > board_y else 270.0)
+            event = ThrowEvent("hit" if points_earned > 0 else "miss", state.center_x, hit_y, points_earned, board_y)
+            return event, board_y
+
+        if kind is None:
+            return None, None
+        # Report where the dart was stopped
+        board_y = board_y1 + (board_y2 - board_y1) * first_t
+        return ThrowEvent(kind, x1 + (x2 - x1) * first_t, y1 + (y2 - y1) * first_t, 0, board_y), board_y
+
+    def score_hit(self, distance, angle=None):
+        """Return the points for a hit at distance from the board center (and angle around it)"""
+        # One table lookup, however many scoring zones the board has
+        return self.state.level.scoring.points(distance, angle)
+
+    def step(self, inputs, dt):
+        """Advance the game by one frame and return the throws it resolved.
+
+        dt is the step's length in milliseconds (tick_ms when driven by a
+        FixedTimestep); it only drives the level timer, the physics moves
+        a fixed amount per step.
+        """
+        state = self.state
+        events = []
+        state.frame += 1
+
+        if inputs.aim_perfect:
+            state.dart_angle = state.perfect_angle
+        if inputs.throw:
+            self.throw_dart()
+
+        level = state.level
+
+        # On timed levels, the timer starts with the first step of the level
+        if level.time_limit:
+            if state.timer_started:
+                state.level_time_ms += dt
+            else:
+                state.timer_started = True
+
+        # Update dartboard position on levels where it moves
+        board_start_y = state.center_y
+        if level.motion != "static":
+            self.update_dartboard_position()
+
+        # Recalculate perfect angle as dartboard may move
+        state.perfect_angle = self.calculate_perfect_angle()
+
+        if not state.dart_in_motion and not state.game_over:
+            if inputs.up:
+                state.dart_angle = max(state.perfect_angle + angle_min, state.dart_angle - angle_change_speed)
+            if inputs.down:
+                state.dart_angle = min(state.perfect_angle + angle_max, state.dart_angle + angle_change_speed)
+
+        if state.dart_in_motion:
+            prev_x, prev_y = state.dart_pos_x, state.dart_pos_y
+
+            # Normal dart movement for all levels (no wind)
+            state.dart_pos_x += dart_speed * math.cos(math.radians(state.dart_angle))
+            state.dart_pos_y += dart_speed * math.sin(math.radians(state.dart_angle))
+
+            # Sweep the whole step against obstacles, the screen edges and the moving board
+            event, board_y = self.sweep_dart(prev_x, prev_y, state.dart_pos_x, state.dart_pos_y,
+                                             board_start_y, state.center_y)
+            if event is not None:
+                if event.kind == "hit":
+                    state.score += event.points
+
+                    # Store this throw's trajectory
+                    # For a moving board, also store where its center was at the time of hit
+                    state.previous_trajectories.append((state.dart_angle, event.x, event.y, board_y))
+
+                events.append(event)
+                self.reset_dart()
+                self.check_game_over()
+
+                if event.kind == "obstacle":
+                    # The frame ends at the obstacle, before the timer check
+                    return events
+
+        # End a timed level once its timer runs out
+        if level.time_limit and not state.game_over and self.remaining_time() <= 0:
+            state.game_over = True
+
+        return events
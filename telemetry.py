@@ -0,0 +1,112 @@
+"""Per-throw telemetry, streamed to rotating gzip-compressed NDJSON files.
+
+The game hands emit() one tuple of FIELDS values per resolved throw. emit()
+only appends it to a bounded buffer: when the buffer is full the event
+is dropped and counted, so a frame never waits on the stream. A drain
+thread wakes every DRAIN_INTERVAL seconds, empties the buffer and writes the
+events as JSON lines to telemetry.ndjson.gz in the stream's directory; the
+JSON encoding and the compression happen there, not in the frame.
+
+The buffer needs no lock: only the game appends to it and only the drain
+thread pops from it, and both are single atomic deque operations. Its
+length can only shrink between emit()'s check and append, so it never
+holds more than its capacity.
+
+Once the file passes MAX_FILE_BYTES compressed, it is renamed to
+telemetry.1.ndjson.gz (shifting older files up to BACKUP_FILES) and a new
+one is started. Events are written and flushed WRITE_CHUNK at a time, so
+the lines written so far can be read while the game runs; the file is only
+a complete gzip stream once the stream is closed.
+"""
+import gzip
+import json
+import os
+import sys
+import threading
+from collections import deque
+
+FIELDS = ("time", "kind", "level", "angle", "release_frame", "frame", "center_y", "intersect_y", "points",
+          "remaining_ms")
+BUFFER_SIZE = 4096  # Events waiting for the drain thread; more are dropped
+WRITE_CHUNK = 512  # Events encoded and flushed at a time; the file can rotate between chunks
+DRAIN_INTERVAL = 1.0  # Seconds between drains
+MAX_FILE_BYTES = 1024 * 1024  # Compressed size at which the file is rotated
+BACKUP_FILES = 9  # Rotated files kept
+FILE_NAME = "telemetry.ndjson.gz"
+
+
+class TelemetryStream:
+    """A bounded event buffer, written to disk by a background drain thread"""
+
+    def __init__(self, directory, capacity=BUFFER_SIZE, max_bytes=MAX_FILE_BYTES, backups=BACKUP_FILES,
+                 interval=DRAIN_INTERVAL):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.interval = interval
+        self.dropped = 0  # Events turned away by a full buffer
+        self.written = 0  # Events written to a file
+        self.failed = 0  # Events lost to a failed write
+        self._buffer = deque()
+        self._file = None
+        self._closing = threading.Event()
+        self._drainer = threading.Thread(target=self._drain_loop, name="telemetry-drain", daemon=True)
+        self._drainer.start()
+
+    def emit(self, event):
+        """Queue an event, a tuple of FIELDS values; drop it if the buffer is full"""
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+        else:
+            self._buffer.append(event)
+
+    def path(self, index=0):
+        """Return the path of the current file (index 0) or of the index-th rotated one"""
+        if index == 0:
+            return os.path.join(self.directory, FILE_NAME)
+        stem, extension = FILE_NAME.split(".", 1)
+        return os.path.join(self.directory, "%s.%d.%s" % (stem, index, extension))
+
+    def _drain_loop(self):
+        running = True
+        while running:
+            # close() wakes the thread early for a last drain
+            running = not self._closing.wait(self.interval)
+            self._drain()
+        if self._file is not None:
+            self._file.close()
+
+    def _drain(self):
+        # Take only what is queued now, so a busy producer cannot keep the drain going
+        for _ in range(0, len(self._buffer), WRITE_CHUNK):
+            chunk = [self._buffer.popleft() for _ in range(min(WRITE_CHUNK, len(self._buffer)))]
+            try:
+                self._write(chunk)
+            except OSError as error:
+                self.failed += len(chunk)
+                print("telemetry: dropped %d events: %s" % (len(chunk), error), file=sys.stderr)
+
+    def _write(self, events):
+        if self._file is None:
+            # Appending adds a gzip member; readers see the members as one stream
+            self._file = gzip.open(self.path(), "ab")
+        self._file.write("".join(json.dumps(dict(zip(FIELDS, event))) + "\n" for event in events).encode())
+        self._file.flush()
+        self.written += len(events)
+        if self._file.fileobj.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        # The oldest backup is overwritten
+        for index in range(self.backups, 0, -1):
+            if os.path.exists(self.path(index - 1)):
+                os.replace(self.path(index - 1), self.path(index))
+
+    def close(self):
+        """Write the queued events, close the file and stop the drain thread"""
+        self._closing.set()
+        self._drainer.join()
@@ -0,0 +1,41 @@
+import json
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import levels
+
+
+@pytest.fixture
+def fractional_levels(tmp_path):
+    """Serve the stock levels with fractional board speeds and a fractional Level 3 start"""
+    with open(levels.LEVELS_PATH) as f:
+        data = json.load(f)
+    data["levels"][1]["motion"]["speed"] = 2.7
+    data["levels"][2]["motion"]["speed"] = 0.7
+    data["levels"][2]["board"]["y"] = 300.3
+    path = tmp_path / "levels.json"
+    path.write_text(json.dumps(data))
+    levels.use(str(path))
+    yield
+    levels.use()
+
+
+@pytest.fixture
+def crowded_levels(tmp_path):
+    """Serve the stock levels with 200 more obstacles scattered over Level 3"""
+    with open(levels.LEVELS_PATH) as f:
+        data = json.load(f)
+    rng = random.Random(3)
+    data["levels"][2]["obstacles"] += [[rng.randrange(60, 560), rng.randrange(0, 580), rng.randrange(2, 30),
+                                        rng.randrange(2, 30)] for _ in range(200)]
+    path = tmp_path / "levels.json"
+    path.write_text(json.dumps(data))
+    levels.use(str(path))
+    yield
+    levels.use()
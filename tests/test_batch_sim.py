@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+batch_sim = pytest.importorskip("batch_sim")
+
+import simulation
+
+
+def check_batch_matches_scalar(level, angles, phases):
+    result = batch_sim.simulate_throws(angles, phases, level)
+    for i, (angle, phase) in enumerate(zip(angles, phases)):
+        hit_y, points, outcome, frames = batch_sim.simulate_throw_scalar(angle, phase, level)
+        assert (result.outcome[i], result.points[i], result.frames[i]) == (outcome, points, frames), (angle, phase)
+        assert np.isnan(result.hit_y[i]) if np.isnan(hit_y) else result.hit_y[i] == hit_y, (angle, phase)
+
+
+def throws(count, seed):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-60, 60, count), rng.integers(0, 400, count)
+
+
+@pytest.mark.parametrize("level", [1, 2, 3])
+def test_batch_matches_scalar(level):
+    check_batch_matches_scalar(level, *throws(150, level))
+
+
+@pytest.mark.parametrize("level", [2, 3])
+def test_batch_matches_scalar_at_fractional_speed(fractional_levels, level):
+    check_batch_matches_scalar(level, *throws(150, level))
+
+
+def test_batch_matches_scalar_among_many_obstacles(crowded_levels):
+    check_batch_matches_scalar(3, *throws(300, 0))
+
+
+@pytest.mark.parametrize("level", [1, 2, 3])
+def test_center_track_matches_stepping(fractional_levels, level):
+    # Long enough for the board to go round its track several times
+    sim = simulation.Simulation(level)
+    track = batch_sim.center_track(sim.state.level, 3000)
+    for frame in range(3001):
+        assert track[frame] == sim.state.center_y, frame
+        sim.update_dartboard_position()
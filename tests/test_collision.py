@@ -0,0 +1,56 @@
+import math
+import random
+
+import collision
+import simulation
+
+
+def random_segments(count, length, seed):
+    rng = random.Random(seed)
+    segments = []
+    for _ in range(count):
+        x = rng.uniform(-20, simulation.WIDTH + 20)
+        y = rng.uniform(-20, simulation.HEIGHT + 20)
+        angle = rng.uniform(0, 2 * math.pi)
+        segments.append((x, y, x + length * math.cos(angle), y + length * math.sin(angle)))
+    return segments
+
+
+def random_rects(count, seed):
+    rng = random.Random(seed)
+    return [(rng.randrange(0, simulation.WIDTH), rng.randrange(0, simulation.HEIGHT), rng.randrange(1, 80),
+             rng.randrange(1, 80)) for _ in range(count)]
+
+
+def test_grid_matches_linear_scan():
+    for count in (1, 10, 100, 400):
+        rects = random_rects(count, count)
+        grid = collision.ObstacleGrid(rects)
+        for length in (simulation.dart_speed, 50, 300):
+            for segment in random_segments(500, length, count):
+                assert collision.segment_vs_grid(*segment, grid) == collision.segment_vs_rects(*segment, rects)
+
+
+def test_grid_matches_linear_scan_after_moves():
+    rects = random_rects(100, 0)
+    grid = collision.ObstacleGrid(rects)
+    rng = random.Random(1)
+    for _ in range(200):
+        index = rng.randrange(len(rects))
+        rects[index] = random_rects(1, rng.random())[0]
+        grid.move(index, rects[index])
+    for segment in random_segments(2000, 40, 2):
+        assert collision.segment_vs_grid(*segment, grid) == collision.segment_vs_rects(*segment, rects)
+
+
+
+def test_moved_rect_leaves_its_old_cells():
+    grid = collision.ObstacleGrid([(10, 10, 20, 20), (300, 300, 20, 20)])
+    old_keys = grid._cell_keys(grid.rects[0])
+    grid.move(0, (400, 200, 30, 30))
+    new_keys = grid._cell_keys(grid.rects[0])
+    assert not set(old_keys) & set(new_keys)
+    assert all(0 in grid.cells[key] for key in new_keys)
+    assert all(0 not in grid.cells.get(key, ()) for key in old_keys)
+    assert collision.segment_vs_grid(0, 20, 40, 20, grid) is None
+    assert collision.segment_vs_grid(390, 215, 440, 215, grid) is not None
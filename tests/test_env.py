@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+env = pytest.importorskip("env")
+
+GAMES = 32
+
+
+def check_vector_env_matches_single_games(level, steps=1500):
+    rng = np.random.default_rng(level)
+    games = env.VectorDartEnv(GAMES, level, max_steps=1000)
+    singles = [env.DartEnv(level, max_steps=1000) for _ in range(GAMES)]
+    observations, _ = games.reset()
+    assert np.array_equal(observations, [single.reset()[0] for single in singles])
+
+    for _ in range(steps):
+        offsets = rng.uniform(-40, 40, GAMES)
+        throws = rng.random(GAMES) < 0.05
+        observations, rewards, terminated, truncated, _ = games.step(offsets, throws)
+        for i, single in enumerate(singles):
+            observation, reward, single_terminated, single_truncated, _ = single.step(offsets[i], throws[i])
+            assert (reward, single_terminated, single_truncated) == (rewards[i], terminated[i], truncated[i])
+            if single_terminated or single_truncated:
+                observation, _ = single.reset()
+            assert np.array_equal(observation, observations[i])
+
+
+@pytest.mark.parametrize("level", [1, 2, 3])
+def test_vector_env_matches_single_games(level):
+    check_vector_env_matches_single_games(level)
+
+
+@pytest.mark.parametrize("level", [2, 3])
+def test_vector_env_matches_single_games_at_fractional_speed(fractional_levels, level):
+    check_vector_env_matches_single_games(level)
+
+
+def test_vector_env_matches_single_games_among_many_obstacles(crowded_levels):
+    check_vector_env_matches_single_games(3)
@@ -0,0 +1,67 @@
+import sqlite3
+import time
+
+import pytest
+
+import leaderboard
+
+
+def test_scores_are_ranked_after_flush(tmp_path):
+    scores = leaderboard.Leaderboard(str(tmp_path / "scores.db"))
+    session = scores.start_session("ann", 1, 0)
+    for player, score in (("ann", 30), ("bo", 90), ("cy", 60)):
+        scores.record_score(session, player, 1, score, 3, True)
+    scores.flush()
+    assert scores.top(1) == [("bo", 90, 3), ("cy", 60, 3), ("ann", 30, 3)]
+    scores.close()
+    # Reopened, the top scores come back from the database
+    scores = leaderboard.Leaderboard(str(tmp_path / "scores.db"))
+    assert scores.top(1) == [("bo", 90, 3), ("cy", 60, 3), ("ann", 30, 3)]
+    assert scores.top(2) == []
+    scores.close()
+
+
+def test_top_includes_queued_scores(tmp_path):
+    path = str(tmp_path / "scores.db")
+    scores = leaderboard.Leaderboard(path)
+    session = scores.start_session("ann", 1, 0)
+    scores.record_score(session, "ann", 1, 50, 3, True)
+    scores.flush()
+    scores.close()
+
+    scores = leaderboard.Leaderboard(path)
+    # Hold the write lock, so nothing queued now is committed
+    blocker = sqlite3.connect(path, timeout=0)
+    blocker.execute("BEGIN EXCLUSIVE")
+    session = scores.start_session("bo", 2, 0)
+    for score in (10, 50, 90, 20, 70, 60):
+        scores.record_score(session, "bo", 1, score, 3, True)
+    # Ties go to the earlier result
+    assert scores.top(1) == [("bo", 90, 3), ("bo", 70, 3), ("bo", 60, 3), ("ann", 50, 3), ("bo", 50, 3)]
+    assert scores.top(1, 2) == [("bo", 90, 3), ("bo", 70, 3)]
+    blocker.rollback()
+    blocker.close()
+    scores.close()
+
+
+def test_unopenable_database_raises_sqlite_error(tmp_path):
+    # main() catches this and plays without a leaderboard
+    with pytest.raises(sqlite3.Error):
+        leaderboard.Leaderboard(str(tmp_path))
+
+
+def test_close_returns_while_the_writer_is_stuck(tmp_path):
+    path = str(tmp_path / "scores.db")
+    scores = leaderboard.Leaderboard(path, queue_size=4)
+    # Hold the write lock, so the writer waits on its first batch while the queue fills
+    blocker = sqlite3.connect(path, timeout=0)
+    blocker.execute("BEGIN EXCLUSIVE")
+    session = scores.start_session("ann", 1, 0)
+    for score in range(20):
+        scores.record_score(session, "ann", 1, score, 3, True)
+    start = time.monotonic()
+    scores.close(timeout=0.5)
+    assert time.monotonic() - start < 2
+    assert scores.dropped > 0
+    blocker.rollback()
+    blocker.close()
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import replay
+import simulation
+
+SEED = 7
+FRAME_MS = 50  # Three ticks a frame at 60 Hz
+
+# State the headless playback must leave exactly as the game does
+STATE_FIELDS = ("current_level", "frame", "center_y", "move_direction", "score", "throws_left", "level_time_ms",
+                "game_over")
+
+
+def idle_session(level, frames):
+    """A session that starts `level` and then waits out `frames` frames"""
+    start = ((replay.RESET, level), (replay.START, 0))
+    return replay.Session(SEED, level, replay.level_config(),
+                          [replay.Frame(simulation.Inputs(), FRAME_MS, True, start if i == 0 else ())
+                           for i in range(frames)])
+
+
+def game_playback(session, tmp_path, monkeypatch):
+    """Play a session through the game loop; return the game's simulation"""
+    game_Q = pytest.importorskip("game_Q")
+    monkeypatch.setattr(game_Q.replay, "load", lambda path: session)
+    monkeypatch.setattr(game_Q, "FPS", 0)
+    monkeypatch.setattr(game_Q, "LAZY_STARTUP", False)
+    monkeypatch.setattr(game_Q, "LEADERBOARD_PATH", str(tmp_path / "leaderboard.db"))
+    with pytest.raises(SystemExit):
+        game_Q.main(replay_path="session")
+    return game_Q.sim
+
+
+def test_timed_last_level_ends_on_the_same_tick(tmp_path, monkeypatch):
+    # Level 3's timer runs out partway through a frame, then the game sits on the celebration screen
+    session = idle_session(3, 20000 // FRAME_MS + 40)
+    sim, events = replay.play(replay.decode(replay.encode(session)))
+    assert sim.game_completed()
+    assert events == []
+
+    game_sim = game_playback(session, tmp_path, monkeypatch)
+    for field in STATE_FIELDS:
+        assert getattr(sim.state, field) == getattr(game_sim.state, field), field
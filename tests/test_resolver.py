@@ -0,0 +1,95 @@
+import copy
+import random
+
+import pytest
+
+import levels
+import resolver
+import simulation
+
+# State the resolver must leave exactly as stepping would
+STATE_FIELDS = ("center_y", "move_direction", "frame", "score", "perfect_angle", "previous_trajectories",
+                "throws_left", "timer_started", "level_time_ms", "game_over")
+
+
+def aimed_sim(level, rng):
+    """A level played for a random number of aiming steps, not yet over"""
+    sim = simulation.Simulation(level)
+    for _ in range(rng.randrange(0, 1200)):
+        sim.step(simulation.Inputs(up=rng.random() < 0.5, down=rng.random() < 0.5), simulation.tick_ms)
+        if sim.state.game_over:
+            sim.reset(level)
+    return sim
+
+
+def stepped_throw(sim):
+    """Throw and step sim until the throw resolves; return its ThrowEvent"""
+    sim.throw_dart()
+    events = []
+    while not events:
+        events = sim.step(simulation.Inputs(), simulation.tick_ms)
+    return events[-1]
+
+
+def check_resolver_matches_stepping(level, throws=150):
+    rng = random.Random(level)
+    for _ in range(throws):
+        sim = aimed_sim(level, rng)
+        stepped = copy.deepcopy(sim)
+        sim.throw_dart()
+        event = resolver.resolve_throw(sim, simulation.tick_ms)
+        assert event == stepped_throw(stepped)
+        for field in STATE_FIELDS:
+            assert getattr(sim.state, field) == getattr(stepped.state, field), field
+
+
+@pytest.mark.parametrize("level", [1, 2, 3])
+def test_resolver_matches_stepping(level):
+    check_resolver_matches_stepping(level)
+
+
+@pytest.mark.parametrize("level", [2, 3])
+def test_resolver_matches_stepping_at_fractional_speed(fractional_levels, level):
+    check_resolver_matches_stepping(level)
+
+
+@pytest.mark.parametrize("level", [2, 3])
+def test_board_after_matches_stepping_at_fractional_speed(fractional_levels, level):
+    sim = simulation.Simulation(level)
+    start = (sim.state.center_y, sim.state.move_direction)
+    for frames in range(1, 3000):
+        sim.update_dartboard_position()
+        assert resolver.board_after(*start, frames, sim.state.level) == (sim.state.center_y,
+                                                                         sim.state.move_direction)
+
+
+def test_level_timer_ends_on_the_same_tick():
+    # Throws released on every tick before the 20 s limit, with flights running past it
+    level = simulation.Simulation(3).state.level
+    limit_ticks = round(level.time_limit / simulation.tick_ms)
+    for release in range(limit_ticks - 120, limit_ticks):
+        sim = simulation.Simulation(3)
+        for _ in range(release):
+            sim.step(simulation.Inputs(), simulation.tick_ms)
+        sim.state.dart_angle = 0  # Straight at the wall, a long flight
+        stepped = copy.deepcopy(sim)
+        sim.throw_dart()
+        resolver.resolve_throw(sim, simulation.tick_ms)
+        stepped_throw(stepped)
+        for field in ("frame", "level_time_ms", "game_over"):
+            assert getattr(sim.state, field) == getattr(stepped.state, field), (release, field)
+
+
+def test_board_after_steps_a_board_off_its_track(fractional_levels):
+    sim = simulation.Simulation(2)
+    sim.state.center_y = 201.05
+    start = (sim.state.center_y, sim.state.move_direction)
+    for frames in range(1, 500):
+        sim.update_dartboard_position()
+        assert resolver.board_after(*start, frames, sim.state.level) == (sim.state.center_y,
+                                                                         sim.state.move_direction)
+
+
+def test_board_that_never_repeats_is_rejected():
+    with pytest.raises(ValueError):
+        levels.board_track(300, 1e-3, 150, 450, "level 2 motion")
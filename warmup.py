@@ -0,0 +1,57 @@
+"""Incremental asset warm-up across the first frames
+
+Cached sprites, panels and texts are built the first time they are drawn,
+so a cold start used to stall the first frame of every new screen: the
+first throw, hit and game over each waited for their assets. A Warmup holds
+builders for the assets the game will need soon and runs a few of them in
+the spare time of each frame, so the window appears at once and the caches
+fill while the player reads the start screen.
+
+The builders run on the main thread between frames rather than on a worker
+thread: they render fonts and draw into surfaces, which pygame does not
+make safe to do alongside the frame being drawn.
+"""
+import time
+from collections import deque
+
+WARMUP_BUDGET_MS = 4  # Per frame; a 60 FPS frame leaves about 16 ms
+
+
+class Warmup:
+    """A queue of asset builders run a frame's budget at a time"""
+
+    def __init__(self, jobs=()):
+        self._jobs = deque(jobs)
+        self.total = len(self._jobs)
+        self.ran = 0
+
+    def add(self, jobs):
+        """Queue more builders after the ones already waiting"""
+        self._jobs.extend(jobs)
+        self.total += len(jobs)
+
+    def done(self):
+        """Return whether every queued builder has run"""
+        return not self._jobs
+
+    def step(self, budget_ms=WARMUP_BUDGET_MS):
+        """Run builders until budget_ms is spent; return how many ran.
+
+        A builder is never interrupted, so a frame can overrun the budget by
+        the slowest one; at least one runs per call.
+        """
+        deadline = time.perf_counter() + budget_ms / 1000
+        ran = 0
+        while self._jobs:
+            self._jobs.popleft()()
+            ran += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.ran += ran
+        return ran
+
+    def finish(self):
+        """Run every remaining builder now"""
+        while self._jobs:
+            self._jobs.popleft()()
+            self.ran += 1